@@ -0,0 +1,284 @@
+"""
+Bounded-cost arithmetic for the Calculator Pad.
+
+An expression is parsed with ast, checked against a whitelist (numeric
+literals, + - * / // % ** and unary signs) and compiled to a small postfix
+program, which is cached per (expression, mode). Before each operation the
+evaluator estimates the size of its result from the operands' bit lengths:
+anything past MAX_RESULT_DIGITS is refused before it is computed, so
+9**9**9 costs microseconds rather than the process. 0, 1 and -1 raised to
+any integer power are answered directly. A deadline is checked between
+operations, and every operation is bounded by the size limit, so one call
+never runs much past its budget.
+
+Modes:
+    "float"     Python semantics: exact integers, / gives a float
+    "fraction"  exact rationals; / gives a Fraction
+    "decimal"   Decimal arithmetic at DECIMAL_PRECISION significant digits
+                (// and % truncate toward zero, as Decimal does)
+"""
+
+import ast
+import math
+import time
+from decimal import Context, Decimal, DivisionByZero, DivisionImpossible, InvalidOperation, Overflow
+from fractions import Fraction
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple, Union
+
+from instrumentation import cache_family, metrics
+
+MODES = ("float", "fraction", "decimal")
+DEFAULT_BUDGET = 0.5
+MAX_EXPRESSION_LENGTH = 512
+MAX_OPERATIONS = 256
+MAX_RESULT_DIGITS = 4000
+MAX_RESULT_BITS = int(MAX_RESULT_DIGITS * math.log2(10))
+DECIMAL_PRECISION = 50
+COMPILE_CACHE_SIZE = 1024
+
+# Characters the pad shows for operators Python spells differently
+PAD_SYMBOLS = {"×": "*", "÷": "/", "−": "-"}
+
+Number = Union[int, float, Fraction, Decimal]
+
+_BINARY = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.FloorDiv: "//",
+           ast.Mod: "%", ast.Pow: "**"}
+_UNARY = {ast.UAdd: "pos", ast.USub: "neg"}
+
+
+class ExpressionError(ValueError):
+    """The expression is malformed, not allowed, or has no finite value."""
+
+
+class ExpressionTooCostly(ExpressionError):
+    """Evaluating the expression would build a number past MAX_RESULT_DIGITS."""
+
+
+class ExpressionTimeout(TimeoutError):
+    """Evaluation ran past its time budget."""
+
+
+class CompiledExpression(NamedTuple):
+    text: str
+    mode: str
+    # Postfix program: ("push", value) or (operator, None)
+    program: Tuple[Tuple[str, object], ...]
+
+
+def normalize(text: str) -> str:
+    for symbol, op in PAD_SYMBOLS.items():
+        text = text.replace(symbol, op)
+    return text.strip()
+
+
+def _literal(value: object, mode: str) -> Number:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ExpressionError(f"Only numbers are allowed, not {value!r}")
+    if isinstance(value, int) and value.bit_length() > MAX_RESULT_BITS:
+        raise ExpressionTooCostly(f"Number has more than {MAX_RESULT_DIGITS} digits")
+    if isinstance(value, float) and not math.isfinite(value):
+        # A literal such as 1e999 parses to inf
+        raise ExpressionTooCostly("Number is too large")
+    if mode == "fraction":
+        # repr round-trips, so 0.1 stays exactly 1/10 rather than the nearest double
+        return Fraction(repr(value)) if isinstance(value, float) else Fraction(value)
+    if mode == "decimal":
+        return Decimal(repr(value))
+    return value
+
+
+def _emit(node: ast.AST, mode: str, program: List[Tuple[str, object]]) -> None:
+    # Iterative post-order walk so deeply nested input cannot exhaust the stack
+    stack = [(node, False)]
+    while stack:
+        node, visited = stack.pop()
+        if isinstance(node, ast.Constant):
+            program.append(("push", _literal(node.value, mode)))
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            if visited:
+                program.append((_BINARY[type(node.op)], None))
+            else:
+                stack += [(node, True), (node.right, False), (node.left, False)]
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            if visited:
+                program.append((_UNARY[type(node.op)], None))
+            else:
+                stack += [(node, True), (node.operand, False)]
+        else:
+            raise ExpressionError(f"Not allowed in an expression: {type(node).__name__}")
+        if len(program) > 2 * MAX_OPERATIONS:
+            raise ExpressionTooCostly(f"More than {MAX_OPERATIONS} operations")
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_expression(text: str, mode: str = "float") -> CompiledExpression:
+    """Parse, whitelist-check and compile text (cached). Raises ExpressionError."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode} (choose from {', '.join(MODES)})")
+    text = normalize(text)
+    if not text:
+        raise ExpressionError("Empty expression")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise ExpressionTooCostly(f"Expression longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        raise ExpressionError(f"Invalid expression: {getattr(e, 'msg', None) or e}") from None
+    program: List[Tuple[str, object]] = []
+    _emit(tree.body, mode, program)
+    return CompiledExpression(text, mode, tuple(program))
+
+
+def _bits(value: Number) -> float:
+    """Storage size of value in bits, as far as the cost limit is concerned."""
+    if isinstance(value, int):
+        return value.bit_length()
+    if isinstance(value, Fraction):
+        return value.numerator.bit_length() + value.denominator.bit_length()
+    # Floats and Decimals are fixed-precision; their range is the context's problem
+    return 0
+
+
+def _log2_size(value: Number) -> float:
+    """Bits per factor when value is raised to a power."""
+    if isinstance(value, Fraction):
+        return math.log2(abs(value.numerator)) + math.log2(value.denominator)
+    return math.log2(abs(value))
+
+
+def _check_cost(op: str, a: Number, b: Number) -> None:
+    if op in ("+", "-"):
+        estimate = max(_bits(a), _bits(b)) + 1
+    elif op == "*":
+        estimate = _bits(a) + _bits(b)
+    elif op in ("/", "//", "%"):
+        estimate = _bits(a) + _bits(b) if isinstance(a, Fraction) else max(_bits(a), _bits(b))
+    else:
+        # a ** b: only exact bases raised to integral exponents grow without bound
+        if not isinstance(a, (int, Fraction)) or not _bits(a) or not _is_integral(b):
+            return
+        if isinstance(a, int) and b < 0:
+            # int ** negative int is a float, which underflows to 0.0 rather than growing
+            return
+        exponent = abs(int(b))
+        estimate = exponent * _log2_size(a) if abs(a) not in (0, 1) else 0
+    if estimate > MAX_RESULT_BITS + 1:
+        raise ExpressionTooCostly(f"{op} would produce a number with more than {MAX_RESULT_DIGITS} digits")
+
+
+def _is_integral(value: Number) -> bool:
+    if isinstance(value, int):
+        return True
+    if isinstance(value, Fraction):
+        return value.denominator == 1
+    return False
+
+
+def _power(a: Number, b: Number) -> Number:
+    if _is_integral(b) and isinstance(a, (int, Fraction)) and abs(a) in (0, 1):
+        # 0, 1 and -1 to any integral power, however large the exponent
+        exponent = int(b)
+        if a == 0:
+            if exponent < 0:
+                raise ZeroDivisionError("0 cannot be raised to a negative power")
+            return type(a)(1 if exponent == 0 else 0)
+        result = a if a == 1 or exponent % 2 else -a
+        # int ** negative int is a float in Python
+        return float(result) if exponent < 0 and isinstance(a, int) else result
+    return a ** b
+
+
+def _operations(mode: str) -> dict:
+    if mode == "decimal":
+        ctx = _decimal_context()
+        return {"+": ctx.add, "-": ctx.subtract, "*": ctx.multiply, "/": ctx.divide,
+                "//": ctx.divide_int, "%": ctx.remainder, "**": ctx.power,
+                "pos": ctx.plus, "neg": ctx.minus}
+    return {"+": lambda a, b: a + b, "-": lambda a, b: a - b, "*": lambda a, b: a * b,
+            "/": lambda a, b: a / b, "//": lambda a, b: a // b, "%": lambda a, b: a % b,
+            "**": _power, "pos": lambda a: +a, "neg": lambda a: -a}
+
+
+def _decimal_context() -> Context:
+    return Context(prec=DECIMAL_PRECISION, Emax=MAX_RESULT_DIGITS, Emin=-MAX_RESULT_DIGITS,
+                   traps=[InvalidOperation, DivisionByZero, Overflow])
+
+
+def _signalled(error: InvalidOperation, signal: type) -> bool:
+    # The C decimal module raises InvalidOperation listing the specific signals in args[0]
+    signals = error.args[0] if error.args and isinstance(error.args[0], list) else [type(error)]
+    return any(issubclass(s, signal) for s in signals)
+
+
+def run(compiled: CompiledExpression, budget: float = DEFAULT_BUDGET) -> Number:
+    """Evaluate a compiled expression, checking cost before and the deadline after each operation."""
+    deadline = time.perf_counter() + budget
+    ops = _operations(compiled.mode)
+    stack: List[Number] = []
+    try:
+        for op, value in compiled.program:
+            if op == "push":
+                stack.append(value)
+                continue
+            if op in ("pos", "neg"):
+                stack.append(ops[op](stack.pop()))
+            else:
+                b = stack.pop()
+                a = stack.pop()
+                if compiled.mode != "decimal":
+                    _check_cost(op, a, b)
+                result = ops[op](a, b)
+                if isinstance(result, complex):
+                    raise ExpressionError("Result is not a real number")
+                # Float overflow is inf rather than an error; Decimal 0 ** -n is Infinity without a signal
+                if (isinstance(result, float) and not math.isfinite(result)
+                        or isinstance(result, Decimal) and not result.is_finite()):
+                    raise ExpressionError("Result is not finite")
+                stack.append(result)
+            if time.perf_counter() > deadline:
+                raise ExpressionTimeout(f"Evaluation took longer than {budget:g}s")
+    except ZeroDivisionError:
+        raise ExpressionError("Division by zero") from None
+    except DivisionByZero:
+        raise ExpressionError("Division by zero") from None
+    except InvalidOperation as e:
+        if _signalled(e, DivisionImpossible):
+            # Decimal // and % need the whole integer quotient within the precision
+            raise ExpressionError(f"Integer quotient has more than {DECIMAL_PRECISION} digits, "
+                                  f"the decimal precision; try fraction mode") from None
+        raise ExpressionError("Undefined result") from None
+    except (Overflow, OverflowError):
+        raise ExpressionTooCostly("Result is too large") from None
+    return stack[0]
+
+
+def evaluate(text: str, mode: str = "float", budget: float = DEFAULT_BUDGET) -> Number:
+    """The value of text. Raises ExpressionError (a ValueError) or ExpressionTimeout."""
+    return run(compile_expression(text, mode), budget)
+
+
+def format_number(value: Number) -> str:
+    if isinstance(value, Fraction) and value.denominator != 1:
+        return f"{value.numerator}/{value.denominator}"
+    if isinstance(value, Fraction):
+        return str(value.numerator)
+    if isinstance(value, Decimal) and not value:
+        # An underflowed zero keeps its exponent, as in 0E-4049
+        return "0"
+    if isinstance(value, Decimal):
+        return format(value.normalize(_decimal_context()), "f") if abs(value.adjusted()) < 30 else str(value)
+    return str(value)
+
+
+def calculate(text: str, mode: str = "float", budget: float = DEFAULT_BUDGET) -> str:
+    """evaluate(), formatted for display."""
+    return format_number(evaluate(text, mode, budget))
+
+
+def _compile_cache_metrics():
+    info = compile_expression.cache_info()
+    return cache_family("semantic_expression_cache", {"compiled": (info.hits, info.misses)})
+
+
+metrics.collector(_compile_cache_metrics)
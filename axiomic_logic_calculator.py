@@ -2,15 +2,62 @@
 
 """
 This module implements an improved GUI and grouped layout for the Axiomic Logic Calculator.
+Calculations run in a background worker, so the window stays responsive and can cancel them.
 """
 
 import tkinter as tk
 from tkinter import ttk
 
+from gui_background import BackgroundRunner, report_progress
+from logic_engine import compile_formula, fits_truth_table
+from prime_distribution import iter_prime_distribution
+from semantic_axioms import axiom_colors, axioms
+from semantic_core import semantic_equivalence, semantic_logic
+
+# Largest bound the prime scan accepts, several seconds of sieving
+MAX_PRIME_SCAN = 10**9
+
+def logic_job(input_value):
+    # A formula such as "a & b -> c", or two formulas joined by == to test equivalence
+    left, equals, right = input_value.replace("≡", "==").partition("==")
+    yield 0.0, "Parsing"
+    try:
+        compiled = compile_formula(left)
+        variables = set(compiled.variables) | (set(compile_formula(right).variables) if equals else set())
+    except ValueError as e:
+        return str(e)
+    backend = "decision diagram" if equals or not fits_truth_table(compiled) else "truth table"
+    status = f"Evaluating {len(variables)} variables by {backend}"
+
+    def progress(position, length):
+        report_progress(position / length, status)
+    if equals:
+        return semantic_equivalence(left, right, progress=progress)
+    return semantic_logic(input_value, progress=progress)
+
+def prime_job(input_value):
+    # Count the primes up to n, sieving segment by segment
+    try:
+        n = int(input_value.strip())
+    except ValueError:
+        return "Enter a whole number n to count the primes up to n."
+    if n > MAX_PRIME_SCAN:
+        return f"Input too large! Try <= {MAX_PRIME_SCAN:,}."
+    count = 0
+    for dist in iter_prime_distribution(n) if n >= 2 else ():
+        count = dist.prime_count
+        yield dist.limit / n, f"Sieved up to {dist.limit:,}: {count:,} primes"
+    axiom = count % 11
+    return f"π({n}) = {count} → Axiom {axiom}: {axiom_colors[axiom]} {axioms[axiom]}"
+
+JOBS = {"Logic": logic_job, "Primes": prime_job}
+
 class AxiomicLogicCalculator:
     def __init__(self, root):
         self.root = root
         self.root.title("Axiomic Logic Calculator")
+        self.runner = BackgroundRunner(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.create_widgets()
 
     def create_widgets(self):
@@ -18,32 +65,74 @@ class AxiomicLogicCalculator:
         frame = ttk.Frame(self.root)
         frame.pack(padx=10, pady=10)
 
-        # Input fields
+        # Input fields, read as a formula or as the bound of a prime count
+        self.mode = tk.StringVar(value="Logic")
+        modes = ttk.Frame(frame)
+        modes.grid(row=0, column=1, sticky='W')
+        for name in JOBS:
+            ttk.Radiobutton(modes, text=name, value=name, variable=self.mode).pack(side='left', padx=2)
         self.input_label = ttk.Label(frame, text="Input:")
-        self.input_label.grid(row=0, column=0, sticky='W')
-        self.input_entry = ttk.Entry(frame)
-        self.input_entry.grid(row=0, column=1)
+        self.input_label.grid(row=1, column=0, sticky='W')
+        self.input_entry = ttk.Entry(frame, width=60)
+        self.input_entry.grid(row=1, column=1)
+        self.input_entry.bind("<Return>", lambda event: self.calculate())
 
-        # Button to calculate
-        self.calculate_button = ttk.Button(frame, text="Calculate", command=self.calculate)
-        self.calculate_button.grid(row=1, columnspan=2, pady=5)
+        # Buttons to calculate and to cancel a running calculation
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=2, columnspan=2, pady=5)
+        self.calculate_button = ttk.Button(buttons, text="Calculate", command=self.calculate)
+        self.calculate_button.pack(side='left', padx=2)
+        self.cancel_button = ttk.Button(buttons, text="Cancel", command=self.cancel, state='disabled')
+        self.cancel_button.pack(side='left', padx=2)
 
         # Output field
         self.output_label = ttk.Label(frame, text="Output:")
-        self.output_label.grid(row=2, column=0, sticky='W')
-        self.output_entry = ttk.Entry(frame, state='readonly')
-        self.output_entry.grid(row=2, column=1)
+        self.output_label.grid(row=3, column=0, sticky='W')
+        self.output_entry = ttk.Entry(frame, state='readonly', width=60)
+        self.output_entry.grid(row=3, column=1)
+
+        # Progress of the running calculation
+        self.progress = ttk.Progressbar(frame, maximum=1.0, length=300)
+        self.progress.grid(row=4, column=1, sticky='WE', pady=(5, 0))
+        self.status_label = ttk.Label(frame, text="")
+        self.status_label.grid(row=5, column=1, sticky='W')
 
     def calculate(self):
-        # Placeholder for calculation logic
-        input_value = self.input_entry.get()
-        output_value = "Result of calculation"  # Replace with actual calculation
+        # Rapid repeated clicks collapse into one calculation of the latest input
+        self.runner.debounce("calculate", self.start_calculation)
+
+    def start_calculation(self):
+        self.runner.submit(JOBS[self.mode.get()], self.input_entry.get(), key="calculate", on_done=self.show_result,
+                           on_error=lambda message: self.show_result(f"Error: {message}"),
+                           on_progress=self.show_progress)
+        self.cancel_button.config(state='normal')
+        self.show_progress(0.0, "Starting")
+
+    def cancel(self):
+        self.runner.cancel()
+        self.finish("Cancelled")
+
+    def show_progress(self, fraction, text):
+        self.progress['value'] = fraction
+        self.status_label.config(text=text)
+
+    def show_result(self, output_value):
         self.output_entry.config(state='normal')
         self.output_entry.delete(0, tk.END)
         self.output_entry.insert(0, output_value)
         self.output_entry.config(state='readonly')
+        self.finish("")
+
+    def finish(self, status):
+        self.progress['value'] = 0.0
+        self.status_label.config(text=status)
+        self.cancel_button.config(state='disabled')
+
+    def close(self):
+        self.runner.shutdown()
+        self.root.destroy()
 
 if __name__ == '__main__':
     root = tk.Tk()
     app = AxiomicLogicCalculator(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -0,0 +1,333 @@
+"""
+Benchmark suite with size tiers, baselines and scaling curves.
+
+Every benchmark is run at several input sizes. Each timing is the best of a
+few repeats of an auto-calibrated loop, so one measurement takes at least
+MIN_MEASURE_TIME. Results are written as JSON with machine metadata. A run
+can be compared with a stored baseline and fails when any benchmark slows
+down past its threshold. The scaling report fits log(time) against
+log(size) between tiers, so a change in algorithmic complexity (a sieve that
+turns quadratic, say) shows up as a jump in the exponent even when the
+absolute times still look fine.
+
+    python benchmarks.py --output bench-1.4.json
+    python benchmarks.py --quick --only is_prime prime_factorization
+    python benchmarks.py --baseline bench-1.3.json --threshold 0.25 --threshold prime_factorization=0.5
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from calculus_engine import CalculusEngine
+from factorization import factorize
+from goldbach import goldbach_min_pair, goldbach_table
+from logic_engine import analyze
+from primality import is_prime, next_prime
+from prime_counting import nth_prime
+from prime_distribution import prime_distribution
+from prime_sieve import primes_up_to
+import result_cache
+from semantic_core import compose_idea
+
+MIN_MEASURE_TIME = 0.05
+REPEATS = 3
+DEFAULT_THRESHOLD = 0.2
+SEED = 20240611
+
+# Tiers repeat the same inputs; they measure the computation, not the result cache
+result_cache.results.enabled = False
+
+
+class Tier(NamedTuple):
+    label: str
+    size: int
+    # Builds the inputs outside the timed region and returns the call to time
+    setup: Callable[[], Callable[[], Any]]
+    quick: bool = True
+
+
+def _semiprime(digits: int) -> int:
+    rng = random.Random(SEED + digits)
+    low = digits // 2
+    p = next_prime(rng.randrange(10 ** (low - 1), 10 ** low))
+    q = next_prime(rng.randrange(10 ** (digits - low - 1), 10 ** (digits - low)))
+    return p * q
+
+
+def _is_prime_tier(bits: int) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        rng = random.Random(SEED + bits)
+        values = [rng.getrandbits(bits) | 1 | (1 << (bits - 1)) for _ in range(1000)]
+        return lambda: [is_prime(v) for v in values]
+    return setup
+
+
+def _compose_tier(length: int) -> Callable[[], Callable[[], Any]]:
+    def setup():
+        rng = random.Random(SEED + length)
+        path = [rng.randrange(1000) for _ in range(length)]
+        return lambda: compose_idea(path)
+    return setup
+
+
+_engine: Optional[CalculusEngine] = None
+
+
+def _calculus_tier(op: str, expr: str) -> Callable[[], Callable[[], Any]]:
+    # One worker, started before timing. Each call clears the engine cache and
+    # scales expr by a new constant so sympy's own cache cannot answer either.
+    def setup():
+        global _engine
+        if _engine is None:
+            _engine = CalculusEngine(workers=1)
+            _engine.derivative("x", "x")
+        calls = iter(range(2, sys.maxsize))
+
+        def run():
+            _engine.clear()
+            return _engine.compute(op, f"{next(calls)}*({expr})", "x")
+        return run
+    return setup
+
+
+def _formula(variables: int) -> str:
+    # An implication chain or'd with a parity: neither backend can shortcut it
+    chain = " & ".join(f"(x{k} -> x{k + 1})" for k in range(variables // 2 - 1))
+    parity = " ^ ".join(f"y{k}" for k in range(variables - variables // 2))
+    return f"({chain}) | ({parity})"
+
+
+def _polynomial(degree: int) -> str:
+    return " + ".join(f"{k + 1}*x**{k}" for k in range(degree + 1))
+
+
+BENCHMARKS: Dict[str, List[Tier]] = {
+    "is_prime": [
+        Tier("1000 × 32-bit", 32, _is_prime_tier(32)),
+        Tier("1000 × 64-bit", 64, _is_prime_tier(64)),
+        Tier("1000 × 256-bit", 256, _is_prime_tier(256)),
+        Tier("1000 × 1024-bit", 1024, _is_prime_tier(1024), quick=False),
+    ],
+    "primes_up_to": [
+        Tier("10^3", 10**3, lambda: lambda: primes_up_to(10**3)),
+        Tier("10^5", 10**5, lambda: lambda: primes_up_to(10**5)),
+        Tier("10^7", 10**7, lambda: lambda: primes_up_to(10**7), quick=False),
+    ],
+    "prime_distribution": [
+        Tier("10^3", 10**3, lambda: lambda: prime_distribution(10**3)),
+        Tier("10^6", 10**6, lambda: lambda: prime_distribution(10**6)),
+        Tier("10^8", 10**8, lambda: lambda: prime_distribution(10**8), quick=False),
+    ],
+    "nth_prime": [
+        Tier("10^3", 10**3, lambda: lambda: nth_prime(10**3)),
+        Tier("10^5", 10**5, lambda: lambda: nth_prime(10**5)),
+        Tier("10^7", 10**7, lambda: lambda: nth_prime(10**7)),
+        Tier("10^9", 10**9, lambda: lambda: nth_prime(10**9), quick=False),
+    ],
+    "goldbach_pair": [
+        Tier("n = 10^6", 10**6, lambda: lambda: goldbach_min_pair(10**6)),
+        Tier("n = 10^18", 10**18, lambda: lambda: goldbach_min_pair(10**18)),
+    ],
+    "goldbach_table": [
+        Tier("10^4", 10**4, lambda: lambda: goldbach_table(10**4)),
+        Tier("10^5", 10**5, lambda: lambda: goldbach_table(10**5)),
+        Tier("10^6", 10**6, lambda: lambda: goldbach_table(10**6), quick=False),
+    ],
+    "prime_factorization": [
+        Tier("20-digit semiprime", 20, lambda: (lambda n: lambda: factorize(n, None))(_semiprime(20))),
+        Tier("30-digit semiprime", 30, lambda: (lambda n: lambda: factorize(n, None))(_semiprime(30))),
+        Tier("40-digit semiprime", 40, lambda: (lambda n: lambda: factorize(n, None))(_semiprime(40)),
+             quick=False),
+    ],
+    "logic_truth_table": [
+        Tier("12 variables", 12, lambda: lambda: analyze(_formula(12))),
+        Tier("20 variables", 20, lambda: lambda: analyze(_formula(20))),
+        Tier("24 variables", 24, lambda: lambda: analyze(_formula(24)), quick=False),
+    ],
+    "logic_bdd": [
+        Tier("32 variables", 32, lambda: lambda: analyze(_formula(32))),
+        Tier("128 variables", 128, lambda: lambda: analyze(_formula(128)), quick=False),
+    ],
+    "compose_idea": [
+        Tier("path 10^2", 10**2, _compose_tier(10**2)),
+        Tier("path 10^4", 10**4, _compose_tier(10**4)),
+        Tier("path 10^5", 10**5, _compose_tier(10**5), quick=False),
+    ],
+    "derivative": [
+        Tier("degree 5", 5, _calculus_tier("derivative", _polynomial(5))),
+        Tier("degree 40", 40, _calculus_tier("derivative", _polynomial(40))),
+    ],
+    "integral": [
+        Tier("degree 5", 5, _calculus_tier("integral", _polynomial(5))),
+        Tier("degree 40", 40, _calculus_tier("integral", _polynomial(40))),
+        Tier("x**2*exp(x)*sin(x)", 0, _calculus_tier("integral", "x**2*exp(x)*sin(x)"), quick=False),
+    ],
+}
+
+
+def measure(fn: Callable[[], Any], repeats: int = REPEATS) -> Tuple[float, float, int]:
+    """(best, median) seconds per call and the loop count used."""
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_MEASURE_TIME:
+            break
+        loops *= 10 if elapsed < MIN_MEASURE_TIME / 10 else 2
+    timings = [elapsed / loops]
+    for _ in range(repeats - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        timings.append((time.perf_counter() - started) / loops)
+    return min(timings), float(np.median(timings)), loops
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return proc.stdout.strip() or None
+
+
+def machine_metadata() -> Dict[str, Any]:
+    import sympy
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "sympy": sympy.__version__,
+        "revision": _git_revision(),
+    }
+
+
+def scaling(results: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Empirical exponent k in time ~ size^k between successive tiers of each benchmark."""
+    curves: Dict[str, List[Dict[str, Any]]] = {}
+    by_name: Dict[str, List[Dict[str, Any]]] = {}
+    for row in results:
+        if row["size"] > 0:
+            by_name.setdefault(row["benchmark"], []).append(row)
+    for name, rows in by_name.items():
+        rows.sort(key=lambda row: row["size"])
+        curves[name] = [
+            {"from": lo["tier"], "to": hi["tier"],
+             "exponent": round(math.log(hi["best_s"] / lo["best_s"]) / math.log(hi["size"] / lo["size"]), 3)}
+            for lo, hi in zip(rows, rows[1:]) if hi["size"] > lo["size"] and lo["best_s"] > 0
+        ]
+    return curves
+
+
+def run_suite(names: Optional[List[str]] = None, quick: bool = False, repeats: int = REPEATS,
+              progress: Callable[[str], None] = lambda line: None) -> Dict[str, Any]:
+    results = []
+    for name in names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})")
+        for tier in BENCHMARKS[name]:
+            if quick and not tier.quick:
+                continue
+            best, median, loops = measure(tier.setup(), repeats)
+            results.append({"benchmark": name, "tier": tier.label, "size": tier.size,
+                            "best_s": best, "median_s": median, "loops": loops, "repeats": repeats})
+            progress(f"{name:<20} {tier.label:<22} {_format_seconds(best):>10}  (x{loops})")
+    if _engine is not None:
+        _engine.shutdown()
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_metadata(),
+        "quick": quick,
+        "results": results,
+        "scaling": scaling(results),
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], default_threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Optional[Dict[str, float]] = None) -> List[str]:
+    """Tiers slower than baseline by more than their threshold (a fraction)."""
+    thresholds = thresholds or {}
+    before = {(row["benchmark"], row["tier"]): row["best_s"] for row in baseline["results"]}
+    regressions = []
+    for row in report["results"]:
+        old = before.get((row["benchmark"], row["tier"]))
+        limit = thresholds.get(row["benchmark"], default_threshold)
+        if old and row["best_s"] > old * (1 + limit):
+            regressions.append(f"{row['benchmark']} [{row['tier']}]: {_format_seconds(old)} -> "
+                               f"{_format_seconds(row['best_s'])} (+{row['best_s'] / old - 1:.0%}, "
+                               f"allowed +{limit:.0%})")
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds / 1e-9:.3g} ns"
+
+
+def format_scaling(report: Dict[str, Any]) -> str:
+    lines = ["", "Scaling (time ~ size^k):"]
+    for name, steps in report["scaling"].items():
+        parts = ", ".join(f"{step['from']} → {step['to']}: k={step['exponent']:.2f}" for step in steps)
+        lines.append(f"  {name:<20} {parts}")
+    return "\n".join(lines)
+
+
+def _parse_threshold(text: str) -> Tuple[Optional[str], float]:
+    name, _, value = text.rpartition("=")
+    try:
+        return (name or None), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected FRACTION or BENCHMARK=FRACTION") from None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("--only", nargs="+", metavar="BENCHMARK", help=f"any of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="skip the largest tiers")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=_parse_threshold, action="append", default=[],
+                        help=f"allowed slowdown as a fraction (default {DEFAULT_THRESHOLD}); "
+                             "BENCHMARK=FRACTION overrides one benchmark (repeatable)")
+    args = parser.parse_args()
+
+    default_threshold = DEFAULT_THRESHOLD
+    overrides = {}
+    for name, value in args.threshold:
+        if name is None:
+            default_threshold = value
+        else:
+            overrides[name] = value
+
+    report = run_suite(args.only, args.quick, args.repeats, progress=print)
+    print(format_scaling(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), default_threshold, overrides)
+        if regressions:
+            sys.exit("Performance regressions:\n  " + "\n  ".join(regressions))
+        print("No regressions against baseline.")
@@ -0,0 +1,332 @@
+"""
+Cached, time-boxed symbolic calculus.
+
+Every derivative/integral runs in a small pool of sympy worker processes so
+a pathological expression can never block the Streamlit script thread. A
+call that overruns its share of the budget gets its worker killed (and
+respawned on a background thread) and moves on to the next, cheaper
+strategy:
+
+    integrate -> risch -> meijerg -> term-wise series integration
+
+The budget is one deadline across all strategies: each gets the smaller of
+its share and whatever time is left, including time spent waiting for a
+free worker. Only the very first call waits for the workers' sympy import
+before its clock starts.
+
+Results and parsed expressions are kept in an LRU keyed on the normalized
+(expr, var, op), so repeat queries never leave the calling process.
+"""
+
+import atexit
+import multiprocessing
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+from instrumentation import cache_family, metrics
+
+DEFAULT_BUDGET = 10.0
+CALCULUS_WORKERS = 2
+CACHE_SIZE = 512
+SERIES_ORDER = 8
+
+# (strategy, share of the budget) tried in order for each operation
+STRATEGIES = {
+    "parse": [("sympify", 1.0)],
+    "singularities": [("singularities", 1.0)],
+    "derivative": [("diff", 1.0)],
+    "integral": [("integrate", 0.6), ("risch", 0.15), ("meijerg", 0.15), ("series", 0.1)],
+}
+
+
+class CalculusTimeout(TimeoutError):
+    """No strategy for an operation produced a result and at least one ran out of its time budget."""
+
+
+class CalculusError(RuntimeError):
+    """Every strategy for an operation failed without running out of time."""
+
+
+class CalculusResult(NamedTuple):
+    op: str
+    expr: str
+    var: str
+    strategy: str
+    value: Any
+    pretty: str
+    parsed: Any
+
+
+def normalize(expr: str) -> str:
+    return "".join(expr.split())
+
+
+def _apply(sp, op: str, parsed, x, strategy: str):
+    if strategy == "sympify":
+        return parsed
+    if strategy == "singularities":
+        # Real and complex points where parsed is undefined, possibly an infinite ImageSet
+        return sp.singularities(parsed, x)
+    if strategy == "diff":
+        return sp.diff(parsed, x)
+    if strategy == "integrate":
+        return sp.integrate(parsed, x)
+    if strategy == "risch":
+        return sp.integrate(parsed, x, risch=True)
+    if strategy == "meijerg":
+        return sp.integrate(parsed, x, meijerg=True)
+    if strategy == "series":
+        polynomial = sp.series(parsed, x, 0, SERIES_ORDER).removeO()
+        return sp.integrate(polynomial, x) + sp.O(x ** (SERIES_ORDER + 1))
+    raise ValueError(f"Unknown strategy: {strategy}")
+
+
+def _worker_main(conn) -> None:
+    import sympy as sp
+
+    conn.send(("ready", None))
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        op, expr, parsed, var, strategy = message
+        try:
+            if parsed is None:
+                parsed = sp.sympify(expr)
+            value = _apply(sp, op, parsed, sp.Symbol(var), strategy)
+            status = "partial" if strategy != "series" and value.has(sp.Integral) else "ok"
+            conn.send((status, (parsed, value, sp.pretty(value))))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self._ctx = ctx
+        self._process = None
+        self._conn = None
+        # Guards the (process, conn) swap against a respawn thread and atexit shutdown
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    @property
+    def alive(self) -> bool:
+        process = self._process
+        return process is not None and process.is_alive()
+
+    def start(self) -> None:
+        """Spawn the process and wait out its sympy import."""
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        process.start()
+        child.close()
+        with self._lock:
+            stopped = self._stopped
+            if not stopped:
+                self._process, self._conn = process, parent
+        if stopped:
+            # stop() ran while this process was spawning
+            process.kill()
+            process.join()
+            parent.close()
+            return
+        try:
+            parent.recv()
+        except (EOFError, OSError):
+            self.kill()
+
+    def _take(self) -> Tuple[Any, Any]:
+        with self._lock:
+            process, conn = self._process, self._conn
+            self._process = self._conn = None
+        return process, conn
+
+    def kill(self) -> None:
+        process, conn = self._take()
+        if process is not None:
+            process.kill()
+            process.join()
+            conn.close()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+        process, conn = self._take()
+        if process is None:
+            return
+        if process.is_alive():
+            try:
+                conn.send(None)
+                process.join(1)
+            except OSError:
+                pass
+        process.kill()
+        process.join()
+        conn.close()
+
+    def call(self, message: tuple, timeout: float) -> Tuple[str, Any]:
+        """Send message and wait up to timeout seconds; kills the worker and raises TimeoutError past it."""
+        conn = self._conn
+        if conn is None or not self.alive:
+            return "error", "calculus worker is not running"
+        try:
+            conn.send(message)
+            if conn.poll(timeout):
+                return conn.recv()
+        except (EOFError, OSError):
+            self.kill()
+            return "error", "calculus worker exited unexpectedly"
+        self.kill()
+        raise TimeoutError
+
+
+class CalculusEngine:
+    def __init__(self, workers: int = CALCULUS_WORKERS, cache_size: int = CACHE_SIZE):
+        self.cache_size = cache_size
+        ctx = multiprocessing.get_context("spawn")
+        self._workers: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        for _ in range(workers):
+            worker = _Worker(ctx)
+            self._all.append(worker)
+            self._workers.put(worker)
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._closed = False
+        self._results: "OrderedDict[tuple, CalculusResult]" = OrderedDict()
+        self._parsed: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, cache: OrderedDict, key, value) -> None:
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _cached(self, cache: OrderedDict, key) -> Optional[Any]:
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _start_workers(self) -> None:
+        # First use only: every worker imports sympy at once, before any budget runs
+        with self._start_lock:
+            if self._started:
+                return
+            threads = [threading.Thread(target=worker.start, daemon=True) for worker in self._all]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self._started = True
+
+    def _release(self, worker: _Worker) -> None:
+        """Return worker to the pool, respawning it off the request path if it was killed."""
+        if worker.alive:
+            self._workers.put(worker)
+            return
+
+        def respawn() -> None:
+            if not self._closed:
+                worker.start()
+            self._workers.put(worker)
+        threading.Thread(target=respawn, name="calculus-respawn", daemon=True).start()
+
+    def compute(self, op: str, expr: str, var: str, budget: float = DEFAULT_BUDGET) -> CalculusResult:
+        """
+        Run op (a key of STRATEGIES) on expr with respect to var.
+        Raises ValueError for bad input, CalculusTimeout when no strategy
+        succeeded and some ran out of budget seconds, and CalculusError
+        when every strategy failed outright.
+        """
+        if op not in STRATEGIES:
+            raise ValueError(f"Unknown calculus operation: {op}")
+        key = (normalize(expr), var.strip(), op)
+        cached = self._cached(self._results, key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        self._start_workers()
+
+        deadline = time.monotonic() + budget
+        errors = []
+        timed_out = False
+        partial = None
+        for strategy, share in STRATEGIES[op]:
+            parsed = self._cached(self._parsed, key[0])
+            stop = min(time.monotonic() + budget * share, deadline)
+            try:
+                worker = self._workers.get(timeout=max(stop - time.monotonic(), 0.0))
+            except queue.Empty:
+                errors.append(f"{strategy} found no free worker")
+                timed_out = True
+                continue
+            started = time.perf_counter()
+            try:
+                status, payload = worker.call((op, key[0], parsed, key[1], strategy),
+                                              max(stop - time.monotonic(), 0.0))
+            except TimeoutError:
+                metrics.observe(f"calculus.{strategy}", time.perf_counter() - started, len(key[0]), error=True)
+                errors.append(f"{strategy} timed out")
+                timed_out = True
+                continue
+            finally:
+                self._release(worker)
+            metrics.observe(f"calculus.{strategy}", time.perf_counter() - started, len(key[0]), status == "error")
+            if status == "error":
+                if parsed is None and payload.startswith("Sympify"):
+                    raise ValueError(payload)
+                errors.append(payload)
+                continue
+            self._remember(self._parsed, key[0], payload[0])
+            result = CalculusResult(op, expr, key[1], strategy, payload[1], payload[2], payload[0])
+            if status == "partial":
+                # Keep the unevaluated form in case no later strategy does better
+                partial = partial or result
+                errors.append(f"{strategy} left it unevaluated")
+                continue
+            self._remember(self._results, key, result)
+            return result
+        if partial is not None:
+            self._remember(self._results, key, partial)
+            return partial
+        if timed_out:
+            raise CalculusTimeout(f"No result within {budget:g}s ({'; '.join(errors)})")
+        raise CalculusError(f"No result ({'; '.join(errors)})")
+
+    def parse(self, expr: str, var: str, budget: float = DEFAULT_BUDGET) -> CalculusResult:
+        return self.compute("parse", expr, var, budget)
+
+    def singularities(self, expr: str, var: str, budget: float = DEFAULT_BUDGET) -> CalculusResult:
+        return self.compute("singularities", expr, var, budget)
+
+    def derivative(self, expr: str, var: str, budget: float = DEFAULT_BUDGET) -> CalculusResult:
+        return self.compute("derivative", expr, var, budget)
+
+    def integral(self, expr: str, var: str, budget: float = DEFAULT_BUDGET) -> CalculusResult:
+        return self.compute("integral", expr, var, budget)
+
+    def clear(self) -> None:
+        """Forget cached results and parsed expressions (the workers stay up)."""
+        with self._lock:
+            self._results.clear()
+            self._parsed.clear()
+
+    def shutdown(self) -> None:
+        self._closed = True
+        for worker in self._all:
+            worker.stop()
+
+
+calculus = CalculusEngine()
+atexit.register(calculus.shutdown)
+metrics.collector(lambda: cache_family("semantic_calculus_cache", {"results": (calculus.hits, calculus.misses)}))
@@ -0,0 +1,246 @@
+"""
+Vectorized numeric evaluation of an expression, its derivative and its
+antiderivative.
+
+The symbolic work goes through the time-boxed calculus engine; each of f,
+f' and F is compiled on first use with sympy.lambdify to a NumPy function
+and cached per (expression, variable), so a derivative that will not
+compile costs only its own column. Grids of up to MAX_GRID_POINTS are
+evaluated in a single call. Definite integrals use the closed-form
+antiderivative when f has no singularity inside the interval, and
+vectorized adaptive Gauss-Kronrod quadrature otherwise; an integral that
+quadrature cannot pin down raises DivergentIntegral rather than returning
+a number.
+"""
+
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from calculus_engine import DEFAULT_BUDGET, CalculusError, calculus, normalize
+from instrumentation import cache_family, metrics, timed
+
+MAX_GRID_POINTS = 10**6
+QUAD_TOLERANCE = 1e-10
+# Large integrals are held to this relative error instead of QUAD_TOLERANCE
+QUAD_RELATIVE_TOLERANCE = 1e-12
+QUAD_MAX_INTERVALS = 4096
+# Bisections before an interval that still misses the tolerance counts as divergent
+QUAD_MAX_DEPTH = 200
+# Interior points where f must be finite before the closed form is trusted
+SINGULARITY_SAMPLES = 4096
+COLUMNS = ("f", "f'", "F")
+
+# 7-point Gauss / 15-point Kronrod nodes and weights on [-1, 1]
+_KRONROD_NODES = np.array([
+    0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245, 0.0,
+])
+_KRONROD_WEIGHTS = np.array([
+    0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649, 0.209482141084727828012999174891714,
+])
+_GAUSS_WEIGHTS = np.array([
+    0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975, 0.417959183673469387755102040816327,
+])
+_NODES = np.concatenate([-_KRONROD_NODES[:-1], _KRONROD_NODES[::-1]])
+_K_WEIGHTS = np.concatenate([_KRONROD_WEIGHTS[:-1], _KRONROD_WEIGHTS[::-1]])
+_G_WEIGHTS = np.zeros(15)
+_G_WEIGHTS[[1, 3, 5, 7, 9, 11, 13]] = np.concatenate([_GAUSS_WEIGHTS[:-1], _GAUSS_WEIGHTS[::-1]])
+
+
+class DivergentIntegral(ValueError):
+    """The integral diverges, or quadrature did not converge to its tolerance."""
+
+
+class _NoColumn(Exception):
+    """The column has no NumPy form; raised rather than returned so lru_cache keeps retrying timeouts."""
+
+
+def _vectorize(fn: Callable) -> Callable[[np.ndarray], np.ndarray]:
+    # lambdify returns a scalar for constant expressions; broadcast it
+    def evaluate(x: np.ndarray) -> np.ndarray:
+        with np.errstate(all="ignore"):
+            y = np.asarray(fn(x), dtype=complex)
+        y = np.where(np.abs(y.imag) > 1e-12, np.nan, y.real)
+        return np.broadcast_to(y, np.shape(x)).astype(float)
+    return evaluate
+
+
+def _lambdify(sp, x, expr) -> Callable[[np.ndarray], np.ndarray]:
+    fn = sp.lambdify(x, expr, "numpy")
+    try:
+        with np.errstate(all="ignore"):
+            fn(np.linspace(0.5, 1.5, 3))
+    except (NameError, TypeError, AttributeError):
+        # Special functions NumPy lacks (Si, li, ...) fall back to elementwise mpmath
+        scalar = sp.lambdify(x, expr, "mpmath")
+
+        def point(v):
+            try:
+                return complex(scalar(v))
+            except (ValueError, ZeroDivisionError, OverflowError):
+                # mpmath raises at poles (gamma at 0, ...) where NumPy would give inf or nan
+                return complex(np.nan)
+        fn = np.frompyfunc(point, 1, 1)
+    return _vectorize(fn)
+
+
+@lru_cache(maxsize=384)
+def _compile(expr: str, var: str, column: str, budget: float) -> Callable[[np.ndarray], np.ndarray]:
+    import sympy as sp
+
+    x = sp.Symbol(var)
+    if column == "f":
+        target = calculus.parse(expr, var, budget).value
+    elif column == "f'":
+        target = calculus.derivative(expr, var, budget).value
+    else:
+        integral = calculus.integral(expr, var, budget)
+        if integral.strategy not in ("integrate", "risch", "meijerg") or integral.value.has(sp.Integral):
+            raise _NoColumn("no closed-form antiderivative")
+        target = integral.value
+    try:
+        return _lambdify(sp, x, target)
+    except Exception as e:
+        # e.g. an unevaluated Derivative(sign(x), x) that NumPy has no printer for
+        raise _NoColumn(f"{type(e).__name__}: {e}") from None
+
+
+def _compile_cache_metrics():
+    info = _compile.cache_info()
+    return cache_family("semantic_calculus_cache", {"lambdify": (info.hits, info.misses)})
+
+
+metrics.collector(_compile_cache_metrics)
+
+
+def compile_column(expr: str, var: str, column: str,
+                   budget: float = DEFAULT_BUDGET) -> Optional[Callable[[np.ndarray], np.ndarray]]:
+    """
+    NumPy callable for column "f" (expr), "f'" (its derivative) or "F" (its
+    closed-form antiderivative). None when f' or F has no NumPy form or
+    timed out; f itself raises ValueError or CalculusTimeout instead.
+    """
+    if column not in COLUMNS:
+        raise ValueError(f"Unknown column: {column}")
+    try:
+        return _compile(normalize(expr), var.strip(), column, budget)
+    except (_NoColumn, TimeoutError, CalculusError) as e:
+        if column != "f":
+            return None
+        if isinstance(e, TimeoutError):
+            raise
+        raise ValueError(f"{expr} cannot be evaluated numerically ({e})") from None
+
+
+@timed(size=lambda expr, var, lo, hi, points: points)
+def evaluate_grid(expr: str, var: str, lo: float, hi: float, points: int) -> Dict[str, np.ndarray]:
+    """Evaluate f, f' and F over an even grid on [lo, hi]; f' and F are omitted when they do not compile."""
+    if not 2 <= points <= MAX_GRID_POINTS:
+        raise ValueError(f"Use between 2 and {MAX_GRID_POINTS:,} points.")
+    x = np.linspace(lo, hi, points)
+    columns = {var: x}
+    for column in COLUMNS:
+        fn = compile_column(expr, var, column)
+        if fn is not None:
+            columns[column] = fn(x)
+    return columns
+
+
+def adaptive_quadrature(f: Callable[[np.ndarray], np.ndarray], a: float, b: float,
+                        tol: float = QUAD_TOLERANCE) -> Tuple[float, float]:
+    """
+    Vectorized adaptive Gauss-Kronrod (G7/K15) quadrature of f over [a, b].
+    Returns (value, error estimate). Intervals meeting their share of tol
+    are summed and the rest split, until the error left in them fits in
+    tol too; an interval with a non-finite sample is always split. Raises
+    DivergentIntegral when that takes more than QUAD_MAX_DEPTH bisections,
+    QUAD_MAX_INTERVALS open intervals or intervals narrower than a float
+    can split, as next to a pole.
+    """
+    if a == b:
+        return 0.0, 0.0
+    sign = 1.0
+    if a > b:
+        a, b, sign = b, a, -1.0
+    lo = np.array([a], dtype=float)
+    hi = np.array([b], dtype=float)
+    total = error = 0.0
+    for _ in range(QUAD_MAX_DEPTH):
+        half = (hi - lo) / 2
+        centre = (hi + lo) / 2
+        with np.errstate(all="ignore"):
+            y = np.asarray(f(centre[:, None] + half[:, None] * _NODES), dtype=float)
+        finite = np.isfinite(y).all(axis=1)
+        y[~finite] = 0.0
+        kronrod = half * (y @ _K_WEIGHTS)
+        gauss = half * (y @ _G_WEIGHTS)
+        err = np.abs(kronrod - gauss)
+        allowed = max(tol, QUAD_RELATIVE_TOLERANCE * abs(total + kronrod.sum()))
+        if finite.all() and error + err.sum() <= allowed:
+            # What is left is already within tolerance, as around an integrable endpoint singularity
+            done = finite
+        else:
+            done = finite & (err <= tol * (hi - lo) / (b - a))
+        total += kronrod[done].sum()
+        error += err[done].sum()
+        lo, hi, centre = lo[~done], hi[~done], centre[~done]
+        if not lo.size or lo.size * 2 > QUAD_MAX_INTERVALS or np.any((centre <= lo) | (centre >= hi)):
+            break
+        lo, hi = np.concatenate([lo, centre]), np.concatenate([centre, hi])
+    if lo.size:
+        raise DivergentIntegral(f"Quadrature did not converge to {tol:g} on [{a:g}, {b:g}] "
+                                f"(trouble near {float(lo[0]):.6g}); the integral may diverge")
+    return sign * float(total), float(error)
+
+
+def _interior_singularity(expr: str, var: str, f: Callable[[np.ndarray], np.ndarray],
+                          a: float, b: float) -> Optional[str]:
+    """How f fails inside (a, b), or None; a sympy answer that cannot be decided counts as a failure."""
+    lo, hi = min(a, b), max(a, b)
+    x = np.linspace(lo, hi, SINGULARITY_SAMPLES + 2)[1:-1]
+    bad = ~np.isfinite(f(x))
+    if bad.any():
+        return f"is not finite at {float(x[bad][0]):.6g}"
+    import sympy as sp
+
+    try:
+        points = calculus.singularities(expr, var).value.intersect(sp.Interval.open(lo, hi))
+    except (ValueError, TimeoutError, CalculusError):
+        return "may be singular"
+    if points == sp.S.EmptySet:
+        return None
+    if isinstance(points, sp.FiniteSet):
+        return "is singular at " + ", ".join(f"{float(p):.6g}" for p in points)
+    return "may be singular"
+
+
+@timed(size=lambda expr, var, a, b: len(expr))
+def definite_integral(expr: str, var: str, a: float, b: float) -> Tuple[float, str]:
+    """
+    The integral of expr over [a, b] and the method used. Raises
+    DivergentIntegral when f has a singularity inside and quadrature
+    cannot converge around it.
+    """
+    f = compile_column(expr, var, "f")
+    F = compile_column(expr, var, "F")
+    singular = _interior_singularity(expr, var, f, a, b) if a != b else None
+    if F is not None and singular is None:
+        ends = F(np.array([a, b], dtype=float))
+        if np.all(np.isfinite(ends)):
+            return float(ends[1] - ends[0]), "closed form"
+    try:
+        value, error = adaptive_quadrature(f, a, b)
+    except DivergentIntegral:
+        if singular is None:
+            raise
+        raise DivergentIntegral(f"No finite integral: {expr} {singular} inside "
+                                f"[{min(a, b):g}, {max(a, b):g}]") from None
+    return value, f"adaptive quadrature (±{error:.1e})"
@@ -0,0 +1,133 @@
+"""
+Prime constellation and gap statistics, streamed one sieve segment at a time.
+
+Each segment's odd-only flags are scanned with shifted NumPy masks for the
+patterns in PATTERNS, and consecutive-prime gaps come from vectorized
+differencing. Only counts, first/last occurrences, a gap histogram and the
+record (maximal) gaps are kept, so memory stays flat for bounds up to 10^11.
+"""
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import timed
+from prime_sieve import segment_flags
+
+SEGMENT_SPAN = 1 << 24
+
+# Offsets from the smallest member; every form of a pattern is counted
+PATTERNS: Dict[str, List[Tuple[int, ...]]] = {
+    "twin": [(0, 2)],
+    "cousin": [(0, 4)],
+    "sexy": [(0, 6)],
+    "triplet": [(0, 2, 6), (0, 4, 6)],
+    "quadruplet": [(0, 2, 6, 8)],
+}
+MAX_OFFSET = max(form[-1] for forms in PATTERNS.values() for form in forms)
+
+
+class ConstellationStats:
+    """Running totals of a scan over [2, limit]."""
+
+    def __init__(self, bound: int):
+        self.bound = bound
+        self.limit = 1
+        self.prime_count = 0
+        self.counts = {name: 0 for name in PATTERNS}
+        self.first: Dict[str, Optional[Tuple[int, ...]]] = {name: None for name in PATTERNS}
+        self.last: Dict[str, Optional[Tuple[int, ...]]] = {name: None for name in PATTERNS}
+        # gap_histogram[g] is the number of consecutive primes g apart
+        self.gap_histogram = np.zeros(0, dtype=np.int64)
+        # (gap, prime before it) each time a new maximal gap appears
+        self.record_gaps: List[Tuple[int, int]] = []
+        self.last_prime: Optional[int] = None
+
+    @property
+    def max_gap(self) -> Optional[Tuple[int, int]]:
+        return self.record_gaps[-1] if self.record_gaps else None
+
+    def gap_counts(self) -> Dict[int, int]:
+        """{gap: count} for every gap that occurs."""
+        gaps = np.flatnonzero(self.gap_histogram)
+        return dict(zip(gaps.tolist(), self.gap_histogram[gaps].tolist()))
+
+    def summary(self) -> Dict[str, Dict]:
+        return {
+            name: {"count": self.counts[name], "first": self.first[name], "last": self.last[name]}
+            for name in PATTERNS
+        }
+
+    def _add_gaps(self, primes: np.ndarray) -> None:
+        if self.last_prime is not None:
+            primes = np.concatenate([[self.last_prime], primes])
+        self.last_prime = int(primes[-1])
+        gaps = np.diff(primes)
+        if not gaps.size:
+            return
+        counts = np.bincount(gaps)
+        if counts.size < self.gap_histogram.size:
+            counts = np.pad(counts, (0, self.gap_histogram.size - counts.size))
+        counts[:self.gap_histogram.size] += self.gap_histogram
+        self.gap_histogram = counts
+
+        best = self.record_gaps[-1][0] if self.record_gaps else 0
+        previous_max = np.maximum.accumulate(np.concatenate([[best], gaps[:-1]]))
+        records = np.flatnonzero(gaps > previous_max)
+        self.record_gaps.extend(zip(gaps[records].tolist(), primes[records].tolist()))
+
+    def _add_segment(self, lo: int, hi: int) -> None:
+        # Sieve a few past hi so patterns starting near the edge are complete
+        first, flags = segment_flags(lo, min(hi + MAX_OFFSET, self.bound))
+        odd = np.frombuffer(flags, dtype=np.bool_)
+        own = max((hi - first) // 2 + 1, 0)
+
+        primes = first + 2 * np.flatnonzero(odd[:own]).astype(np.int64)
+        if lo <= 2 <= hi:
+            primes = np.concatenate([[2], primes])
+        self.prime_count += primes.size
+        if primes.size:
+            self._add_gaps(primes)
+
+        # Past the bound there are no flags, so pad with False
+        padded = np.zeros(own + MAX_OFFSET // 2, dtype=np.bool_)
+        padded[:odd.size] = odd[:padded.size]
+        for name, forms in PATTERNS.items():
+            first_hit = last_hit = None
+            for form in forms:
+                mask = padded[:own].copy()
+                for offset in form[1:]:
+                    mask &= padded[offset // 2:offset // 2 + own]
+                hits = np.flatnonzero(mask)
+                if not hits.size:
+                    continue
+                self.counts[name] += hits.size
+                start, stop = first + 2 * int(hits[0]), first + 2 * int(hits[-1])
+                if first_hit is None or start < first_hit[0]:
+                    first_hit = tuple(start + offset for offset in form)
+                if last_hit is None or stop > last_hit[0]:
+                    last_hit = tuple(stop + offset for offset in form)
+            if first_hit is not None:
+                self.first[name] = self.first[name] or first_hit
+                self.last[name] = last_hit
+        self.limit = hi
+
+
+def iter_constellation_stats(n: int, segment_span: int = SEGMENT_SPAN) -> Iterator[ConstellationStats]:
+    """Scan [2, n] segment by segment, yielding the same running stats after each one."""
+    stats = ConstellationStats(n)
+    lo = 2
+    while lo <= n:
+        hi = min(lo + segment_span - 1, n)
+        stats._add_segment(lo, hi)
+        yield stats
+        lo = hi + 1
+
+
+@timed(size=lambda n, segment_span=SEGMENT_SPAN: n)
+def constellation_stats(n: int, segment_span: int = SEGMENT_SPAN) -> ConstellationStats:
+    """Counts, first/last occurrences, gap histogram and record gaps up to n."""
+    stats = ConstellationStats(n)
+    for stats in iter_constellation_stats(n, segment_span):
+        pass
+    return stats
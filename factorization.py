@@ -0,0 +1,319 @@
+"""
+Staged integer factorization: a mod-30 wheel pass for small factors,
+Pollard-Brent rho for medium ones and Lenstra ECM (Montgomery curves with
+a prime-continuation stage 2) for whatever cofactors remain.
+"""
+
+import random
+import time
+from collections import Counter
+from math import gcd, isqrt
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import timed
+from primality import is_prime
+from prime_sieve import primes_in_range, primes_up_to
+from result_cache import cached
+
+WHEEL_LIMIT = 1 << 16
+RHO_ITERATIONS = 1 << 17
+DEFAULT_TIME_BUDGET = 30.0
+# Inputs the UI, CLI and service accept; ECM finds factors up to ~30 digits,
+# and a primality test or root search on much larger n alone costs seconds
+MAX_FACTOR_DIGITS = 200
+# Ladder bits or stage 2 giant steps between deadline checks
+_DEADLINE_STRIDE = 64
+
+# (B1, curves) stages, roughly tuned for 15, 20, 25 and 30 digit factors
+ECM_SCHEDULE = [(2000, 25), (11000, 90), (50000, 300), (250000, 700)]
+ECM_STAGE2_RATIO = 100
+_ECM_D = 210
+
+# Gaps between consecutive numbers coprime to 30, starting from 7
+_WHEEL_30 = (4, 2, 4, 2, 4, 6, 2, 6)
+
+
+class FactorizationTimeout(TimeoutError):
+    """Raised when the time budget runs out; carries the partial result."""
+
+    def __init__(self, factors: Dict[int, int], remaining: List[int]):
+        self.factors = factors
+        self.remaining = remaining
+        super().__init__(f"Factorization budget exhausted with {len(remaining)} composite cofactor(s) left")
+
+
+class _Expired(Exception):
+    """Unwinds an ECM curve whose deadline passed mid-ladder."""
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() > deadline
+
+
+def format_factors(factors: Dict[int, int]) -> str:
+    """Render {2: 3, 7: 1} as '2^3 · 7'."""
+    return " · ".join(
+        f"{p}^{e}" if e > 1 else str(p) for p, e in sorted(factors.items())
+    )
+
+
+def _wheel_divide(n: int, factors: Counter, limit: int) -> int:
+    for p in (2, 3, 5):
+        while n % p == 0:
+            factors[p] += 1
+            n //= p
+    d = 7
+    i = 0
+    while d <= limit and d * d <= n:
+        while n % d == 0:
+            factors[d] += 1
+            n //= d
+        d += _WHEEL_30[i]
+        i = (i + 1) % 8
+    return n
+
+
+def _perfect_power(n: int, deadline: Optional[float] = None) -> Optional[Tuple[int, int]]:
+    # A k-th power with composite k is also a p-th power for each prime p | k
+    for k in primes_up_to(n.bit_length()):
+        if _expired(deadline):
+            return None
+        root = _iroot(n, k)
+        if root < 2:
+            break
+        if root ** k == n:
+            return root, k
+    return None
+
+
+def _iroot(n: int, k: int) -> int:
+    if k == 2:
+        return isqrt(n)
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def pollard_brent(n: int, max_iterations: int = RHO_ITERATIONS,
+                  rng: Optional[random.Random] = None, deadline: Optional[float] = None) -> Optional[int]:
+    """
+    Return a non-trivial factor of composite n, or None if none was found
+    within max_iterations or before the deadline.
+    """
+    if n % 2 == 0:
+        return 2
+    rng = rng or random.Random(n)
+    y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+    g = r = q = 1
+    iterations = 0
+    while g == 1:
+        x = y
+        for k in range(0, r, m):
+            if _expired(deadline):
+                return None
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+        k = 0
+        while k < r and g == 1:
+            if _expired(deadline):
+                return None
+            ys = y
+            for _ in range(min(m, r - k)):
+                y = (y * y + c) % n
+                q = q * abs(x - y) % n
+            g = gcd(q, n)
+            k += m
+        r *= 2
+        iterations += r
+        if iterations > max_iterations and g == 1:
+            return None
+    if g == n:
+        while True:
+            ys = (ys * ys + c) % n
+            g = gcd(abs(x - ys), n)
+            if g > 1:
+                break
+    return g if g != n else None
+
+
+def _xdbl(X, Z, a24, n):
+    s = (X + Z) * (X + Z) % n
+    d = (X - Z) * (X - Z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _xadd(XP, ZP, XQ, ZQ, Xd, Zd, n):
+    u = (XP - ZP) * (XQ + ZQ)
+    v = (XP + ZP) * (XQ - ZQ)
+    return Zd * (u + v) ** 2 % n, Xd * (u - v) ** 2 % n
+
+
+def _ladder(k, X, Z, a24, n, deadline=None):
+    X0, Z0 = X, Z
+    X1, Z1 = _xdbl(X, Z, a24, n)
+    for i, bit in enumerate(bin(k)[3:]):
+        if i % _DEADLINE_STRIDE == 0 and _expired(deadline):
+            raise _Expired
+        if bit == "1":
+            X0, Z0 = _xadd(X1, Z1, X0, Z0, X, Z, n)
+            X1, Z1 = _xdbl(X1, Z1, a24, n)
+        else:
+            X1, Z1 = _xadd(X0, Z0, X1, Z1, X, Z, n)
+            X0, Z0 = _xdbl(X0, Z0, a24, n)
+    return X0, Z0
+
+
+_stage1_cache: Dict[int, int] = {}
+_stage2_cache: Dict[Tuple[int, int], Tuple[int, List[Tuple[int, ...]]]] = {}
+
+
+def _stage1_multiplier(B1: int) -> int:
+    if B1 not in _stage1_cache:
+        k = 1
+        for p in primes_up_to(B1):
+            pe = p
+            while pe * p <= B1:
+                pe *= p
+            k *= pe
+        _stage1_cache[B1] = k
+    return _stage1_cache[B1]
+
+
+def _stage2_plan(B1: int, B2: int) -> Tuple[int, List[Tuple[int, ...]]]:
+    """
+    Primes B1 < p <= B2 as p = m +- j with m a multiple of _ECM_D: the first
+    m and, for it and each following multiple, the baby steps j it needs.
+    A j shared by m - j and m + j appears once.
+    """
+    key = (B1, B2)
+    if key not in _stage2_cache:
+        half = _ECM_D // 2
+        steps: Dict[int, set] = {}
+        for p in primes_in_range(B1 + 1, B2):
+            m = (p + half) // _ECM_D * _ECM_D
+            steps.setdefault(m, set()).add(abs(p - m))
+        first = min(steps)
+        _stage2_cache[key] = first, [tuple(sorted(steps.get(m, ()))) for m in range(first, max(steps) + 1, _ECM_D)]
+    return _stage2_cache[key]
+
+
+def _ecm_curve(n: int, B1: int, B2: int, sigma: int, deadline: Optional[float] = None) -> Optional[int]:
+    u = (sigma * sigma - 5) % n
+    v = 4 * sigma % n
+    X = pow(u, 3, n)
+    Z = pow(v, 3, n)
+    denominator = 16 * X * v % n
+    g = gcd(denominator, n)
+    if g != 1:
+        return g if g != n else None
+    a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+
+    # Stage 1
+    X, Z = _ladder(_stage1_multiplier(B1), X, Z, a24, n, deadline)
+    g = gcd(Z, n)
+    if g != 1:
+        return g if g != n else None
+
+    # Stage 2: primes B1 < p <= B2 written as p = m +- j with m a multiple of D;
+    # x(mP) == x(jP) mod q exactly when (m - j)P or (m + j)P vanishes mod q
+    half = _ECM_D // 2
+    baby = [(0, 0), (X, Z), _xdbl(X, Z, a24, n)]
+    for j in range(3, half + 1):
+        Xa, Za = baby[j - 1]
+        Xb, Zb = baby[j - 2]
+        baby.append(_xadd(Xa, Za, X, Z, Xb, Zb, n))
+    GX, GZ = _xdbl(*baby[half], a24, n)
+
+    m, plan = _stage2_plan(B1, B2)
+    # Affine x of every baby step a prime needs (j coprime to D), saving a product per prime
+    bx = [0] * (half + 1)
+    for j in range(1, half + 1, 2):
+        if gcd(j, _ECM_D) == 1:
+            bX, bZ = baby[j]
+            g = gcd(bZ, n)
+            if g != 1:
+                return g if g != n else None
+            bx[j] = bX * pow(bZ, -1, n) % n
+    RX, RZ = _ladder(m, X, Z, a24, n, deadline)
+    TX, TZ = _ladder(m - _ECM_D, X, Z, a24, n, deadline)
+    acc = 1
+    for i, steps in enumerate(plan):
+        if i % _DEADLINE_STRIDE == 0 and _expired(deadline):
+            raise _Expired
+        for j in steps:
+            acc = acc * (RX - bx[j] * RZ) % n
+        RX, RZ, TX, TZ = (*_xadd(RX, RZ, GX, GZ, TX, TZ, n), RX, RZ)
+    g = gcd(acc, n)
+    return g if 1 < g < n else None
+
+
+def ecm(n: int, deadline: Optional[float] = None,
+        rng: Optional[random.Random] = None) -> Optional[int]:
+    """
+    Lenstra ECM following ECM_SCHEDULE, repeating its last stage until a
+    factor turns up. Returns None once the deadline passes, including in
+    the middle of a curve.
+    """
+    rng = rng or random.Random(n)
+    try:
+        for B1, curves in ECM_SCHEDULE:
+            for _ in range(curves):
+                factor = _ecm_curve(n, B1, B1 * ECM_STAGE2_RATIO, rng.randrange(6, n - 1), deadline)
+                if factor:
+                    return factor
+        while True:
+            factor = _ecm_curve(n, B1, B1 * ECM_STAGE2_RATIO, rng.randrange(6, n - 1), deadline)
+            if factor:
+                return factor
+    except _Expired:
+        return None
+
+
+def _find_factor(n: int, deadline: Optional[float], rng: random.Random) -> Optional[int]:
+    power = _perfect_power(n, deadline)
+    if power:
+        return power[0]
+    factor = pollard_brent(n, rng=rng, deadline=deadline)
+    if factor:
+        return factor
+    return ecm(n, deadline, rng)
+
+
+# The budget only decides whether the call finishes; a finished factorization is the same for any budget
+@timed(size=lambda n, *args, **kwargs: n.bit_length())
+@cached("factorize", canonical=lambda n, time_budget=None: (n,))
+def factorize(n: int, time_budget: Optional[float] = DEFAULT_TIME_BUDGET) -> Dict[int, int]:
+    """
+    Prime factorization of n >= 2 as {prime: multiplicity}.
+    Raises FactorizationTimeout with the partial result once time_budget
+    seconds have elapsed (None disables the budget).
+
+    Cost is set by the second-largest prime factor. A balanced semiprime of
+    30 digits takes about a second and one of 40 digits 5-10 s on average
+    (ECM's curve count varies, so some take 30 s); most of 45 digits outlast
+    the default budget.
+    """
+    if n < 2:
+        raise ValueError("n must be >= 2")
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    rng = random.Random(n)
+    factors: Counter = Counter()
+    pending = [_wheel_divide(n, factors, WHEEL_LIMIT)]
+    while pending:
+        m = pending.pop()
+        if m == 1:
+            continue
+        if is_prime(m):
+            factors[m] += 1
+            continue
+        if _expired(deadline):
+            raise FactorizationTimeout(dict(factors), [m] + pending)
+        d = _find_factor(m, deadline, rng)
+        if d is None:
+            raise FactorizationTimeout(dict(factors), [m] + pending)
+        pending.extend((d, m // d))
+    return dict(factors)
@@ -0,0 +1,84 @@
+"""
+Goldbach pairs for single even numbers and, in batch, for every even
+n <= N from one shared prime table.
+
+The batch partition counts come from a single FFT self-convolution of the
+odd-prime indicator, so r(n) for all n <= N costs O(N log N) instead of one
+scan per number.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from instrumentation import timed
+from primality import is_prime, next_prime
+from prime_sieve import odd_sieve
+from result_cache import cached
+
+# Inputs the UI and service accept; a minimal pair above ~300 digits can cost
+# a minute of primality tests (10**1000 takes ~50 s)
+MAX_GOLDBACH_DIGITS = 300
+
+
+@cached("goldbach_min_pair")
+def goldbach_min_pair(even_n: int) -> Optional[Tuple[int, int]]:
+    """The pair (p, q), p <= q both prime and p + q == even_n, with the smallest p."""
+    p = 2
+    while p <= even_n // 2:
+        if is_prime(even_n - p):
+            return p, even_n - p
+        p = next_prime(p)
+    return None
+
+
+@timed(size=lambda N: N)
+def goldbach_table(N: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Minimal Goldbach prime and partition count r(n) for every n <= N.
+
+    Returns (min_p, counts), both indexed by n. r(n) counts unordered pairs
+    p <= q. Entries for odd n and n < 4 are 0, as is min_p[n] for any even n
+    without a pair.
+    """
+    min_p = np.zeros(N + 1, dtype=np.int64)
+    counts = np.zeros(N + 1, dtype=np.int64)
+    if N < 4:
+        return min_p, counts
+    min_p[4], counts[4] = 2, 1
+    if N < 6:
+        return min_p, counts
+
+    # odd[i] says whether 2*i + 1 is prime; 2*i + 1 + 2*j + 1 = n gives i + j = n/2 - 1
+    odd = np.frombuffer(odd_sieve(N), dtype=np.uint8).astype(np.float64)
+    size = 1 << (2 * len(odd) - 1).bit_length()
+    spectrum = np.fft.rfft(odd, size)
+    ordered = np.rint(np.fft.irfft(spectrum * spectrum, size)[:len(odd)]).astype(np.int64)
+
+    evens = np.arange(6, N + 1, 2)
+    k = evens // 2 - 1
+    # (n/2 prime) means the pair (n/2, n/2) was counted once instead of twice
+    half_prime = odd[(evens // 2 - 1) // 2].astype(np.int64) * (evens // 2 % 2)
+    counts[evens] = (ordered[k] + half_prime) // 2
+
+    flags = odd.astype(bool)
+    pending = evens
+    for i in range(1, len(odd)):
+        if not pending.size:
+            break
+        if not flags[i]:
+            continue
+        p = 2 * i + 1
+        pending = pending[pending - p >= p]
+        hit = flags[(pending - p) // 2]
+        min_p[pending[hit]] = p
+        pending = pending[~hit]
+    return min_p, counts
+
+
+def verify_goldbach(N: int) -> Optional[int]:
+    """The first even 4 <= n <= N without a Goldbach pair, or None."""
+    min_p, _ = goldbach_table(N)
+    evens = np.arange(4, N + 1, 2)
+    missing = evens[min_p[evens] == 0]
+    return int(missing[0]) if missing.size else None
@@ -0,0 +1,274 @@
+"""
+Background execution for the Tkinter GUIs.
+
+Work runs in a small pool of spawned worker processes, so a long logic or
+prime computation holds neither the Tk thread nor its GIL and the window
+keeps redrawing. A dispatcher thread per task hands the call to an idle
+worker and relays everything the worker sends into a queue; the Tk thread
+drains that queue every POLL_MS from root.after and runs the callbacks, so
+callbacks may touch widgets.
+
+    runner = BackgroundRunner(root)
+    runner.submit(job, text, key="calculate", on_done=show, on_progress=bar)
+
+A job is a picklable module-level function. If it is a generator, each
+(fraction, text) it yields is a progress report and its return value is
+the result; code deeper inside a job, which cannot yield, reports through
+report_progress() instead. Reports are forwarded every PROGRESS_INTERVAL
+or PROGRESS_STEP, whichever comes first. Cancelling a running task kills
+its worker, which is replaced on next use; submitting a task with the key
+of one still running supersedes it. debounce() collapses a burst of clicks
+into the last one. Cancelled tasks are counted apart from failed ones.
+"""
+
+import atexit
+import inspect
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from instrumentation import metrics
+
+GUI_WORKERS = 2
+POLL_MS = 16
+DEBOUNCE_MS = 250
+PROGRESS_INTERVAL = 0.05
+PROGRESS_STEP = 0.01
+
+
+# Set in a worker process to the running task's throttled progress sender
+_report: Optional[Callable[[float, str], None]] = None
+
+
+def report_progress(fraction: float, text: str) -> None:
+    """Report progress from inside a running job, as a generator job does by yielding; a no-op elsewhere."""
+    if _report is not None:
+        _report(fraction, text)
+
+
+def _worker_main(conn) -> None:
+    global _report
+    conn.send(("ready", None))
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        fn, args = message
+        last = [0.0, -1.0]
+
+        def report(fraction: float, text: str) -> None:
+            now = time.perf_counter()
+            if now - last[0] >= PROGRESS_INTERVAL or fraction - last[1] >= PROGRESS_STEP:
+                conn.send(("progress", (fraction, text)))
+                last[:] = now, fraction
+        _report = report
+        try:
+            result = fn(*args)
+            if inspect.isgenerator(result):
+                try:
+                    while True:
+                        report(*next(result))
+                except StopIteration as stop:
+                    result = stop.value
+            conn.send(("done", result))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            _report = None
+
+
+class _Worker:
+    def __init__(self, ctx):
+        self._ctx = ctx
+        self._process = None
+        self._conn = None
+
+    def _start(self) -> None:
+        parent, child = self._ctx.Pipe()
+        self._process = self._ctx.Process(target=_worker_main, args=(child,), daemon=True)
+        self._process.start()
+        child.close()
+        self._conn = parent
+        self._conn.recv()
+
+    def kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._conn.close()
+        self._process = self._conn = None
+
+    def interrupt(self) -> None:
+        """Kill the process from another thread; the thread inside run() sees EOF and cleans up."""
+        process = self._process
+        if process is not None:
+            process.kill()
+
+    def stop(self) -> None:
+        if self._process is not None and self._process.is_alive():
+            try:
+                self._conn.send(None)
+                self._process.join(1)
+            except OSError:
+                pass
+        self.kill()
+
+    def run(self, fn: Callable, args: tuple, relay: Callable[[str, Any], None]) -> None:
+        """Run fn(*args) here, passing every message to relay. Raises EOFError if the worker dies."""
+        try:
+            if self._process is None or not self._process.is_alive():
+                self._start()
+            self._conn.send((fn, args))
+            while True:
+                kind, payload = self._conn.recv()
+                relay(kind, payload)
+                if kind != "progress":
+                    return
+        except (EOFError, OSError):
+            self.kill()
+            raise EOFError from None
+
+
+class Task:
+    """One submitted call. state is pending, running, done, error or cancelled."""
+
+    def __init__(self, task_id: int, name: str, key: Optional[str], on_done: Optional[Callable],
+                 on_error: Optional[Callable], on_progress: Optional[Callable]):
+        self.id = task_id
+        self.name = name
+        self.key = key
+        self.state = "pending"
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.submitted = time.perf_counter()
+        self._worker: Optional[_Worker] = None
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in ("done", "error", "cancelled")
+
+
+class BackgroundRunner:
+    def __init__(self, root, workers: int = GUI_WORKERS, poll_ms: int = POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        ctx = multiprocessing.get_context("spawn")
+        self._all: List[_Worker] = [_Worker(ctx) for _ in range(workers)]
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        for worker in self._all:
+            self._idle.put(worker)
+        # (task, kind, payload) from dispatcher threads, drained on the Tk thread
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        self._tasks: Dict[int, Task] = {}
+        self._ids = itertools.count(1)
+        self._polling = None
+        self._debounced: Dict[str, str] = {}
+        # Cancelled tasks per job name; the registry's error counts are for failures only
+        self.cancelled: Counter = Counter()
+        metrics.collector(self._families)
+        atexit.register(self.shutdown)
+
+    def submit(self, fn: Callable, *args, key: Optional[str] = None, on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None, on_progress: Optional[Callable] = None) -> Task:
+        """
+        Run fn(*args) in a worker. on_done(result), on_error(message) and
+        on_progress(fraction, text) are called on the Tk thread. A still
+        running task with the same key is cancelled first.
+        """
+        if key is not None:
+            for task in list(self._tasks.values()):
+                if task.key == key:
+                    self.cancel(task)
+        task = Task(next(self._ids), fn.__name__, key, on_done, on_error, on_progress)
+        self._tasks[task.id] = task
+        threading.Thread(target=self._dispatch, args=(task, fn, args), name=f"gui-task-{task.id}",
+                         daemon=True).start()
+        self._schedule_poll()
+        return task
+
+    def _dispatch(self, task: Task, fn: Callable, args: tuple) -> None:
+        worker = self._idle.get()
+        with task._lock:
+            if task.state == "cancelled":
+                self._idle.put(worker)
+                return
+            task.state = "running"
+            task._worker = worker
+        try:
+            worker.run(fn, args, lambda kind, payload: self._events.put((task, kind, payload)))
+        except EOFError:
+            if task.state != "cancelled":
+                self._events.put((task, "error", "worker process exited unexpectedly"))
+        finally:
+            with task._lock:
+                task._worker = None
+            self._idle.put(worker)
+
+    def cancel(self, task: Optional[Task] = None) -> None:
+        """Cancel task (every unfinished task if None); a running one has its worker killed."""
+        for task in [task] if task is not None else list(self._tasks.values()):
+            with task._lock:
+                if task.finished:
+                    continue
+                task.state = "cancelled"
+                # Under the lock, so the worker cannot have moved on to another task
+                if task._worker is not None:
+                    task._worker.interrupt()
+            self._tasks.pop(task.id, None)
+            self.cancelled[task.name] += 1
+
+    def _families(self):
+        return [("semantic_gui_cancelled_total", "counter", "GUI tasks cancelled per job.",
+                 [({"job": name}, count) for name, count in self.cancelled.items()])]
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def debounce(self, key: str, callback: Callable[[], Any], delay_ms: int = DEBOUNCE_MS) -> None:
+        """Call callback once delay_ms after the last of a burst of debounce(key, ...) calls."""
+        pending = self._debounced.pop(key, None)
+        if pending is not None:
+            self.root.after_cancel(pending)
+
+        def fire():
+            self._debounced.pop(key, None)
+            callback()
+        self._debounced[key] = self.root.after(delay_ms, fire)
+
+    def _schedule_poll(self) -> None:
+        if self._polling is None:
+            self._polling = self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self) -> None:
+        self._polling = None
+        while True:
+            try:
+                task, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if task.state == "cancelled":
+                continue
+            if kind == "progress":
+                if task.on_progress is not None:
+                    task.on_progress(*payload)
+                continue
+            task.state = kind
+            self._tasks.pop(task.id, None)
+            metrics.observe(f"gui.{task.name}", time.perf_counter() - task.submitted, error=kind == "error")
+            callback = task.on_done if kind == "done" else task.on_error
+            if callback is not None:
+                callback(payload)
+        if self._tasks:
+            self._schedule_poll()
+
+    def shutdown(self) -> None:
+        self.cancel()
+        for worker in self._all:
+            worker.stop()
@@ -0,0 +1,116 @@
+"""
+Cold-start import report.
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+and the best of a few runs is kept, so the numbers reflect what a new
+Streamlit worker pays before first paint. Modules that must never be
+imported at startup (sympy) are flagged, and --json output can be saved per
+release and compared with --baseline to catch regressions.
+
+    python import_report.py
+    python import_report.py --json > startup-1.4.json
+    python import_report.py --baseline startup-1.3.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULES = [
+    "semantic_core", "calculus_engine", "calculus_numeric", "constellations", "factorization",
+    "goldbach", "prime_counting", "semantic_batch", "streamlit",
+]
+# Imported only inside calculus worker processes
+LAZY_MODULES = ["sympy", "mpmath"]
+RUNS = 3
+TOP_IMPORTS = 5
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _profile_once(module: str) -> List[Tuple[str, int, int, int]]:
+    """(name, self_us, cumulative_us, depth) for every import the module triggers."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+
+def profile_module(module: str, runs: int = RUNS) -> Dict:
+    best = None
+    for _ in range(runs):
+        rows = _profile_once(module)
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:TOP_IMPORTS]
+    loaded = {name.split(".")[0] for name, _, _, _ in rows}
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 2),
+        "imports": len(rows),
+        "slowest": [{"name": name, "self_ms": round(us / 1000, 2)} for name, us, _, _ in slowest],
+        "eager": sorted(loaded.intersection(LAZY_MODULES)),
+    }
+
+
+def build_report(modules: List[str], runs: int = RUNS) -> Dict:
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "modules": [profile_module(module, runs) for module in modules],
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Modules that got slower than baseline by more than tolerance (a fraction)."""
+    before = {entry["module"]: entry["total_ms"] for entry in baseline["modules"]}
+    regressions = []
+    for entry in report["modules"]:
+        old = before.get(entry["module"])
+        if old and entry["total_ms"] > old * (1 + tolerance):
+            regressions.append(f"{entry['module']}: {old:.1f} ms -> {entry['total_ms']:.1f} ms")
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"Python {report['python']} on {report['platform']}", ""]
+    for entry in report["modules"]:
+        slowest = ", ".join(f"{item['name']} {item['self_ms']:.1f}" for item in entry["slowest"])
+        lines.append(f"{entry['module']:<20} {entry['total_ms']:>9.1f} ms  {entry['imports']:>5} imports  ({slowest})")
+        if entry["eager"]:
+            lines.append(f"{'':<20} WARNING: eagerly imports {', '.join(entry['eager'])}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Report cold-start import times.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--baseline", help="JSON report from an earlier release to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    report = build_report(args.modules, args.runs)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    failures = [f"{entry['module']} eagerly imports {', '.join(entry['eager'])}"
+                for entry in report["modules"] if entry["eager"]]
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += compare(report, json.load(f), args.tolerance)
+    if failures:
+        sys.exit("Startup regressions:\n  " + "\n  ".join(failures))
@@ -0,0 +1,321 @@
+"""
+Latency and size histograms, cache counters, profiling and Prometheus export.
+
+    @timed("nth_prime", size=lambda n: n)
+    def nth_prime(n): ...
+
+    with timer("render"):
+        ...
+
+Every timed operation gets a latency histogram, an input-size histogram
+(when size is given) and an error count. Caches report through collectors,
+callables that are only evaluated at export time, so hits and misses cost
+nothing extra on the hot path. Recording takes well under a microsecond;
+it is applied to functions whose cost depends on their input, not to the
+O(1) formatters that run in a couple of microseconds.
+
+ProfileCapture records a cProfile or a sampling profile of one block of
+code (a Streamlit script run, a request). It costs nothing unless started.
+Set $SEMANTIC_METRICS=0 to switch recording off, and $SEMANTIC_METRICS_FILE
+to have the Prometheus text written there at exit.
+"""
+
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; each histogram also has an implicit +Inf bucket
+LATENCY_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = tuple(10.0 ** k for k in range(13))
+SAMPLE_INTERVAL = 0.005
+PROFILE_LINES = 40
+
+# (name, type, help, [(labels, value), ...]) as produced by a collector
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lo = self.buckets[i - 1] if i else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            yield f"{bound:g}", total
+        yield "+Inf", self.count
+
+
+class _Operation:
+    __slots__ = ("latency", "size", "errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.errors = 0
+
+
+class MetricsRegistry:
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._operations: Dict[str, _Operation] = {}
+        self._collectors: List[Callable[[], List[Family]]] = []
+        self.started = time.time()
+
+    def _operation(self, name: str) -> _Operation:
+        op = self._operations.get(name)
+        if op is None:
+            with self._lock:
+                op = self._operations.setdefault(name, _Operation())
+        return op
+
+    def observe(self, name: str, seconds: float, size: Optional[float] = None, error: bool = False) -> None:
+        if not self.enabled:
+            return
+        op = self._operation(name)
+        with self._lock:
+            op.latency.observe(seconds)
+            if size is not None:
+                op.size.observe(size)
+            if error:
+                op.errors += 1
+
+    @contextmanager
+    def timer(self, name: str, size: Optional[float] = None) -> Iterator[None]:
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, size, error)
+
+    def timed(self, name: Optional[str] = None, size: Optional[Callable[..., float]] = None) -> Callable:
+        """Decorator recording each call's latency (and input size, via size(*args, **kwargs))."""
+        def decorate(fn: Callable) -> Callable:
+            label = name or fn.__name__
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException:
+                    self.observe(label, time.perf_counter() - started, _safe_size(size, args, kwargs), True)
+                    raise
+                self.observe(label, time.perf_counter() - started, _safe_size(size, args, kwargs))
+                return result
+            return wrapper
+        return decorate
+
+    def collector(self, fn: Callable[[], List[Family]]) -> Callable[[], List[Family]]:
+        """Register fn to report extra metric families (cache counters, gauges) at export time."""
+        with self._lock:
+            self._collectors.append(fn)
+        return fn
+
+    def reset(self) -> None:
+        with self._lock:
+            self._operations.clear()
+            self.started = time.time()
+
+    def summary(self) -> List[Dict[str, float]]:
+        """One row per operation, slowest total time first."""
+        with self._lock:
+            rows = [{
+                "operation": name,
+                "calls": op.latency.count,
+                "errors": op.errors,
+                "total_s": op.latency.sum,
+                "mean_ms": 1000 * op.latency.sum / op.latency.count if op.latency.count else 0.0,
+                "p50_ms": 1000 * op.latency.quantile(0.5),
+                "p95_ms": 1000 * op.latency.quantile(0.95),
+                "mean_size": op.size.sum / op.size.count if op.size.count else None,
+            } for name, op in self._operations.items()]
+        return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+    def families(self) -> List[Family]:
+        """Collector output, with same-named families from different collectors merged."""
+        merged: Dict[str, Family] = {}
+        for collect in list(self._collectors):
+            try:
+                collected = collect()
+            except Exception:
+                # A broken collector must never take the export down with it
+                continue
+            for name, kind, help_text, samples in collected:
+                if name in merged:
+                    merged[name][3].extend(samples)
+                else:
+                    merged[name] = (name, kind, help_text, list(samples))
+        return list(merged.values())
+
+    def to_prometheus(self) -> str:
+        """Everything in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            operations = sorted(self._operations.items())
+            for metric, attr, help_text in (
+                    ("semantic_operation_duration_seconds", "latency", "Latency of instrumented operations."),
+                    ("semantic_operation_input_size", "size", "Input size of instrumented operations.")):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+                for name, op in operations:
+                    histogram = getattr(op, attr)
+                    if attr == "size" and not histogram.count:
+                        continue
+                    for bound, total in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{operation="{name}",le="{bound}"}} {total}')
+                    lines.append(f'{metric}_sum{{operation="{name}"}} {histogram.sum:.9g}')
+                    lines.append(f'{metric}_count{{operation="{name}"}} {histogram.count}')
+            lines += ["# HELP semantic_operation_errors_total Instrumented calls that raised.",
+                      "# TYPE semantic_operation_errors_total counter"]
+            lines += [f'semantic_operation_errors_total{{operation="{name}"}} {op.errors}' for name, op in operations]
+        for name, kind, help_text, samples in self.families():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value:g}" if label_text else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the export atomically, for node_exporter's textfile collector and the like."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+
+def _safe_size(size: Optional[Callable[..., float]], args: tuple, kwargs: dict) -> Optional[float]:
+    if size is None:
+        return None
+    try:
+        return float(size(*args, **kwargs))
+    except Exception:
+        return None
+
+
+def cache_family(name: str, caches: Dict[str, Tuple[int, int]]) -> List[Family]:
+    """Hit/miss counter families for {cache: (hits, misses)}."""
+    return [
+        (f"{name}_hits_total", "counter", "Cache hits.", [({"cache": c}, hits) for c, (hits, _) in caches.items()]),
+        (f"{name}_misses_total", "counter", "Cache misses.", [({"cache": c}, misses) for c, (_, misses) in caches.items()]),
+    ]
+
+
+class ProfileCapture:
+    """
+    Profile one block of code. mode is "cprofile" (exact, slows the code
+    down a lot) or "sampling" (a background thread records the target
+    thread's stack every SAMPLE_INTERVAL; cheap, statistical).
+    """
+
+    def __init__(self, mode: str = "cprofile", interval: float = SAMPLE_INTERVAL):
+        if mode not in ("cprofile", "sampling"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.interval = interval
+        self.report = ""
+        self._profiler: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started = 0.0
+
+    def start(self) -> "ProfileCapture":
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            target = threading.get_ident()
+            self._sampler = threading.Thread(target=self._sample, args=(target,), name="profile-sampler", daemon=True)
+            self._sampler.start()
+        return self
+
+    def _sample(self, target: int) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                # Credit the innermost frame ("self") and every caller ("total") once per sample
+                self._samples[("self", stack[0])] += 1
+                for entry in set(stack):
+                    self._samples[("total", entry)] += 1
+
+    def stop(self) -> str:
+        elapsed = time.perf_counter() - self._started
+        if self.mode == "cprofile":
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            self.report = out.getvalue()
+        else:
+            self._stop.set()
+            self._sampler.join()
+            total = sum(n for (kind, _), n in self._samples.items() if kind == "self") or 1
+            lines = [f"{total} samples every {self.interval * 1000:g} ms over {elapsed:.3f}s", "",
+                     f"{'self%':>6} {'total%':>7}  function"]
+            totals = {entry: n for (kind, entry), n in self._samples.items() if kind == "total"}
+            selfs = {entry: n for (kind, entry), n in self._samples.items() if kind == "self"}
+            for entry, n in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:PROFILE_LINES]:
+                lines.append(f"{100 * selfs.get(entry, 0) / total:6.1f} {100 * n / total:7.1f}  {entry}")
+            self.report = "\n".join(lines)
+        return self.report
+
+
+@contextmanager
+def profile(mode: str = "cprofile") -> Iterator[ProfileCapture]:
+    capture = ProfileCapture(mode).start()
+    try:
+        yield capture
+    finally:
+        capture.stop()
+
+
+metrics = MetricsRegistry(enabled=os.environ.get("SEMANTIC_METRICS", "1") != "0")
+timed = metrics.timed
+timer = metrics.timer
+
+if os.environ.get("SEMANTIC_METRICS_FILE"):
+    atexit.register(metrics.write_prometheus, os.environ["SEMANTIC_METRICS_FILE"])
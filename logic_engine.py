@@ -0,0 +1,475 @@
+"""
+Propositional logic: parsing, bit-parallel truth tables and ROBDDs.
+
+A formula over named variables with NOT, AND, XOR, OR, IMPLIES and IFF
+(binding in that order, IMPLIES to the right) is compiled to a postfix
+program, cached per text. Two backends evaluate it:
+
+    truth_table(f)   every one of the 2^n rows at once: each variable is a
+                     uint64 array holding 64 assignments per word, so a
+                     connective is one NumPy bitwise op over 2^n / 64 words
+                     (20 variables is 16384 words). Up to MAX_TABLE_VARIABLES,
+                     and only while the operands the program holds at once
+                     fit in MAX_TABLE_STACK_WORDS.
+    BDD              a reduced ordered binary decision diagram, variables in
+                     order of first appearance. Satisfiability, tautology and
+                     equivalence are checks against the constant nodes and the
+                     model count never enumerates rows, so formulas with
+                     hundreds of variables are fine while the diagram stays
+                     under MAX_BDD_NODES.
+
+Row r of a truth table assigns variable k the bit n-1-k of r, so row 0 is
+all false and the first variable changes slowest, as tables are written.
+The axiom of a formula is its model count mod AXIOM_COUNT.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import cache_family, metrics, timed
+from semantic_axioms import AXIOM_COUNT
+
+MAX_FORMULA_LENGTH = 1 << 13
+MAX_TABLE_VARIABLES = 24
+# 32 MB of pending operands; deeper programs over many variables go to the BDD
+MAX_TABLE_STACK_WORDS = 1 << 22
+MAX_BDD_VARIABLES = 512
+MAX_BDD_NODES = 1_000_000
+COMPILE_CACHE_SIZE = 256
+
+# progress(position, length): the evaluator is at step position of a postfix program of that length
+Progress = Callable[[int, int], None]
+
+# Binding strength and associativity of the binary connectives; NOT binds tightest
+_BINARY = {"and": (4, "left"), "xor": (3, "left"), "or": (2, "left"), "implies": (1, "right"), "iff": (0, "left")}
+_NOT_PRECEDENCE = 5
+
+_SYMBOLS = {
+    "&": "and", "&&": "and", "∧": "and", "|": "or", "||": "or", "∨": "or", "^": "xor", "⊕": "xor",
+    "!": "not", "~": "not", "¬": "not", "->": "implies", "=>": "implies", "→": "implies",
+    "<->": "iff", "<=>": "iff", "↔": "iff",
+}
+_WORDS = {"and": "and", "or": "or", "xor": "xor", "not": "not", "implies": "implies", "iff": "iff",
+          "true": True, "false": False}
+_TOKEN = re.compile(r"\s*(<->|<=>|->|=>|&&|\|\||[()&|^!~∧∨⊕¬→↔]|[A-Za-z_][A-Za-z0-9_]*|[01])")
+
+# Word patterns for the six lowest row bits: bit r of the word is bit p of r
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_LOW_PATTERNS = (0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+                 0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000)
+
+
+class LogicError(ValueError):
+    """The formula is malformed or too large for the backend asked for."""
+
+
+class CompiledFormula(NamedTuple):
+    text: str
+    # Variables in order of first appearance
+    variables: Tuple[str, ...]
+    # Postfix program: ("var", name), ("const", bool) or (connective, None)
+    program: Tuple[Tuple[str, object], ...]
+    # Most operands the program holds on its stack at once
+    depth: int
+
+
+class LogicResult(NamedTuple):
+    formula: str
+    variables: Tuple[str, ...]
+    models: int
+    rows: int
+    example: Optional[Dict[str, bool]]
+    backend: str
+
+    @property
+    def satisfiable(self) -> bool:
+        return self.models > 0
+
+    @property
+    def tautology(self) -> bool:
+        return self.models == self.rows
+
+    @property
+    def verdict(self) -> str:
+        if self.tautology:
+            return "tautology"
+        return "satisfiable" if self.satisfiable else "unsatisfiable"
+
+
+def _tokens(text: str) -> List[Tuple[object, str]]:
+    """(token, source text) pairs; a token is "(", ")", a connective, a bool or ("var", name)."""
+    tokens: List[Tuple[object, str]] = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match:
+            pos += len(text[pos:]) - len(text[pos:].lstrip())
+            raise LogicError(f"Unexpected character {text[pos]!r} at position {pos}")
+        raw = match.group(1)
+        pos = match.end()
+        if raw in ("(", ")"):
+            tokens.append((raw, raw))
+        elif raw in _SYMBOLS:
+            tokens.append((_SYMBOLS[raw], raw))
+        elif raw in ("0", "1"):
+            tokens.append((raw == "1", raw))
+        elif raw.lower() in _WORDS:
+            tokens.append((_WORDS[raw.lower()], raw))
+        else:
+            tokens.append((("var", raw), raw))
+    return tokens
+
+
+@lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_formula(text: str) -> CompiledFormula:
+    """Parse text into a postfix program (shunting-yard, so nesting depth is unbounded). Raises LogicError."""
+    text = text.strip()
+    if not text:
+        raise LogicError("Empty formula")
+    if len(text) > MAX_FORMULA_LENGTH:
+        raise LogicError(f"Formula longer than {MAX_FORMULA_LENGTH} characters")
+    program: List[Tuple[str, object]] = []
+    ops: List[str] = []
+    variables: Dict[str, None] = {}
+    expect_operand = True
+    for token, raw in _tokens(text):
+        if expect_operand:
+            if token == "not" or token == "(":
+                ops.append(token)
+            elif isinstance(token, bool):
+                program.append(("const", token))
+                expect_operand = False
+            elif isinstance(token, tuple):
+                variables.setdefault(token[1])
+                program.append(token)
+                expect_operand = False
+            else:
+                raise LogicError(f"Expected a variable or '(' before {raw!r}")
+        elif token == ")":
+            while ops and ops[-1] != "(":
+                program.append((ops.pop(), None))
+            if not ops:
+                raise LogicError("Unbalanced ')'")
+            ops.pop()
+        elif token in _BINARY:
+            precedence, associativity = _BINARY[token]
+            while ops and ops[-1] != "(":
+                top = _NOT_PRECEDENCE if ops[-1] == "not" else _BINARY[ops[-1]][0]
+                if top > precedence or (top == precedence and associativity == "left"):
+                    program.append((ops.pop(), None))
+                else:
+                    break
+            ops.append(token)
+            expect_operand = True
+        else:
+            raise LogicError(f"Expected a connective or ')' before {raw!r}")
+    if expect_operand:
+        raise LogicError("Formula ends where a variable was expected")
+    while ops:
+        op = ops.pop()
+        if op == "(":
+            raise LogicError("Unbalanced '('")
+        program.append((op, None))
+    depth = peak = 0
+    for op, _ in program:
+        if op in ("var", "const"):
+            depth += 1
+            peak = max(peak, depth)
+        elif op != "not":
+            depth -= 1
+    return CompiledFormula(text, tuple(variables), tuple(program), peak)
+
+
+def _popcount(words: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum(dtype=np.int64))
+    return int(np.unpackbits(words.view(np.uint8)).sum(dtype=np.int64))
+
+
+class TruthTable:
+    """All 2^n values of a formula, 64 rows per uint64 word."""
+
+    def __init__(self, variables: Tuple[str, ...], words: np.ndarray):
+        self.variables = variables
+        self.words = words
+
+    @property
+    def rows(self) -> int:
+        return 1 << len(self.variables)
+
+    @property
+    def models(self) -> int:
+        return _popcount(self.words)
+
+    def column(self) -> np.ndarray:
+        """The value of every row as a bool array."""
+        bits = np.unpackbits(self.words.astype("<u8").view(np.uint8), bitorder="little")
+        return bits[:self.rows].astype(np.bool_)
+
+    def assignment(self, row: int) -> Dict[str, bool]:
+        n = len(self.variables)
+        return {name: bool(row >> (n - 1 - k) & 1) for k, name in enumerate(self.variables)}
+
+    def first_model(self) -> Optional[int]:
+        nonzero = np.flatnonzero(self.words)
+        if not nonzero.size:
+            return None
+        word = int(self.words[nonzero[0]])
+        return int(nonzero[0]) * 64 + (word & -word).bit_length() - 1
+
+    def page(self, start: int = 0, count: int = 64) -> List[Tuple[Dict[str, bool], bool]]:
+        """(assignment, value) for rows [start, start + count)."""
+        stop = min(start + count, self.rows)
+        column = np.unpackbits(self.words[start // 64:(stop + 63) // 64].astype("<u8").view(np.uint8),
+                               bitorder="little")
+        offset = start // 64 * 64
+        return [(self.assignment(r), bool(column[r - offset])) for r in range(start, stop)]
+
+
+def _variable_words(position: int, words: int) -> np.ndarray:
+    if position < 6:
+        return np.full(words, _LOW_PATTERNS[position], dtype=np.uint64)
+    block = 1 << (position - 6)
+    pattern = np.concatenate([np.zeros(block, dtype=np.uint64), np.full(block, _ALL, dtype=np.uint64)])
+    return np.tile(pattern, words // (2 * block))
+
+
+def _table_words(variables: int) -> int:
+    return max(1, (1 << variables) // 64)
+
+
+def fits_truth_table(compiled: CompiledFormula) -> bool:
+    """Whether truth_table() accepts the formula: few enough variables and a shallow enough stack."""
+    n = len(compiled.variables)
+    return n <= MAX_TABLE_VARIABLES and compiled.depth * _table_words(n) <= MAX_TABLE_STACK_WORDS
+
+
+@timed(size=lambda formula, progress=None: len(compile_formula(formula).variables))
+def truth_table(formula: str, progress: Optional[Progress] = None) -> TruthTable:
+    """
+    Evaluate formula on all 2^n assignments at once. Raises LogicError past
+    MAX_TABLE_VARIABLES or when its pending operands would exceed
+    MAX_TABLE_STACK_WORDS. progress(position, length) follows the program.
+    """
+    compiled = compile_formula(formula)
+    n = len(compiled.variables)
+    if n > MAX_TABLE_VARIABLES:
+        raise LogicError(f"{n} variables is more than the {MAX_TABLE_VARIABLES} a truth table allows")
+    if not fits_truth_table(compiled):
+        raise LogicError(f"Nesting {compiled.depth} operands deep over {n} variables is too large for a truth table")
+    words = _table_words(n)
+    positions = {name: n - 1 - k for k, name in enumerate(compiled.variables)}
+    stack: List[np.ndarray] = []
+    for position, (op, arg) in enumerate(compiled.program):
+        if progress is not None:
+            progress(position, len(compiled.program))
+        if op == "var":
+            stack.append(_variable_words(positions[arg], words))
+        elif op == "const":
+            stack.append(np.full(words, _ALL if arg else 0, dtype=np.uint64))
+        elif op == "not":
+            np.invert(stack[-1], out=stack[-1])
+        else:
+            b = stack.pop()
+            a = stack[-1]
+            if op == "and":
+                np.bitwise_and(a, b, out=a)
+            elif op == "or":
+                np.bitwise_or(a, b, out=a)
+            elif op == "xor":
+                np.bitwise_xor(a, b, out=a)
+            elif op == "implies":
+                np.bitwise_or(np.invert(a, out=a), b, out=a)
+            else:
+                np.invert(np.bitwise_xor(a, b, out=a), out=a)
+    result = stack[0]
+    if n < 6:
+        # Only the low 2^n bits of the single word are rows
+        result &= np.uint64((1 << (1 << n)) - 1)
+    return TruthTable(compiled.variables, result)
+
+
+class BDD:
+    """
+    Reduced ordered BDD manager. Nodes are ints: 0 and 1 are the constants,
+    every other node is (level, low, high) in the unique table, so equal
+    functions over the same order are the same int.
+    """
+
+    FALSE, TRUE = 0, 1
+
+    def __init__(self, variables: Tuple[str, ...]):
+        if len(variables) > MAX_BDD_VARIABLES:
+            raise LogicError(f"{len(variables)} variables is more than the {MAX_BDD_VARIABLES} a BDD allows")
+        self.variables = variables
+        self.levels = {name: k for k, name in enumerate(variables)}
+        terminal = (len(variables), -1, -1)
+        self._nodes: List[Tuple[int, int, int]] = [terminal, terminal]
+        self._unique: Dict[Tuple[int, int, int], int] = {}
+        self._ite: Dict[Tuple[int, int, int], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def _make(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            if len(self._nodes) >= MAX_BDD_NODES:
+                raise LogicError(f"The decision diagram grew past {MAX_BDD_NODES:,} nodes")
+            node = self._unique[key] = len(self._nodes)
+            self._nodes.append(key)
+        return node
+
+    def var(self, name: str) -> int:
+        return self._make(self.levels[name], self.FALSE, self.TRUE)
+
+    def _cofactors(self, node: int, level: int) -> Tuple[int, int]:
+        node_level, low, high = self._nodes[node]
+        return (low, high) if node_level == level else (node, node)
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """if f then g else h. Recursion goes one level down per call, so its depth is at most n."""
+        if f == self.TRUE:
+            return g
+        if f == self.FALSE:
+            return h
+        if g == h:
+            return g
+        if g == self.TRUE and h == self.FALSE:
+            return f
+        key = (f, g, h)
+        cached = self._ite.get(key)
+        if cached is not None:
+            return cached
+        level = min(self._nodes[f][0], self._nodes[g][0], self._nodes[h][0])
+        f0, f1 = self._cofactors(f, level)
+        g0, g1 = self._cofactors(g, level)
+        h0, h1 = self._cofactors(h, level)
+        node = self._ite[key] = self._make(level, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        return node
+
+    def negate(self, f: int) -> int:
+        return self.ite(f, self.FALSE, self.TRUE)
+
+    def apply(self, op: str, f: int, g: int) -> int:
+        if op == "and":
+            return self.ite(f, g, self.FALSE)
+        if op == "or":
+            return self.ite(f, self.TRUE, g)
+        if op == "xor":
+            return self.ite(f, self.negate(g), g)
+        if op == "implies":
+            return self.ite(f, g, self.TRUE)
+        if op == "iff":
+            return self.ite(f, g, self.negate(g))
+        raise ValueError(f"Unknown connective: {op}")
+
+    def build(self, compiled: CompiledFormula, progress: Optional[Progress] = None) -> int:
+        """The node for compiled; progress(position, length) is called before each postfix step."""
+        stack: List[int] = []
+        for position, (op, arg) in enumerate(compiled.program):
+            if progress is not None:
+                progress(position, len(compiled.program))
+            if op == "var":
+                stack.append(self.var(arg))
+            elif op == "const":
+                stack.append(self.TRUE if arg else self.FALSE)
+            elif op == "not":
+                stack.append(self.negate(stack.pop()))
+            else:
+                g = stack.pop()
+                stack.append(self.apply(op, stack.pop(), g))
+        return stack[0]
+
+    def sat_count(self, root: int) -> int:
+        """Number of assignments to all the manager's variables that make root true."""
+        counts = {self.FALSE: 0, self.TRUE: 1}
+        nodes = self._nodes
+
+        def count(node: int) -> int:
+            if node not in counts:
+                level, low, high = nodes[node]
+                counts[node] = (count(low) << (nodes[low][0] - level - 1)) + \
+                               (count(high) << (nodes[high][0] - level - 1))
+            return counts[node]
+
+        return count(root) << nodes[root][0]
+
+    def any_sat(self, root: int) -> Optional[Dict[str, bool]]:
+        """One satisfying assignment (variables off the path are False), or None."""
+        if root == self.FALSE:
+            return None
+        assignment = dict.fromkeys(self.variables, False)
+        node = root
+        while node > self.TRUE:
+            level, low, high = self._nodes[node]
+            if low == self.FALSE:
+                assignment[self.variables[level]] = True
+                node = high
+            else:
+                node = low
+        return assignment
+
+
+@timed(size=lambda formula, progress=None: len(compile_formula(formula).variables))
+def analyze(formula: str, progress: Optional[Progress] = None) -> LogicResult:
+    """Model count, an example model and the verdict, by truth table when small enough, else by BDD."""
+    compiled = compile_formula(formula)
+    if fits_truth_table(compiled):
+        table = truth_table(formula, progress)
+        first = table.first_model()
+        example = table.assignment(first) if first is not None else None
+        return LogicResult(compiled.text, compiled.variables, table.models, table.rows, example, "truth table")
+    bdd = BDD(compiled.variables)
+    root = bdd.build(compiled, progress)
+    return LogicResult(compiled.text, compiled.variables, bdd.sat_count(root), 1 << len(compiled.variables),
+                       bdd.any_sat(root), "bdd")
+
+
+def is_satisfiable(formula: str) -> bool:
+    compiled = compile_formula(formula)
+    return BDD(compiled.variables).build(compiled) != BDD.FALSE
+
+
+def is_tautology(formula: str) -> bool:
+    compiled = compile_formula(formula)
+    return BDD(compiled.variables).build(compiled) == BDD.TRUE
+
+
+@timed(size=lambda f, g, progress=None: len(compile_formula(f).variables) + len(compile_formula(g).variables))
+def equivalence(f: str, g: str, progress: Optional[Progress] = None) -> Optional[Dict[str, bool]]:
+    """
+    None when f and g are equivalent, otherwise an assignment on which they
+    differ. progress(position, length) follows g's program after f's.
+    """
+    first, second = compile_formula(f), compile_formula(g)
+    bdd = BDD(tuple(dict.fromkeys(first.variables + second.variables)))
+    length = len(first.program) + len(second.program)
+    on_first = on_second = None
+    if progress is not None:
+        on_first = lambda position, _: progress(position, length)
+        on_second = lambda position, _: progress(len(first.program) + position, length)
+    return bdd.any_sat(bdd.apply("xor", bdd.build(first, on_first), bdd.build(second, on_second)))
+
+
+def logic_axiom(result: LogicResult) -> int:
+    return result.models % AXIOM_COUNT
+
+
+def format_assignment(assignment: Dict[str, bool]) -> str:
+    return ", ".join(f"{name}={int(value)}" for name, value in assignment.items())
+
+
+def _compile_cache_metrics():
+    info = compile_formula.cache_info()
+    return cache_family("semantic_logic_cache", {"compiled": (info.hits, info.misses)})
+
+
+metrics.collector(_compile_cache_metrics)
@@ -0,0 +1,95 @@
+"""
+Facts about a ** b that never build the full integer.
+
+The axiom comes from pow(a, b, 11), primality from structure (a ** b with
+b > 1 is never prime), the digit count and leading digits from a
+high-precision base-10 logarithm and the trailing digits from modular
+exponentiation. expand_power only builds the number when explicitly asked
+and within MAX_EXPANDED_DIGITS.
+"""
+
+from decimal import Context, Decimal
+
+from primality import is_prime
+from semantic_axioms import AXIOM_COUNT
+
+# Results with at most this many digits are printed in full
+INLINE_DIGITS = 60
+EDGE_DIGITS = 12
+MAX_EXPANDED_DIGITS = 200000
+
+# Python refuses int -> str past this many digits; split the number instead
+_STR_CHUNK_DIGITS = 4000
+
+
+def power_axiom(a: int, b: int) -> int:
+    return pow(a, b, AXIOM_COUNT)
+
+
+def power_is_prime(a: int, b: int) -> bool:
+    if b == 1:
+        return is_prime(a)
+    # a ** 0 == 1, and a ** b for b > 1 is 0, 1 or a proper power
+    return False
+
+
+def _log10_power(a: int, b: int) -> Decimal:
+    ctx = Context(prec=len(str(b)) + 30)
+    return ctx.multiply(Decimal(b), ctx.log10(Decimal(abs(a))))
+
+
+def power_digit_count(a: int, b: int) -> int:
+    """Number of decimal digits of |a ** b| for b >= 0."""
+    if abs(a) <= 1 or b == 0:
+        return 1
+    if b * abs(a).bit_length() <= 3 * _STR_CHUNK_DIGITS:
+        # Small enough to build and print directly, which beats the Decimal log
+        return len(str(abs(a) ** b))
+    digits = int(_log10_power(a, b)) + 1
+    # Correct a log that lands within rounding error of an integer
+    if digits <= _STR_CHUNK_DIGITS:
+        return len(str(abs(a) ** b))
+    return digits
+
+
+def power_leading_digits(a: int, b: int, k: int = EDGE_DIGITS) -> str:
+    if abs(a) <= 1 or b == 0:
+        return str(abs(a) ** b)
+    log = _log10_power(a, b)
+    fraction = log - int(log)
+    ctx = Context(prec=k + 20)
+    mantissa = ctx.power(Decimal(10), fraction)
+    return str(int(mantissa.scaleb(k - 1)))[:k]
+
+
+def power_trailing_digits(a: int, b: int, k: int = EDGE_DIGITS) -> str:
+    digits = power_digit_count(a, b)
+    return str(pow(abs(a), b, 10 ** k)).zfill(min(k, digits))
+
+
+def _int_to_str(n: int) -> str:
+    if n < 0:
+        return "-" + _int_to_str(-n)
+    if n.bit_length() < 3 * _STR_CHUNK_DIGITS:
+        return str(n)
+    half = (len(bin(n)) * 3 // 10) // 2
+    high, low = divmod(n, 10 ** half)
+    return _int_to_str(high) + _int_to_str(low).zfill(half)
+
+
+def expand_power(a: int, b: int) -> str:
+    """The full decimal expansion of a ** b, refused past MAX_EXPANDED_DIGITS."""
+    digits = power_digit_count(a, b)
+    if digits > MAX_EXPANDED_DIGITS:
+        raise ValueError(f"{a} ^ {b} has {digits:,} digits; expansion is limited to {MAX_EXPANDED_DIGITS:,}")
+    return _int_to_str(a ** b)
+
+
+def format_power(a: int, b: int, expand: bool = False) -> str:
+    """a ** b in full when short (or when expand is set), otherwise abbreviated."""
+    digits = power_digit_count(a, b)
+    if expand or digits <= INLINE_DIGITS:
+        return expand_power(a, b)
+    sign = "-" if a < 0 and b % 2 else ""
+    return f"{sign}{power_leading_digits(a, b)}…{power_trailing_digits(a, b)} ({digits:,} digits)"
+
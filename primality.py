@@ -0,0 +1,127 @@
+"""
+Primality engine: small-prime pre-filter, deterministic Miller-Rabin for
+n < 2^64 and Baillie-PSW (Miller-Rabin base 2 + strong Lucas) above that.
+"""
+
+from math import isqrt
+from typing import Optional
+
+from prime_sieve import primes_up_to
+
+SMALL_PRIMES = primes_up_to(1000)
+_SMALL_PRIME_SET = frozenset(SMALL_PRIMES)
+
+# Bases that make Miller-Rabin deterministic for every n < 2^64
+MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def _miller_rabin(n: int, base: int) -> bool:
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas(n: int) -> bool:
+    # Selfridge's method A: first D in 5, -7, 9, -11, ... with (D/n) = -1
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    d = n + 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = P * U + V, D * U + P * V
+            if U % 2:
+                U += n
+            if V % 2:
+                V += n
+            U, V = U // 2 % n, V // 2 % n
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if V == 0:
+            return True
+    return False
+
+
+def is_prime(n: int) -> bool:
+    if n < 2:
+        return False
+    if n in _SMALL_PRIME_SET:
+        return True
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return False
+    if n < SMALL_PRIMES[-1] ** 2:
+        return True
+    if n < 1 << 64:
+        return all(_miller_rabin(n, a) for a in MR_BASES_64)
+    if isqrt(n) ** 2 == n:
+        return False
+    return _miller_rabin(n, 2) and _strong_lucas(n)
+
+
+def next_prime(n: int) -> int:
+    """Smallest prime strictly greater than n."""
+    if n < 2:
+        return 2
+    candidate = n + 1 if n % 2 == 0 else n + 2
+    while not is_prime(candidate):
+        candidate += 2
+    return candidate
+
+
+def prev_prime(n: int) -> Optional[int]:
+    """Largest prime strictly less than n, or None when n <= 2."""
+    if n <= 2:
+        return None
+    if n == 3:
+        return 2
+    candidate = n - 1 if n % 2 == 0 else n - 2
+    while not is_prime(candidate):
+        candidate -= 2
+    return candidate
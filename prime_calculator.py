@@ -1,148 +1,18 @@
 import streamlit as st
-from typing import List
-import json
-import sympy as sp
 
-# Semantic axioms and colors
-axioms = {
-    0: "Void – potential",
-    1: "Monad – distinction",
-    2: "Duality – relation",
-    3: "Triad – transformation",
-    4: "Pattern – recurrence",
-    5: "Growth – identity",
-    6: "Recursion – memory",
-    7: "Self-awareness",
-    8: "Interconnection",
-    9: "Unity – integration",
-    10: "Rebirth – next scale",
-}
-axiom_colors = {
-    0: "⚪", 1: "🔴", 2: "🔵", 3: "🟡", 4: "🟠",
-    5: "🟢", 6: "🟣", 7: "🟤", 8: "🟥", 9: "🟦", 10: "⬜"
-}
-
-# Prime number utilities
-def is_prime(n: int) -> bool:
-    if n < 2:
-        return False
-    for i in range(2, int(n**0.5)+1):
-        if n % i == 0:
-            return False
-    return True
-
-def generate_primes_up_to(n: int) -> List[int]:
-    primes = []
-    for num in range(2, n+1):
-        if is_prime(num):
-            primes.append(num)
-    return primes
-
-def semantic_prime(n: int) -> str:
-    prime_status = is_prime(n)
-    if prime_status:
-        return f"{n} is PRIME! 🚀 Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
-    else:
-        return f"{n} is not prime. Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
-
-def semantic_primes_trace(n: int) -> str:
-    primes = generate_primes_up_to(n)
-    trace = [f"{p}: {axiom_colors[p % 11]} {axioms[p % 11]}" for p in primes]
-    return " → ".join(trace)
-
-def semantic_add_prime_highlight(a: int, b: int) -> str:
-    total = a + b
-    result = total % 11
-    highlight = "🌟 PRIME!" if is_prime(total) else ""
-    meaning = axioms.get(result, "Unknown")
-    return f"{a} + {b} = {total} → Axiom {result}: {axiom_colors[result]} {meaning} {highlight}"
-
-def semantic_power(a: int, b: int) -> str:
-    power = a ** b
-    result = power % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(power) else ""
-    return f"{a} ^ {b} = {power} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_mod(a: int, b: int) -> str:
-    if b == 0:
-        return "Modulus by zero is undefined."
-    mod = a % b
-    result = mod % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(mod) else ""
-    return f"{a} mod {b} = {mod} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_subtract(a: int, b: int) -> str:
-    difference = a - b
-    result = difference % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(difference) else ""
-    return f"{a} - {b} = {difference} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_multiply(a: int, b: int) -> str:
-    product = a * b
-    result = product % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(product) else ""
-    return f"{a} × {b} = {product} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_divide(a: int, b: int) -> str:
-    if b == 0:
-        return "Division by zero is undefined."
-    quotient = a / b
-    result = int(quotient) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(int(quotient)) else ""
-    return f"{a} ÷ {b} = {quotient:.2f} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_derivative(expr: str, var: str) -> str:
-    try:
-        x = sp.Symbol(var)
-        parsed_expr = sp.sympify(expr)
-        derivative = sp.diff(parsed_expr, x)
-        return f"d/d{var}({expr}) = {sp.pretty(derivative)}"
-    except Exception as e:
-        return f"Error computing derivative: {e}"
-
-def semantic_integral(expr: str, var: str) -> str:
-    try:
-        x = sp.Symbol(var)
-        parsed_expr = sp.sympify(expr)
-        integral = sp.integrate(parsed_expr, x)
-        return f"∫ {expr} d{var} = {sp.pretty(integral)} + C"
-    except Exception as e:
-        return f"Error computing integral: {e}"
-
-def compose_idea(path: List[int]) -> str:
-    trace = []
-    for value in path:
-        concept = axioms.get(value % 11, "Unknown")
-        symbol = axiom_colors.get(value % 11, "")
-        trace.append(f"{symbol} {value} → {concept}")
-    return " →→→ ".join(trace)
-
-def semantic_and(a: int, b: int) -> str:
-    result = (a & b) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(a & b) else ""
-    return f"{a} AND {b} = {a & b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_or(a: int, b: int) -> str:
-    result = (a | b) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(a | b) else ""
-    return f"{a} OR {b} = {a | b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_not(a: int) -> str:
-    result = (~a) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(~a) else ""
-    return f"NOT {a} = {~a} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+from prime_pages import clear_prime_pages, render_prime_pages, start_prime_pages
+from semantic_axioms import axioms, axiom_colors
+from semantic_compose import EXPORT_FORMATS, export_bytes, parse_path
+from semantic_core import (
+    compose_idea, semantic_add_prime_highlight, semantic_and, semantic_derivative, semantic_divide,
+    semantic_integral, semantic_mod, semantic_multiply, semantic_not, semantic_or, semantic_power,
+    semantic_prime, semantic_subtract, warm_up,
+)
 
 # Streamlit UI
 st.set_page_config(page_title="Semantic Calculator with Primes", layout="centered")
 st.title("🧠 Semantic Processor & Prime Composer")
+warm_up()
 
 with st.expander("📘 Axiom Legend"):
     for i in range(11):
@@ -195,19 +65,17 @@ st.header("🌌 Idea Composer")
 idea_input = st.text_input("Enter a sequence of numbers separated by commas (e.g. 0,1,2,3):")
 if st.button("🧬 Compose Idea"):
     try:
-        path = [int(x.strip()) for x in idea_input.split(",") if x.strip().isdigit()]
-        result = compose_idea(path)
-        st.info(result)
-
-        if st.button("💾 Export as JSON"):
-            json_data = json.dumps({"idea_sequence": path, "semantic_trace": result}, indent=2)
-            st.download_button("Download JSON", json_data, file_name="semantic_idea.json")
-
-        if st.button("📄 Export as Text"):
-            txt_data = result
-            st.download_button("Download Text", txt_data, file_name="semantic_idea.txt")
+        st.session_state["idea_path"] = parse_path(idea_input)
     except Exception as e:
         st.error(f"Error: {e}")
+if "idea_path" in st.session_state:
+    path = st.session_state["idea_path"]
+    st.info(compose_idea(path.tolist()))
+    export_format = st.selectbox("Export format:", list(EXPORT_FORMATS))
+    _, extension, mime = EXPORT_FORMATS[export_format]
+    # Built only when clicked, on Streamlit's download thread
+    st.download_button(f"💾 Export as {export_format}", data=lambda: export_bytes(path, export_format),
+                       file_name=f"semantic_idea.{extension}", mime=mime)
 
 st.markdown("---")
 st.subheader("🧠 Try a Semantic Template")
@@ -236,7 +104,8 @@ if st.button("Check Prime"):
 
 seq_limit = st.number_input("Generate primes up to:", value=20, step=1)
 if st.button("Compose Prime Sequence"):
-    st.info(semantic_primes_trace(seq_limit))
+    start_prime_pages("trace", 2, seq_limit)
+render_prime_pages("trace", as_table=False)
 
 st.markdown("---")
 st.header("🔎 Find Primes in Range")
@@ -244,10 +113,10 @@ prime_range_min = st.number_input("Prime range minimum:", value=2, step=1)
 prime_range_max = st.number_input("Prime range maximum:", value=100, step=1)
 if st.button("Find Primes in Range"):
     if prime_range_max >= prime_range_min:
-        primes = generate_primes_up_to(prime_range_max)
-        primes_in_range = [p for p in primes if p >= prime_range_min]
-        st.markdown("**Primes found:**")
-        for p in primes_in_range:
-            st.markdown(f"- {p}: {axiom_colors[p % 11]} {axioms[p % 11]}")
+        start_prime_pages("range", prime_range_min, prime_range_max)
     else:
+        clear_prime_pages("range")
         st.error("Maximum must be greater than or equal to minimum.")
+if "range_query" in st.session_state:
+    st.markdown("**Primes found:**")
+    render_prime_pages("range")
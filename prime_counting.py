@@ -0,0 +1,98 @@
+"""
+Exact prime counting and nth-prime lookup.
+
+prime_pi uses the Lucy_Hedgehog recurrence, vectorized with NumPy over the
+O(sqrt(x)) distinct values of x // k. nth_prime estimates p_n analytically,
+counts the primes below the estimate exactly and segment-sieves only the
+remaining gap. When a memory-mapped prime table is loaded, counts inside
+its limit are read from the table's popcount checkpoints instead.
+"""
+
+from math import isqrt, log
+from typing import List
+
+import numpy as np
+
+from instrumentation import timed
+from prime_sieve import primes_in_range, primes_up_to
+from result_cache import cached
+from shared_primes import shared_table
+
+# Below this n it is cheaper to sieve straight up to the upper bound on p_n
+SIEVE_NTH_LIMIT = 100000
+# Largest arguments the UI, CLI and service accept, each about a second of work
+MAX_PRIME_PI = 3 * 10**10
+MAX_NTH_PRIME = 10**9
+
+
+@timed(size=lambda x: x)
+@cached("prime_pi")
+def prime_pi(x: int) -> int:
+    """Number of primes <= x."""
+    if x < 2:
+        return 0
+    table = shared_table.mapped
+    if table is not None and x <= table.limit:
+        return table.pi(x)
+    r = isqrt(x)
+    # small[v] = count for v <= r, large[k] = count for x // k
+    small = np.arange(-1, r, dtype=np.int64)
+    large = np.zeros(r + 1, dtype=np.int64)
+    large[1:] = x // np.arange(1, r + 1, dtype=np.int64) - 1
+    for p in primes_up_to(r):
+        below = small[p - 1]
+        p2 = p * p
+        limit = min(r, x // p2)
+        direct = min(limit, r // p)
+        large[1:direct + 1] -= large[p:direct * p + 1:p] - below
+        if limit > direct:
+            k = np.arange(direct + 1, limit + 1, dtype=np.int64)
+            large[direct + 1:limit + 1] -= small[x // (k * p)] - below
+        if p2 <= r:
+            v = np.arange(p2, r + 1, dtype=np.int64)
+            small[p2:] -= small[v // p] - below
+    return int(large[1])
+
+
+def nth_prime_upper_bound(n: int) -> int:
+    """Rosser's bound p_n < n (ln n + ln ln n) for n >= 6."""
+    if n < 6:
+        return 13
+    return int(n * (log(n) + log(log(n)))) + 1
+
+
+def _nth_prime_estimate(n: int) -> int:
+    # Cipolla's asymptotic expansion of p_n
+    L = log(n)
+    LL = log(L)
+    return int(n * (L + LL - 1 + (LL - 2) / L - (LL * LL - 6 * LL + 11) / (2 * L * L)))
+
+
+@timed(size=lambda n: n)
+@cached("nth_prime")
+def nth_prime(n: int) -> int:
+    """The n-th prime, 1-indexed (nth_prime(1) == 2)."""
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    if n <= SIEVE_NTH_LIMIT:
+        return primes_up_to(nth_prime_upper_bound(n))[n - 1]
+
+    x = _nth_prime_estimate(n)
+    count = prime_pi(x)
+    window = max(isqrt(x), 1 << 16)
+    if count >= n:
+        hi = x
+        while True:
+            lo = max(hi - window + 1, 2)
+            primes: List[int] = primes_in_range(lo, hi)
+            before = count - len(primes)
+            if before < n:
+                return primes[n - before - 1]
+            count, hi = before, lo - 1
+    lo = x + 1
+    while True:
+        primes = primes_in_range(lo, lo + window - 1)
+        if count + len(primes) >= n:
+            return primes[n - count - 1]
+        count += len(primes)
+        lo += window
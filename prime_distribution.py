@@ -0,0 +1,149 @@
+"""
+Binned prime counts, the π(x) curve and its x/ln x and Li(x) overlays.
+
+[2, n] is cut into at most POINT_BUDGET bins and every sieve segment's
+odd-only flags are popcounted bin by bin, so a chart costs the same
+POINT_BUDGET points whether n is 100 or 10^10. π(x) at the bin edges is the
+running sum of the bins, and the counts of primes in each residue class mod
+AXIOM_COUNT come from the same flags. Memory stays at one segment.
+
+When a wheel-30 table (prime_table.py) covering n is mapped, nothing is
+sieved: bins are differences of its popcount-checkpointed π(x) and the
+residue counts are byte histograms of its data.
+"""
+
+from typing import Dict, Iterator
+
+import numpy as np
+
+from instrumentation import timed
+from prime_sieve import segment_flags
+from prime_table import PrimeTable
+from semantic_axioms import AXIOM_COUNT
+from shared_primes import shared_table
+
+POINT_BUDGET = 2000
+SEGMENT_SPAN = 1 << 24
+EULER_GAMMA = 0.5772156649015329
+LI_2 = 1.0451637801174928
+
+
+def li(x: np.ndarray) -> np.ndarray:
+    """
+    Logarithmic integral li(x) for x > 1, from Ramanujan's series
+    li(x) = γ + ln ln x + √x Σ (-1)^(k-1) (ln x)^k / (k! 2^(k-1)) Σ_{j < (k+1)/2} 1/(2j+1).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    L = np.log(x)
+    term = np.ones_like(x)
+    inner = 0.0
+    total = np.zeros_like(x)
+    # Terms peak around k = ln x / 2 and then fall off factorially
+    for k in range(1, int(4 * L.max(initial=1.0)) + 30):
+        term = term * (-L / 2) / k if k > 1 else L.copy()
+        if k % 2:
+            inner += 1.0 / k
+        total += term * inner
+    return EULER_GAMMA + np.log(L) + np.sqrt(x) * total
+
+
+def offset_li(x: np.ndarray) -> np.ndarray:
+    """Li(x) = li(x) - li(2), the usual estimate of π(x); 0 below 2."""
+    x = np.asarray(x, dtype=np.float64)
+    out = np.zeros_like(x)
+    above = x > 2
+    out[above] = li(x[above]) - LI_2
+    return out
+
+
+class PrimeDistribution:
+    """Running prime counts per bin over [2, limit] for a scan up to bound."""
+
+    def __init__(self, bound: int, points: int = POINT_BUDGET):
+        self.bound = bound
+        self.limit = 1
+        # Bin i holds the primes in [edges[i], edges[i + 1])
+        bins = max(1, min(points, bound - 1))
+        self.edges = np.unique(np.linspace(2, bound + 1, bins + 1).astype(np.int64))
+        self.counts = np.zeros(self.edges.size - 1, dtype=np.int64)
+        self.residues = np.zeros(AXIOM_COUNT, dtype=np.int64)
+
+    @property
+    def prime_count(self) -> int:
+        return int(self.counts.sum())
+
+    def curve(self) -> Dict[str, np.ndarray]:
+        """π(x), x/ln x and Li(x) at the right edge of every bin scanned so far."""
+        done = self.edges[1:] - 1 <= self.limit
+        x = self.edges[1:][done] - 1
+        xf = x.astype(np.float64)
+        return {
+            "x": x,
+            "π(x)": np.cumsum(self.counts[done]),
+            "x/ln x": np.where(xf > 1, xf / np.log(np.maximum(xf, 2.0)), 0.0),
+            "Li(x)": offset_li(xf),
+        }
+
+    def histogram(self) -> Dict[str, np.ndarray]:
+        """Primes per bin, keyed by the bin's first number."""
+        return {"from": self.edges[:-1], "primes": self.counts}
+
+    def residue_counts(self) -> Dict[int, int]:
+        """{r: number of primes ≡ r (mod AXIOM_COUNT)}."""
+        return dict(enumerate(self.residues.tolist()))
+
+    def _add_segment(self, lo: int, hi: int) -> None:
+        if lo <= 2 <= hi:
+            self.counts[0] += 1
+            self.residues[2 % AXIOM_COUNT] += 1
+        first, flags = segment_flags(lo, hi)
+        odd = np.frombuffer(flags, dtype=np.bool_)
+        if odd.size:
+            # Flag i is first + 2*i, so a bin edge e starts at flag ceil((e - first) / 2)
+            starts = np.clip((self.edges - first + 1) // 2, 0, odd.size)
+            for b in range(np.searchsorted(self.edges, lo, "right") - 1,
+                           np.searchsorted(self.edges, hi, "right")):
+                self.counts[b] += np.count_nonzero(odd[starts[b]:starts[b + 1]])
+            hits = np.flatnonzero(odd)
+            # Flag i has residue (first + 2*i) mod AXIOM_COUNT, which depends on i mod AXIOM_COUNT
+            by_phase = np.bincount(hits % AXIOM_COUNT, minlength=AXIOM_COUNT)
+            phases = (first + 2 * np.arange(AXIOM_COUNT)) % AXIOM_COUNT
+            np.add.at(self.residues, phases, by_phase)
+        self.limit = hi
+
+
+def table_distribution(table: PrimeTable, n: int, points: int = POINT_BUDGET) -> PrimeDistribution:
+    """The distribution up to n <= table.limit, read from the table without sieving."""
+    dist = PrimeDistribution(n, points)
+    dist.counts = np.diff([table.pi(int(edge) - 1) for edge in dist.edges]).astype(np.int64)
+    dist.residues = table.residue_counts(AXIOM_COUNT, n)
+    dist.limit = n
+    return dist
+
+
+def iter_prime_distribution(n: int, points: int = POINT_BUDGET,
+                            segment_span: int = SEGMENT_SPAN) -> Iterator[PrimeDistribution]:
+    """
+    Scan [2, n] segment by segment, yielding the same running distribution
+    after each one; a single step when the shared table's map covers n.
+    """
+    mapped = shared_table.mapped
+    if mapped is not None and n <= mapped.limit:
+        yield table_distribution(mapped, n, points)
+        return
+    dist = PrimeDistribution(n, points)
+    lo = 2
+    while lo <= n:
+        hi = min(lo + segment_span - 1, n)
+        dist._add_segment(lo, hi)
+        yield dist
+        lo = hi + 1
+
+
+@timed(size=lambda n, points=POINT_BUDGET, segment_span=SEGMENT_SPAN: n)
+def prime_distribution(n: int, points: int = POINT_BUDGET, segment_span: int = SEGMENT_SPAN) -> PrimeDistribution:
+    """Binned counts, π(x) curve and residue counts for the primes up to n."""
+    dist = PrimeDistribution(n, points)
+    for dist in iter_prime_distribution(n, points, segment_span):
+        pass
+    return dist
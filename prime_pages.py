@@ -0,0 +1,60 @@
+"""
+Paginated prime listings shared by both Streamlit apps.
+
+A listing keeps its query and the first prime of every page visited so far
+in session state, so Next and Previous go straight to their page instead of
+re-streaming everything before it.
+"""
+
+from typing import Optional
+
+import streamlit as st
+
+from semantic_stream import MAX_LISTING_BOUND, PAGE_SIZE, prime_rows_page
+
+
+def start_prime_pages(key: str, lo: int, hi: int) -> None:
+    """Start the listing of the primes in [lo, hi] at its first page, or warn if hi is too large."""
+    if hi > MAX_LISTING_BOUND:
+        clear_prime_pages(key)
+        st.warning(f"Input too large! Try <= {MAX_LISTING_BOUND:,}.")
+        return
+    st.session_state[f"{key}_query"] = (lo, hi)
+    st.session_state[f"{key}_starts"] = [lo]
+
+
+def clear_prime_pages(key: str) -> None:
+    st.session_state.pop(f"{key}_query", None)
+    st.session_state.pop(f"{key}_starts", None)
+
+
+def _turn_page(key: str, start: Optional[int]) -> None:
+    # Next pushes the start of the page after; Previous (start None) pops back
+    starts = st.session_state[f"{key}_starts"]
+    if start is None:
+        starts.pop()
+    else:
+        starts.append(start)
+
+
+def render_prime_pages(key: str, as_table: bool = True) -> None:
+    """Show the current page of the listing started under key, with Previous/Next buttons."""
+    if f"{key}_query" not in st.session_state:
+        return
+    _, hi = st.session_state[f"{key}_query"]
+    starts = st.session_state[f"{key}_starts"]
+    page = len(starts) - 1
+    rows, next_start = prime_rows_page(starts[-1], hi)
+    if not rows["Prime"]:
+        st.info("No primes found.")
+        return
+    if as_table:
+        st.dataframe(rows, hide_index=True)
+    else:
+        st.info(" → ".join(f"{p}: {sym} {meaning}" for p, sym, meaning in zip(rows["Prime"], rows["Symbol"], rows["Meaning"])))
+    first = page * PAGE_SIZE + 1
+    prev_col, label_col, next_col = st.columns(3)
+    prev_col.button("◀ Previous", key=f"{key}_prev", disabled=page == 0, on_click=_turn_page, args=(key, None))
+    label_col.caption(f"Page {page + 1} · primes #{first}–#{first + len(rows['Prime']) - 1}")
+    next_col.button("Next ▶", key=f"{key}_next", disabled=next_start is None,
+                    on_click=_turn_page, args=(key, next_start))
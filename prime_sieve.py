@@ -0,0 +1,82 @@
+"""
+Odd-only Sieve of Eratosthenes and segmented range sieve.
+
+Index i of a flag array stands for the odd number first + 2*i, so even
+numbers never take up space and a window [lo, hi] costs (hi - lo) / 2 bytes
+no matter how large lo is.
+"""
+
+from itertools import compress
+from math import isqrt
+from typing import Iterator, List, Tuple
+
+SEGMENT_SPAN = 1 << 18
+
+
+def _slice_len(start: int, stop: int, step: int) -> int:
+    if start >= stop:
+        return 0
+    return (stop - 1 - start) // step + 1
+
+
+def odd_sieve(n: int) -> bytearray:
+    """Flags for the odd numbers 1, 3, ..., <= n (flag i is 2*i + 1)."""
+    size = (n + 1) // 2
+    if size <= 0:
+        return bytearray()
+    flags = bytearray(b"\x01") * size
+    flags[0] = 0
+    for i in range(1, (isqrt(n) - 1) // 2 + 1):
+        if flags[i]:
+            p = 2 * i + 1
+            start = p * p // 2
+            flags[start::p] = bytes(_slice_len(start, size, p))
+    return flags
+
+
+def primes_up_to(n: int) -> List[int]:
+    if n < 2:
+        return []
+    return [2] + list(compress(range(1, n + 1, 2), odd_sieve(n)))
+
+
+def segment_flags(lo: int, hi: int) -> Tuple[int, bytearray]:
+    """
+    Sieve only the odd numbers in [lo, hi].
+    Returns (first, flags) where flag i stands for first + 2*i.
+    """
+    lo = max(lo, 3)
+    first = lo | 1
+    if hi < first:
+        return first, bytearray()
+    size = (hi - first) // 2 + 1
+    flags = bytearray(b"\x01") * size
+    limit = isqrt(hi)
+    for p in compress(range(1, limit + 1, 2), odd_sieve(limit)):
+        start = max(p * p, (first + p - 1) // p * p)
+        if start % 2 == 0:
+            start += p
+        offset = (start - first) // 2
+        flags[offset::p] = bytes(_slice_len(offset, size, p))
+    return first, flags
+
+
+def primes_in_range(lo: int, hi: int) -> List[int]:
+    """All primes p with lo <= p <= hi, sieving only that window."""
+    if hi < 2 or hi < lo:
+        return []
+    primes = [2] if lo <= 2 else []
+    first, flags = segment_flags(lo, hi)
+    primes.extend(compress(range(first, hi + 1, 2), flags))
+    return primes
+
+
+def iter_primes_in_range(lo: int, hi: int, segment_span: int = SEGMENT_SPAN) -> Iterator[List[int]]:
+    """Primes in [lo, hi] yielded one sieved segment at a time."""
+    lo = max(lo, 0)
+    while lo <= hi:
+        stop = min(lo + segment_span - 1, hi)
+        primes = primes_in_range(lo, stop)
+        if primes:
+            yield primes
+        lo = stop + 1
@@ -0,0 +1,251 @@
+"""
+Memory-mapped wheel-30 prime bitset.
+
+File layout (little endian):
+
+    header       magic "PRMW30\\0\\0", version u32, block_bytes u32,
+                 limit u64, data_bytes u64, blocks u64          (40 bytes)
+    checkpoints  (blocks + 1) x u64, primes > 5 before each block
+    data         one byte per 30 integers; bit j of byte k is set when
+                 30*k + WHEEL_RESIDUES[j] is prime
+
+Primes up to 10^10 take ~333 MB. The file is opened with mmap and read
+through NumPy views, so every worker process shares the same page cache
+and loading costs nothing up front.
+
+Build a table with:  python prime_table.py primes.w30 1000000000
+"""
+
+import mmap
+import os
+import struct
+import sys
+from math import gcd
+from typing import Iterator, Optional
+
+import numpy as np
+
+from prime_sieve import segment_flags
+
+MAGIC = b"PRMW30\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+DEFAULT_BLOCK_BYTES = 4096
+BUILD_CHUNK_BLOCKS = 128
+
+WHEEL_RESIDUES = (1, 7, 11, 13, 17, 19, 23, 29)
+_SMALL = (2, 3, 5)
+_RESIDUE_ARRAY = np.array(WHEEL_RESIDUES, dtype=np.int64)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+# _BITS[v, j] is bit j of the byte value v
+_BITS = np.array([[v >> j & 1 for j in range(8)] for v in range(256)], dtype=np.int64)
+# _BELOW_MASK[r] keeps the bits for residues <= r
+_BELOW_MASK = [sum(1 << j for j, res in enumerate(WHEEL_RESIDUES) if res <= r) for r in range(30)]
+
+
+def _wheel_bytes(k0: int, k1: int, limit: int) -> np.ndarray:
+    """Wheel bytes for the integers [30*k0, 30*k1), ignoring anything above limit."""
+    lo = 30 * k0
+    hi = min(30 * k1 - 1, limit)
+    odd = np.zeros(15 * (k1 - k0) + 1, dtype=np.uint8)
+    if hi >= lo:
+        first, flags = segment_flags(lo, hi)
+        offset = (first - lo - 1) // 2
+        odd[offset:offset + len(flags)] = np.frombuffer(flags, dtype=np.uint8)
+    out = np.zeros(k1 - k0, dtype=np.uint8)
+    for j, r in enumerate(WHEEL_RESIDUES):
+        out |= odd[(r - 1) // 2::15][:k1 - k0] << j
+    return out
+
+
+def write_prime_table(path: str, limit: int, block_bytes: int = DEFAULT_BLOCK_BYTES) -> None:
+    """Sieve [0, limit] segment by segment and write it in the wheel-30 format."""
+    data_bytes = limit // 30 + 1
+    blocks = -(-data_bytes // block_bytes)
+    checkpoints = [0]
+    chunk = block_bytes * BUILD_CHUNK_BLOCKS
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, block_bytes, limit, data_bytes, blocks))
+        f.write(bytes(8 * (blocks + 1)))
+        for k0 in range(0, data_bytes, chunk):
+            k1 = min(k0 + chunk, data_bytes)
+            out = _wheel_bytes(k0, k1, limit)
+            per_block = np.add.reduceat(_POPCOUNT[out], np.arange(0, k1 - k0, block_bytes))
+            for c in per_block:
+                checkpoints.append(checkpoints[-1] + int(c))
+            f.write(out.tobytes())
+        f.seek(HEADER.size)
+        f.write(np.array(checkpoints, dtype="<u8").tobytes())
+
+
+class PrimeTable:
+    """
+    Read-only, sequence-like view of the primes <= limit stored in a
+    wheel-30 file. Supports len(), indexing, slicing, iteration, membership,
+    bisect_left/bisect_right and count(lo, hi) without materializing the
+    whole list.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = None
+        try:
+            # Empty, truncated or foreign files fail anywhere from mmap to the array views
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, block_bytes, limit, data_bytes, blocks = HEADER.unpack_from(self._mmap)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a wheel-30 prime table")
+            self.block_bytes = block_bytes
+            self.limit = limit
+            self._checkpoints = np.frombuffer(self._mmap, dtype="<u8", count=blocks + 1, offset=HEADER.size)
+            self._data = np.frombuffer(self._mmap, dtype=np.uint8, count=data_bytes,
+                                       offset=HEADER.size + 8 * (blocks + 1))
+        except BaseException:
+            self.close()
+            raise
+        self._small = [p for p in _SMALL if p <= limit]
+        self._len = len(self._small) + int(self._checkpoints[-1])
+
+    def close(self) -> None:
+        self._checkpoints = self._data = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "PrimeTable":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def pi(self, x: int) -> int:
+        """Number of primes <= x."""
+        if x > self.limit:
+            raise ValueError(f"{x} is beyond the table limit {self.limit}")
+        if x < 2:
+            return 0
+        small = sum(1 for p in self._small if p <= x)
+        k = x // 30
+        block_start = k - k % self.block_bytes
+        count = int(self._checkpoints[k // self.block_bytes])
+        count += int(_POPCOUNT[self._data[block_start:k]].sum())
+        count += int(_POPCOUNT[int(self._data[k]) & _BELOW_MASK[x % 30]])
+        return small + count
+
+    def count(self, lo: int, hi: int) -> int:
+        """Number of primes p with lo <= p <= hi."""
+        if hi < lo:
+            return 0
+        return self.pi(hi) - self.pi(lo - 1)
+
+    def residue_counts(self, modulus: int, hi: int) -> np.ndarray:
+        """
+        Number of primes p <= hi in each residue class mod modulus. Byte k
+        covers 30*k + r, so its classes depend only on k mod (modulus /
+        gcd(30, modulus)); one byte-value histogram per phase does the rest.
+        """
+        if hi > self.limit:
+            raise ValueError(f"{hi} is beyond the table limit {self.limit}")
+        counts = np.zeros(modulus, dtype=np.int64)
+        for p in self._small:
+            if p <= hi:
+                counts[p % modulus] += 1
+        if hi < 7:
+            return counts
+        k = hi // 30
+        period = modulus // gcd(30, modulus)
+        for phase in range(min(period, k)):
+            per_bit = np.bincount(self._data[phase:k:period], minlength=256) @ _BITS
+            np.add.at(counts, (30 * phase + _RESIDUE_ARRAY) % modulus, per_bit)
+        last = int(self._data[k]) & _BELOW_MASK[hi % 30]
+        for j, r in enumerate(WHEEL_RESIDUES):
+            if last >> j & 1:
+                counts[(30 * k + r) % modulus] += 1
+        return counts
+
+    def bisect_left(self, x: int) -> int:
+        return self.pi(min(x - 1, self.limit))
+
+    def bisect_right(self, x: int) -> int:
+        return self.pi(min(x, self.limit))
+
+    def __contains__(self, n: int) -> bool:
+        if n in self._small:
+            return True
+        if n < 0 or n > self.limit:
+            return False
+        r = n % 30
+        return r in WHEEL_RESIDUES and bool(self._data[n // 30] >> WHEEL_RESIDUES.index(r) & 1)
+
+    def _decode(self, k0: int, k1: int) -> np.ndarray:
+        bits = np.unpackbits(self._data[k0:k1], bitorder="little").reshape(-1, 8)
+        rows, cols = np.nonzero(bits)
+        return 30 * (rows + k0) + _RESIDUE_ARRAY[cols]
+
+    def primes_in_range(self, lo: int, hi: int) -> np.ndarray:
+        """Primes p with lo <= p <= hi as an int64 array."""
+        hi = min(hi, self.limit)
+        lo = max(lo, 0)
+        if hi < lo:
+            return np.zeros(0, dtype=np.int64)
+        small = np.array([p for p in self._small if lo <= p <= hi], dtype=np.int64)
+        wheel = self._decode(lo // 30, hi // 30 + 1)
+        wheel = wheel[(wheel >= lo) & (wheel <= hi)]
+        return np.concatenate([small, wheel])
+
+    def _nth(self, i: int) -> int:
+        if i < len(self._small):
+            return self._small[i]
+        j = i - len(self._small)
+        block = int(np.searchsorted(self._checkpoints, j, side="right")) - 1
+        start = block * self.block_bytes
+        counts = np.cumsum(_POPCOUNT[self._data[start:start + self.block_bytes]])
+        offset = int(np.searchsorted(counts, j - int(self._checkpoints[block]), side="right"))
+        k = start + offset
+        skip = j - int(self._checkpoints[block]) - (int(counts[offset - 1]) if offset else 0)
+        byte = int(self._data[k])
+        for bit, r in enumerate(WHEEL_RESIDUES):
+            if byte >> bit & 1:
+                if skip == 0:
+                    return 30 * k + r
+                skip -= 1
+        raise AssertionError("checkpoint table is inconsistent")
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if start >= stop if step > 0 else start <= stop:
+                return []
+            if step == 1:
+                return self.primes_in_range(self._nth(start), self._nth(stop - 1)).tolist()
+            return [self._nth(i) for i in range(start, stop, step)]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("prime table index out of range")
+        return self._nth(index)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._small
+        for k0 in range(0, len(self._data), self.block_bytes):
+            yield from self._decode(k0, k0 + self.block_bytes).tolist()
+
+
+def load_prime_table(path: Optional[str] = None) -> Optional[PrimeTable]:
+    """Open the table at path (default $PRIME_TABLE_PATH) if it exists."""
+    path = path or os.environ.get("PRIME_TABLE_PATH")
+    if not path or not os.path.exists(path):
+        return None
+    return PrimeTable(path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit("usage: python prime_table.py OUTPUT LIMIT")
+    write_prime_table(sys.argv[1], int(float(sys.argv[2])))
+    with PrimeTable(sys.argv[1]) as table:
+        print(f"Wrote {len(table):,} primes <= {table.limit:,} to {sys.argv[1]}")
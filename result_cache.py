@@ -0,0 +1,384 @@
+"""
+Two-tier cache for the results of deterministic operations.
+
+    @timed(size=lambda n: n)
+    @cached("nth_prime")
+    def nth_prime(n): ...
+
+    @cached("factorize", canonical=lambda n, time_budget=None: (n,))
+    def factorize(n, time_budget): ...
+
+A call is keyed by the operation name and its canonical arguments (JSON,
+so 7 and 7.0 stay distinct), and looked up first in a per-process LRU,
+bounded by MEMORY_ENTRIES and MEMORY_BYTES, with a MEMORY_TTL, then in a
+SQLite file shared by every Streamlit session, service worker and CLI
+process on the machine. Disk rows carry a code version, a hash of this
+directory's Python sources, so editing any module retires every stored
+result instead of serving stale ones; rows older than DISK_TTL count as
+misses. Every DISK_TRIM_EVERY writes the file is trimmed back under
+DISK_BYTES, dropping other versions' rows and then the oldest.
+
+Put @cached below @timed, so that hits are timed too.
+
+Values are stored pickled, which also gives each entry an exact size and
+hands every caller its own copy. A result reaches the disk only if it took
+at least PERSIST_MIN_SECONDS to compute, so microsecond operations do not
+pay for a write. Calls that raise are never cached, and an operation can
+refuse partial results with store=. Keys longer than MAX_KEY_BYTES and
+values larger than MAX_VALUE_BYTES are not cached; arguments that are
+certainly too long, such as a million-step path, are turned away by their
+length before any key is built. Any SQLite error is
+counted and otherwise ignored: the cache can make a call faster, never
+make it fail.
+
+Set $SEMANTIC_RESULT_CACHE=0 to switch caching off and
+$SEMANTIC_RESULT_CACHE_FILE to move the database. Command line:
+
+    python result_cache.py warm | stats | prune | clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import cache_family, metrics
+
+MEMORY_ENTRIES = 4096
+MEMORY_BYTES = 64 << 20
+MEMORY_TTL = 3600.0
+DISK_TTL = 30 * 24 * 3600.0
+DISK_BYTES = 256 << 20
+DISK_TRIM_EVERY = 256
+PERSIST_MIN_SECONDS = 0.001
+MAX_KEY_BYTES = 4096
+MAX_VALUE_BYTES = 1 << 20
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "semantic", "results.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    version TEXT NOT NULL,
+    key TEXT NOT NULL,
+    op TEXT NOT NULL,
+    value BLOB NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (version, key)
+) WITHOUT ROWID
+"""
+
+
+def code_version(directory: str = os.path.dirname(os.path.abspath(__file__))) -> str:
+    """Hash of every .py file in directory; changes whenever any module does."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            with open(os.path.join(directory, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_plain(v) for v in value]
+    raise TypeError(f"cannot key on {type(value).__name__}")
+
+
+def _min_key_bytes(value: Any) -> int:
+    """A lower bound on len(make_key) for value, in time independent of its length."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, np.ndarray):
+        return 2 * value.size
+    if isinstance(value, (list, tuple)):
+        # Every element takes at least a digit and a comma
+        return 2 * len(value)
+    return 1
+
+
+def make_key(op: str, args: tuple) -> str:
+    """The canonical key text; raises TypeError or ValueError for arguments that cannot be keyed."""
+    return json.dumps([op, _plain(args)], separators=(",", ":"), allow_nan=False)
+
+
+class ResultCache:
+    def __init__(self, path: Optional[str] = None, memory_entries: int = MEMORY_ENTRIES,
+                 memory_bytes: int = MEMORY_BYTES, memory_ttl: float = MEMORY_TTL, disk_ttl: float = DISK_TTL,
+                 enabled: bool = True):
+        self.path = path or os.environ.get("SEMANTIC_RESULT_CACHE_FILE") or DEFAULT_PATH
+        self.memory_entries = memory_entries
+        self.memory_bytes = memory_bytes
+        self.memory_ttl = memory_ttl
+        self.disk_ttl = disk_ttl
+        self.enabled = enabled
+        self.persist_min_seconds = PERSIST_MIN_SECONDS
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        # key -> (pickled value, expiry)
+        self._memory: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._bytes = 0
+        self._local = threading.local()
+        self.disk_bytes = DISK_BYTES
+        self.counts = dict.fromkeys(("memory_hits", "disk_hits", "misses", "stores", "persisted",
+                                     "evictions", "disk_evictions", "uncacheable", "disk_errors"), 0)
+        self.ops: Dict[str, List[int]] = {}
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            self._version = os.environ.get("SEMANTIC_CODE_VERSION") or code_version()
+        return self._version
+
+    def _db(self) -> sqlite3.Connection:
+        # sqlite3 connections belong to one thread, and must not cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=2.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, op: str, hit: bool) -> None:
+        with self._lock:
+            self.ops.setdefault(op, [0, 0])[0 if hit else 1] += 1
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self.counts[name] += 1
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """(found, value), trying memory and then disk."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self.counts["memory_hits"] += 1
+                    return True, pickle.loads(entry[0])
+                self._drop(key)
+        try:
+            row = self._db().execute("SELECT value, created FROM results WHERE version = ? AND key = ?",
+                                     (self.version, key)).fetchone()
+        except (sqlite3.Error, OSError):
+            self._bump("disk_errors")
+            row = None
+        if row is None or row[1] < now - self.disk_ttl:
+            self._bump("misses")
+            return False, None
+        self._bump("disk_hits")
+        self._remember(key, row[0])
+        return True, pickle.loads(row[0])
+
+    def put(self, key: str, op: str, value: Any, persist: bool = True) -> None:
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > MAX_VALUE_BYTES:
+            self._bump("uncacheable")
+            return
+        self._remember(key, data)
+        self._bump("stores")
+        if persist:
+            try:
+                self._db().execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                                   (self.version, key, op, data, time.time()))
+                self._bump("persisted")
+                if self.counts["persisted"] % DISK_TRIM_EVERY == 0:
+                    self.trim()
+            except (sqlite3.Error, OSError):
+                self._bump("disk_errors")
+
+    def trim(self) -> int:
+        """Delete rows until the file holds at most disk_bytes of values, other versions and oldest first."""
+        conn = self._db()
+        kept = 0
+        cutoff = None
+        for current, created, size in conn.execute(
+                "SELECT version = ?, created, LENGTH(value) FROM results ORDER BY 1 DESC, 2 DESC", (self.version,)):
+            kept += size
+            if kept > self.disk_bytes:
+                cutoff = (current, created)
+                break
+        if cutoff is None:
+            return 0
+        current, created = cutoff
+        deleted = conn.execute("DELETE FROM results WHERE version != ? OR (? AND created <= ?)",
+                               (self.version, current, created)).rowcount
+        with self._lock:
+            self.counts["disk_evictions"] += deleted
+        return deleted
+
+    def _remember(self, key: str, data: bytes) -> None:
+        with self._lock:
+            if key in self._memory:
+                self._drop(key)
+            self._memory[key] = (data, time.time() + self.memory_ttl)
+            self._bytes += len(data)
+            while len(self._memory) > self.memory_entries or self._bytes > self.memory_bytes:
+                self._drop(next(iter(self._memory)))
+                self.counts["evictions"] += 1
+
+    def _drop(self, key: str) -> None:
+        data, _ = self._memory.pop(key)
+        self._bytes -= len(data)
+
+    def cached(self, op: str, canonical: Optional[Callable[..., tuple]] = None,
+               store: Optional[Callable[[Any], bool]] = None) -> Callable:
+        """
+        Decorator caching fn's results under op. canonical(*args, **kwargs)
+        gives the arguments that determine the result (default: args, then
+        kwargs by name); store(result) can refuse to cache a partial one.
+        """
+        def decorate(fn: Callable) -> Callable:
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                try:
+                    key_args = canonical(*args, **kwargs) if canonical else args + tuple(sorted(kwargs.items()))
+                    too_long = sum(_min_key_bytes(v) for v in key_args) > MAX_KEY_BYTES
+                    key = None if too_long else make_key(op, key_args)
+                except (TypeError, ValueError):
+                    key = None
+                if key is None or len(key) > MAX_KEY_BYTES:
+                    self._bump("uncacheable")
+                    return fn(*args, **kwargs)
+                found, value = self.get(key)
+                self._count(op, found)
+                if found:
+                    return value
+                started = time.perf_counter()
+                value = fn(*args, **kwargs)
+                if store is None or store(value):
+                    self.put(key, op, value, time.perf_counter() - started >= self.persist_min_seconds)
+                return value
+            wrapper.uncached = fn
+            return wrapper
+        return decorate
+
+    def clear(self, memory_only: bool = False) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+        if not memory_only:
+            self._db().execute("DELETE FROM results")
+
+    def prune(self) -> int:
+        """Delete rows from other code versions, rows past DISK_TTL and any over DISK_BYTES; returns how many."""
+        conn = self._db()
+        deleted = conn.execute("DELETE FROM results WHERE version != ? OR created < ?",
+                               (self.version, time.time() - self.disk_ttl)).rowcount
+        deleted += self.trim()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            rows = self._db().execute(
+                "SELECT op, COUNT(*), SUM(LENGTH(value)) FROM results WHERE version = ? GROUP BY op",
+                (self.version,)).fetchall()
+        except (sqlite3.Error, OSError):
+            rows = []
+        with self._lock:
+            return {
+                **self.counts,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._bytes,
+                "disk_entries": sum(count for _, count, _ in rows),
+                "disk_bytes": sum(size or 0 for _, _, size in rows),
+                "disk_by_op": {op: count for op, count, _ in rows},
+                "ops": {op: {"hits": hits, "misses": misses} for op, (hits, misses) in sorted(self.ops.items())},
+                "path": self.path,
+                "version": self.version,
+            }
+
+    def _families(self):
+        counts = self.counts
+        families = cache_family("semantic_result_cache", {
+            "memory": (counts["memory_hits"], counts["disk_hits"] + counts["misses"]),
+            "disk": (counts["disk_hits"], counts["misses"]),
+        })
+        families.append(("semantic_result_cache_memory_bytes", "gauge", "Pickled bytes held in memory.",
+                         [({}, self._bytes)]))
+        families.append(("semantic_result_cache_memory_entries", "gauge", "Entries held in memory.",
+                         [({}, len(self._memory))]))
+        families += [(f"semantic_result_cache_{key}_total", "counter", f"Result cache {key.replace('_', ' ')}.",
+                      [({}, counts[key])]) for key in ("evictions", "disk_evictions", "persisted", "disk_errors")]
+        return families
+
+
+results = ResultCache(enabled=os.environ.get("SEMANTIC_RESULT_CACHE", "1") != "0")
+cached = results.cached
+metrics.collector(results._families)
+
+
+# Popular inputs: the composer's default values and templates, and round numbers
+TEMPLATES = ([0, 1, 2, 3], [5, 6, 7, 9], [2, 4, 6, 10], [2, 3, 5, 7, 11])
+
+
+def warm_up(level: int = 8) -> int:
+    """Compute the popular inputs up to about 10^level into the cache; returns how many calls were made."""
+    from factorization import factorize
+    from goldbach import goldbach_min_pair
+    from prime_counting import nth_prime, prime_pi
+    from semantic_core import (
+        compose_idea, semantic_add_prime_highlight, semantic_and, semantic_divide, semantic_mod,
+        semantic_multiply, semantic_next_prime, semantic_not, semantic_or, semantic_power, semantic_prev_prime,
+        semantic_prime, semantic_subtract,
+    )
+
+    calls: List[Tuple[Callable, tuple]] = [(compose_idea, (list(path),)) for path in TEMPLATES]
+    calls += [(op, (2, 3)) for op in (semantic_add_prime_highlight, semantic_multiply, semantic_power,
+                                      semantic_subtract, semantic_divide, semantic_mod, semantic_and, semantic_or)]
+    calls += [(semantic_not, (2,)), (semantic_prime, (7,)), (semantic_next_prime, (7,)), (semantic_prev_prime, (7,)),
+              (factorize, (28,)), (nth_prime, (10,)), (prime_pi, (100,)), (goldbach_min_pair, (28,))]
+    for k in range(1, level + 1):
+        calls += [(nth_prime, (10 ** k,)), (prime_pi, (10 ** k,)), (goldbach_min_pair, (2 * 10 ** k,))]
+    # Popular inputs are worth a disk row however quickly they compute
+    persist_min_seconds, results.persist_min_seconds = results.persist_min_seconds, 0.0
+    try:
+        for fn, args in calls:
+            fn(*args)
+    finally:
+        results.persist_min_seconds = persist_min_seconds
+    return len(calls)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage the persistent result cache.")
+    parser.add_argument("command", choices=["warm", "stats", "prune", "clear"])
+    parser.add_argument("--level", type=int, default=8, help="warm: round inputs up to 10^level (default: 8)")
+    args = parser.parse_args(argv)
+    # Run as a script this module is __main__; the operations use the instance in result_cache
+    from result_cache import results, warm_up
+    if args.command == "warm":
+        started = time.perf_counter()
+        calls = warm_up(args.level)
+        print(f"Warmed {calls} calls in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    elif args.command == "prune":
+        print(f"Deleted {results.prune():,} stale rows", file=sys.stderr)
+    elif args.command == "clear":
+        results.clear()
+    json.dump(results.stats(), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
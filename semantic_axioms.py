@@ -0,0 +1,20 @@
+# Semantic axioms and colors, indexed by value % 11
+axioms = {
+    0: "Void – potential",
+    1: "Monad – distinction",
+    2: "Duality – relation",
+    3: "Triad – transformation",
+    4: "Pattern – recurrence",
+    5: "Growth – identity",
+    6: "Recursion – memory",
+    7: "Self-awareness",
+    8: "Interconnection",
+    9: "Unity – integration",
+    10: "Rebirth – next scale",
+}
+axiom_colors = {
+    0: "⚪", 1: "🔴", 2: "🔵", 3: "🟡", 4: "🟠",
+    5: "🟢", 6: "🟣", 7: "🟤", 8: "🟥", 9: "🟦", 10: "⬜"
+}
+
+AXIOM_COUNT = len(axioms)
@@ -0,0 +1,188 @@
+"""
+Vectorized semantic operations.
+
+semantic_batch(op, a, b) applies one operation to whole arrays (or any
+iterables) of operands and returns a SemanticBatch of columns: the result
+value, its axiom index (value % 11), a prime flag from a sieve lookup and a
+validity mask for division/modulus by zero. Strings in the same format as
+the scalar semantic_* functions are only built when asked for.
+"""
+
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from instrumentation import timed
+from primality import is_prime
+from prime_sieve import odd_sieve
+from semantic_axioms import AXIOM_COUNT, axiom_colors, axioms
+
+AXIOM_NAMES = np.array([axioms[i] for i in range(AXIOM_COUNT)], dtype=object)
+AXIOM_SYMBOLS = np.array([axiom_colors[i] for i in range(AXIOM_COUNT)], dtype=object)
+
+# Values up to this bound get their prime flag from a cached odd-only sieve
+SIEVE_LOOKUP_LIMIT = 1 << 27
+
+# op -> (symbol, ufunc, arity)
+OPERATIONS = {
+    "add": ("+", np.add, 2),
+    "subtract": ("-", np.subtract, 2),
+    "multiply": ("×", np.multiply, 2),
+    "mod": ("mod", np.remainder, 2),
+    "divide": ("÷", np.true_divide, 2),
+    "and": ("AND", np.bitwise_and, 2),
+    "or": ("OR", np.bitwise_or, 2),
+    "not": ("NOT", np.invert, 1),
+}
+
+_INT64_MAX = np.iinfo(np.int64).max
+_lookup_lock = threading.Lock()
+_lookup_flags = np.zeros(0, dtype=bool)
+
+
+def _odd_flags(limit: int) -> np.ndarray:
+    """Cached prime flags for the odd numbers <= limit (flag i is 2*i + 1)."""
+    global _lookup_flags
+    with _lookup_lock:
+        if 2 * len(_lookup_flags) - 1 < limit:
+            size = min(max(limit, 4 * len(_lookup_flags)), SIEVE_LOOKUP_LIMIT)
+            _lookup_flags = np.frombuffer(odd_sieve(size), dtype=np.uint8).astype(bool)
+        return _lookup_flags
+
+
+def prime_mask(values: np.ndarray, candidates: Optional[np.ndarray] = None) -> np.ndarray:
+    """Elementwise primality of an integer array, optionally only where candidates is set."""
+    mask = np.zeros(values.shape, dtype=bool)
+    if candidates is None:
+        candidates = np.ones(values.shape, dtype=bool)
+    if values.dtype == object:
+        for i in np.flatnonzero(candidates):
+            mask.flat[i] = is_prime(int(values.flat[i]))
+        return mask
+    odd = (values % 2 == 1) & (values > 2) & candidates
+    in_sieve = odd & (values <= SIEVE_LOOKUP_LIMIT)
+    if in_sieve.any():
+        flags = _odd_flags(int(values[in_sieve].max()))
+        mask[in_sieve] = flags[values[in_sieve] // 2]
+    mask[(values == 2) & candidates] = True
+    for i in np.flatnonzero(odd & ~in_sieve):
+        mask.flat[i] = is_prime(int(values.flat[i]))
+    return mask
+
+
+def _as_operand(values: Iterable[int]) -> np.ndarray:
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+        return values.astype(np.int64, copy=False)
+    values = values if isinstance(values, (list, tuple, np.ndarray)) else list(values)
+    try:
+        return np.asarray(values, dtype=np.int64)
+    except OverflowError:
+        return np.asarray([int(v) for v in values], dtype=object)
+
+
+def _may_overflow(op: str, a: np.ndarray, b: Optional[np.ndarray]) -> bool:
+    if a.dtype == object or (b is not None and b.dtype == object) or not a.size:
+        return False
+    largest_a = int(np.abs(a).max())
+    largest_b = int(np.abs(b).max()) if b is not None and b.size else 0
+    if op == "multiply":
+        return largest_a * largest_b > _INT64_MAX
+    if op in ("add", "subtract"):
+        return largest_a + largest_b > _INT64_MAX
+    return False
+
+
+class SemanticBatch:
+    """Columnar results of one semantic operation over many operands."""
+
+    def __init__(self, op: str, a: np.ndarray, b: Optional[np.ndarray],
+                 value: np.ndarray, axiom: np.ndarray, prime: np.ndarray, valid: np.ndarray):
+        self.op = op
+        self.a = a
+        self.b = b
+        self.value = value
+        self.axiom = axiom
+        self.prime = prime
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @property
+    def meaning(self) -> np.ndarray:
+        return AXIOM_NAMES[self.axiom]
+
+    @property
+    def symbol(self) -> np.ndarray:
+        return AXIOM_SYMBOLS[self.axiom]
+
+    def format(self, i: int) -> str:
+        """Row i in the same wording as the scalar semantic_* function."""
+        op_symbol = OPERATIONS[self.op][0]
+        if not self.valid[i]:
+            return "Division by zero is undefined." if self.op == "divide" else "Modulus by zero is undefined."
+        value = self.value[i]
+        axiom = int(self.axiom[i])
+        prime_str = "🌟 PRIME!" if self.prime[i] else ""
+        if self.op == "not":
+            lhs = f"NOT {self.a[i]} = {value}"
+        elif self.op == "divide":
+            lhs = f"{self.a[i]} {op_symbol} {self.b[i]} = {value:.2f}"
+        else:
+            lhs = f"{self.a[i]} {op_symbol} {self.b[i]} = {value}"
+        return f"{lhs} → Axiom {axiom}: {AXIOM_SYMBOLS[axiom]} {AXIOM_NAMES[axiom]} {prime_str}"
+
+    def lines(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self.format(i)
+
+    def to_columns(self) -> dict:
+        return {"a": self.a, "b": self.b, "value": self.value, "axiom": self.axiom,
+                "prime": self.prime, "valid": self.valid}
+
+
+@timed(size=lambda op, a, b=None: len(a))
+def semantic_batch(op: str, a: Iterable[int], b: Optional[Iterable[int]] = None) -> SemanticBatch:
+    """Apply the semantic operation op elementwise to a (and b)."""
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown semantic operation: {op}")
+    _, ufunc, arity = OPERATIONS[op]
+    a = _as_operand(a)
+    if arity == 2:
+        if b is None:
+            raise ValueError(f"{op} needs two operands")
+        b = _as_operand(b)
+        a, b = np.broadcast_arrays(a, b)
+    else:
+        b = None
+    if _may_overflow(op, a, b):
+        a, b = a.astype(object), None if b is None else b.astype(object)
+
+    valid = np.ones(a.shape, dtype=bool)
+    if op in ("mod", "divide"):
+        valid = b != 0
+        safe_b = np.where(valid, b, 1)
+        value = ufunc(a, safe_b)
+    elif arity == 2:
+        value = ufunc(a, b)
+    else:
+        value = ufunc(a)
+
+    whole = value
+    if op == "divide":
+        whole = (np.array([int(v) for v in value.flat], dtype=object).reshape(value.shape)
+                 if value.dtype == object else np.trunc(value).astype(np.int64))
+    axiom = (whole % AXIOM_COUNT).astype(np.int64)
+    candidates = valid
+    if op == "multiply":
+        # A product can only be prime when one factor is 1 or -1
+        candidates = (np.abs(a) == 1) | (np.abs(b) == 1)
+    prime = prime_mask(whole, candidates)
+    axiom[~valid] = 0
+    return SemanticBatch(op, a, b, value, axiom, prime, valid)
+
+
+def semantic_batch_lines(op: str, a: Iterable[int], b: Optional[Iterable[int]] = None) -> List[str]:
+    """Formatted strings for every row, matching the scalar functions."""
+    return list(semantic_batch(op, a, b).lines())
@@ -0,0 +1,351 @@
+"""
+Headless batch runner for the semantic, prime and calculus operations.
+
+Reads one operation per JSONL line or CSV row, from a file or stdin:
+
+    {"op": "add", "a": 2, "b": 3}
+    {"op": "factorize", "n": 1234567891011, "id": "job-7"}
+    {"op": "compose_idea", "path": [0, 1, 2, 3]}
+    {"op": "integral", "expr": "sin(x)**2", "var": "x"}
+
+CSV input uses the same field names as columns (a path is written as
+"0 1 2 3"). Rows are grouped into chunks; arithmetic ops in a chunk run as
+one vectorized semantic_batch call per op and everything else goes through
+OPS. With --workers N chunks are spread over a process pool that also does
+the JSON decoding and output encoding, and at most 2N chunks are in flight,
+so memory stays bounded however long the input.
+Results are written in input order, one line or row per input record, as
+each chunk finishes.
+
+    python semantic_cli.py ops.jsonl -o results.jsonl --workers 8
+    cat ops.csv | python semantic_cli.py --format csv > results.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import sys
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from calculus_engine import DEFAULT_BUDGET as CALCULUS_BUDGET, calculus
+from factorization import (
+    DEFAULT_TIME_BUDGET as FACTOR_BUDGET, MAX_FACTOR_DIGITS, FactorizationTimeout, factorize, format_factors,
+)
+from power_engine import INLINE_DIGITS, format_power, power_axiom, power_digit_count, power_is_prime
+from primality import is_prime, next_prime, prev_prime
+from prime_counting import MAX_NTH_PRIME, MAX_PRIME_PI, nth_prime, prime_pi
+from semantic_axioms import AXIOM_COUNT
+from semantic_batch import OPERATIONS, semantic_batch
+from semantic_compose import residues
+from semantic_core import (
+    compose_idea, semantic_next_prime, semantic_power, semantic_prev_prime, semantic_prime,
+)
+
+CHUNK_SIZE = 10000
+OUTPUT_FIELDS = ["line", "id", "op", "value", "axiom", "prime", "text", "error"]
+
+# (line number, raw JSONL line or parsed CSV row)
+Record = Tuple[int, Union[str, Dict[str, Any]]]
+
+
+class BatchOptions(NamedTuple):
+    text: bool = True
+    factor_budget: float = FACTOR_BUDGET
+    calculus_budget: float = CALCULUS_BUDGET
+
+
+def _int(record: Dict[str, Any], key: str) -> int:
+    if key not in record:
+        raise ValueError(f"missing field '{key}'")
+    value = record[key]
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise ValueError(f"'{key}' must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{key}' must be an integer") from None
+
+
+def _path(record: Dict[str, Any]) -> List[int]:
+    path = record.get("path")
+    if isinstance(path, str):
+        return [int(v) for v in re.findall(r"-?\d+", path)]
+    if not isinstance(path, list):
+        raise ValueError("missing field 'path'")
+    return [int(v) for v in path]
+
+
+def _power(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    a, b = _int(record, "a"), _int(record, "b")
+    if b < 0:
+        raise ValueError("Negative exponents are not supported.")
+    value = a ** b if power_digit_count(a, b) <= INLINE_DIGITS else format_power(a, b)
+    result = {"value": value, "axiom": power_axiom(a, b), "prime": power_is_prime(a, b)}
+    if options.text:
+        result["text"] = semantic_power(a, b)
+    return result
+
+
+def _is_prime(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    result = {"value": is_prime(n), "axiom": n % AXIOM_COUNT}
+    if options.text:
+        result["text"] = semantic_prime(n)
+    return result
+
+
+def _next_prime(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    p = next_prime(n)
+    result = {"value": p, "axiom": p % AXIOM_COUNT}
+    if options.text:
+        result["text"] = semantic_next_prime(n)
+    return result
+
+
+def _prev_prime(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    p = prev_prime(n)
+    result = {"value": p, "axiom": None if p is None else p % AXIOM_COUNT}
+    if options.text:
+        result["text"] = semantic_prev_prime(n)
+    return result
+
+
+def _nth_prime(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    if n > MAX_NTH_PRIME:
+        raise ValueError(f"n must be <= {MAX_NTH_PRIME:,}")
+    p = nth_prime(n)
+    return {"value": p, "axiom": p % AXIOM_COUNT}
+
+
+def _prime_pi(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    if n > MAX_PRIME_PI:
+        raise ValueError(f"n must be <= {MAX_PRIME_PI:,}")
+    count = prime_pi(n)
+    return {"value": count, "axiom": count % AXIOM_COUNT}
+
+
+def _factorize(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    n = _int(record, "n")
+    if n < 2:
+        raise ValueError("n must be >= 2")
+    if len(str(n)) > MAX_FACTOR_DIGITS:
+        raise ValueError(f"n must have at most {MAX_FACTOR_DIGITS} digits to factorize")
+    try:
+        factors = factorize(n, options.factor_budget)
+    except FactorizationTimeout as e:
+        unfactored = ", ".join(str(m) for m in e.remaining)
+        raise ValueError(f"time budget exhausted; found {format_factors(e.factors) or 'none'}, "
+                         f"unfactored {unfactored}") from None
+    result = {"value": {str(p): e for p, e in factors.items()}, "prime": factors == {n: 1}}
+    if options.text:
+        result["text"] = format_factors(factors)
+    return result
+
+
+def _compose_idea(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+    path = _path(record)
+    result = {"value": residues(path).tolist()}
+    if options.text:
+        result["text"] = compose_idea(path)
+    return result
+
+
+def _calculus(op: str) -> Callable[[Dict[str, Any], BatchOptions], Dict[str, Any]]:
+    def run(record: Dict[str, Any], options: BatchOptions) -> Dict[str, Any]:
+        if not record.get("expr"):
+            raise ValueError("missing field 'expr'")
+        var = str(record.get("var") or "x")
+        result = calculus.compute(op, str(record["expr"]), var, options.calculus_budget)
+        row = {"value": str(result.value)}
+        if options.text:
+            row["text"] = f"{result.strategy}: {result.value}"
+        return row
+    return run
+
+
+# Non-vectorized ops; the OPERATIONS of semantic_batch are handled per chunk
+OPS: Dict[str, Callable[[Dict[str, Any], BatchOptions], Dict[str, Any]]] = {
+    "power": _power,
+    "is_prime": _is_prime,
+    "next_prime": _next_prime,
+    "prev_prime": _prev_prime,
+    "nth_prime": _nth_prime,
+    "prime_pi": _prime_pi,
+    "factorize": _factorize,
+    "compose_idea": _compose_idea,
+    "derivative": _calculus("derivative"),
+    "integral": _calculus("integral"),
+}
+
+
+def _scalar(value: Any) -> Any:
+    return value.item() if hasattr(value, "item") else value
+
+
+def _parse(payload: Union[str, Dict[str, Any]]) -> Tuple[Dict[str, Any], Optional[str]]:
+    if isinstance(payload, dict):
+        return payload, None
+    try:
+        record = json.loads(payload)
+    except json.JSONDecodeError as e:
+        return {}, f"invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return {}, "expected a JSON object"
+    return record, None
+
+
+def run_chunk(chunk: List[Record], options: BatchOptions = BatchOptions()) -> List[Dict[str, Any]]:
+    """Results for one chunk of records, in the same order."""
+    results: List[Dict[str, Any]] = []
+    groups: Dict[str, List[Tuple[int, int, Optional[int]]]] = defaultdict(list)
+    for line, payload in chunk:
+        record, error = _parse(payload)
+        row: Dict[str, Any] = {"line": line}
+        if "id" in record:
+            row["id"] = record["id"]
+        results.append(row)
+        if error:
+            row["error"] = error
+            continue
+        op = row["op"] = record.get("op")
+        try:
+            if op in OPERATIONS:
+                a = _int(record, "a")
+                b = _int(record, "b") if OPERATIONS[op][2] == 2 else None
+                groups[op].append((len(results) - 1, a, b))
+            elif op in OPS:
+                row.update(OPS[op](record, options))
+            else:
+                row["error"] = f"unknown op: {op!r}"
+        except Exception as e:
+            row["error"] = str(e) or type(e).__name__
+
+    for op, items in groups.items():
+        indices, a, b = zip(*items)
+        batch = semantic_batch(op, a, b if OPERATIONS[op][2] == 2 else None)
+        for k, i in enumerate(indices):
+            row = results[i]
+            if not batch.valid[k]:
+                row["error"] = batch.format(k)
+                continue
+            row.update(value=_scalar(batch.value[k]), axiom=int(batch.axiom[k]), prime=bool(batch.prime[k]))
+            if options.text:
+                row["text"] = batch.format(k)
+    return results
+
+
+def encode_rows(rows: List[Dict[str, Any]], fmt: str) -> str:
+    """Result rows as JSONL lines or headerless CSV rows."""
+    if fmt == "jsonl":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, OUTPUT_FIELDS, restval="", extrasaction="ignore")
+    writer.writerows({k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()}
+                     for row in rows)
+    return buffer.getvalue()
+
+
+def _process(chunk: List[Record], options: BatchOptions, fmt: str) -> Tuple[str, int, int]:
+    # Parsing and encoding happen here so pool workers, not the parent, pay for them
+    rows = run_chunk(chunk, options)
+    return encode_rows(rows, fmt), len(rows), sum("error" in row for row in rows)
+
+
+def read_records(stream: TextIO, fmt: str) -> Iterator[Record]:
+    """(line number, raw JSONL line or parsed CSV row) for each non-empty record."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in (None, "")}
+        return
+    for number, line in enumerate(stream, 1):
+        if line.strip():
+            yield number, line
+
+
+def _chunked(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunks(chunks: Iterable[List[Record]], workers: int, options: BatchOptions,
+               fmt: str = "jsonl") -> Iterator[Tuple[str, int, int]]:
+    """
+    (encoded output, rows, errors) per chunk in input order, with at most
+    2 * workers chunks in flight.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield _process(chunk, options, fmt)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_process, chunk, options, fmt))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _detect_format(path: str) -> str:
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run semantic, prime and calculus operations in bulk.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL or CSV file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"], help="default: from the file extension, else jsonl")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="output format")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (default: 1, in-process)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--no-text", action="store_true", help="skip the formatted semantic text column")
+    parser.add_argument("--factor-budget", type=float, default=FACTOR_BUDGET, help="seconds per factorization")
+    parser.add_argument("--calculus-budget", type=float, default=CALCULUS_BUDGET, help="seconds per calculus op")
+    args = parser.parse_args(argv)
+
+    options = BatchOptions(not args.no_text, args.factor_budget, args.calculus_budget)
+    source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    fmt = args.input_format or _detect_format(args.input)
+    started = time.perf_counter()
+    rows = errors = 0
+    try:
+        if args.format == "csv":
+            csv.writer(sink).writerow(OUTPUT_FIELDS)
+        chunks = _chunked(read_records(source, fmt), max(args.chunk_size, 1))
+        for block, count, failed in run_chunks(chunks, args.workers, options, args.format):
+            sink.write(block)
+            sink.flush()
+            rows += count
+            errors += failed
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - started
+    print(f"Processed {rows:,} rows ({errors:,} errors) in {elapsed:.1f}s "
+          f"({rows / max(elapsed, 1e-9):,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
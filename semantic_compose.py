@@ -0,0 +1,358 @@
+"""
+Streaming compose engine for long idea paths.
+
+compose_idea renders each value as "{symbol} {value} → {meaning}" and joins
+them with " →→→ ". Here the same work runs on int64 chunks of the path:
+
+- every output format is a Layout holding one precompiled (prefix, suffix)
+  byte template per axiom residue;
+- residues come from one vectorized % per chunk, and decimal digits from a
+  four-digit lookup table;
+- templates and digits are laid out as a padded byte matrix, and a
+  row-major mask squeezes out the padding, so no per-element Python string
+  is ever built.
+
+Text, JSON, NDJSON and a residue-coded binary format are written chunk by
+chunk to any binary file object, so memory stays at one chunk however long
+the path is. parse_path is the matching bulk parser for comma- or
+newline-separated text.
+
+    python semantic_compose.py path.txt --format ndjson --output trace.ndjson
+"""
+
+import argparse
+import io
+import json
+import struct
+import sys
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
+
+from instrumentation import timed
+from semantic_axioms import AXIOM_COUNT, axiom_colors, axioms
+
+CHUNK_SIZE = 1 << 16
+# Shorter paths are cheaper to format one f-string at a time
+VECTOR_MIN_PATH = 128
+READ_BYTES = 1 << 20
+SEPARATOR = " →→→ "
+
+BINARY_MAGIC = b"IDEA11\0\0"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<8sII")
+BINARY_BLOCK = struct.Struct("<I")
+FLAG_VALUES = 1
+
+# Ascii digits of 0000..9999, and the divisors cutting an int64 into five such groups
+_DIGITS4 = (np.arange(10000)[:, None] // np.array([1000, 100, 10, 1]) % 10 + ord("0")).astype(np.uint8)
+_GROUPS4 = (10 ** (4 * np.arange(4, -1, -1))).astype(np.uint64)
+_POWERS10 = 10 ** np.arange(1, 20, dtype=np.uint64)
+_SPACE_BYTES = np.frombuffer(b" \t\r\x0b\x0c", dtype=np.uint8)
+_INT64_DIGITS = 18
+
+Path = Union[Iterable[int], np.ndarray, Iterator[np.ndarray]]
+
+
+def _padded(templates: List[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    width = max(len(t) for t in templates)
+    data = np.zeros((len(templates), width), dtype=np.uint8)
+    keep = np.zeros((len(templates), width), dtype=bool)
+    for r, t in enumerate(templates):
+        data[r, :len(t)] = np.frombuffer(t, dtype=np.uint8)
+        keep[r, :len(t)] = True
+    return data, keep
+
+
+class Layout:
+    """
+    separator + prefixes[r] + str(value) + suffixes[r] for every value with
+    residue r; the first value of a stream gets no separator.
+    """
+
+    def __init__(self, prefixes: List[str], suffixes: List[str], separator: str = ""):
+        self.separator = separator.encode()
+        self.prefixes = [self.separator + p.encode() for p in prefixes]
+        self.suffixes = [s.encode() for s in suffixes]
+        self._prefix, self._prefix_keep = _padded(self.prefixes)
+        self._suffix, self._suffix_keep = _padded(self.suffixes)
+
+    def render(self, values: np.ndarray, residues: np.ndarray) -> bytes:
+        if values.dtype == object:
+            return b"".join(self.prefixes[r] + str(v).encode() + self.suffixes[r]
+                            for v, r in zip(values.tolist(), residues.tolist()))
+        n = values.size
+        magnitude = np.abs(values).astype(np.uint64)
+        digits = np.searchsorted(_POWERS10, magnitude, side="right") + 1
+        # Only as many four-digit groups as the widest value in the chunk needs
+        groups = -(-int(digits.max()) // 4)
+        width = 4 * groups
+        p = self._prefix.shape[1]
+        d = p + 1
+        s = d + width
+        rows = np.empty((n, s + self._suffix.shape[1]), dtype=np.uint8)
+        keep = np.empty(rows.shape, dtype=bool)
+        rows[:, :p] = np.take(self._prefix, residues, axis=0)
+        keep[:, :p] = np.take(self._prefix_keep, residues, axis=0)
+        rows[:, p] = ord("-")
+        keep[:, p] = values < 0
+        quads = (magnitude[:, None] // _GROUPS4[-groups:]) % 10000
+        rows[:, d:s] = np.take(_DIGITS4, quads.astype(np.intp), axis=0).reshape(n, width)
+        # Digits are right-aligned; keep only the last len(str(|v|)) of them
+        keep[:, d:s] = np.arange(width) >= width - digits[:, None]
+        rows[:, s:] = np.take(self._suffix, residues, axis=0)
+        keep[:, s:] = np.take(self._suffix_keep, residues, axis=0)
+        return rows[keep].tobytes()
+
+
+def _json_text(text: str) -> str:
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+TEXT_LAYOUT = Layout([f"{axiom_colors[r]} " for r in range(AXIOM_COUNT)],
+                     [f" → {axioms[r]}" for r in range(AXIOM_COUNT)], SEPARATOR)
+# The same trace, escaped for use inside a JSON string
+JSON_TRACE_LAYOUT = Layout([_json_text(f"{axiom_colors[r]} ") for r in range(AXIOM_COUNT)],
+                           [_json_text(f" → {axioms[r]}") for r in range(AXIOM_COUNT)], _json_text(SEPARATOR))
+JSON_VALUES_LAYOUT = Layout([""] * AXIOM_COUNT, [""] * AXIOM_COUNT, ", ")
+NDJSON_LAYOUT = Layout(['{"value": '] * AXIOM_COUNT, [
+    f', "axiom": {r}, "symbol": {json.dumps(axiom_colors[r], ensure_ascii=False)}, '
+    f'"meaning": {json.dumps(axioms[r], ensure_ascii=False)}}}\n' for r in range(AXIOM_COUNT)])
+
+
+def as_path(values: Iterable[int]) -> np.ndarray:
+    """values as an int64 array, or an object array when some do not fit."""
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iu" and values.dtype != np.uint64:
+        return values.astype(np.int64, copy=False)
+    # Anything else (uint64, object, floats) goes through Python ints so nothing wraps
+    values = values.tolist() if isinstance(values, np.ndarray) else values
+    values = values if isinstance(values, (list, tuple)) else list(values)
+    try:
+        return np.asarray(values, dtype=np.int64).reshape(-1)
+    except OverflowError:
+        return np.asarray([int(v) for v in values], dtype=object).reshape(-1)
+
+
+def iter_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """path (a sequence, an array or an iterator of arrays) as arrays of at most chunk_size values."""
+    if isinstance(path, Iterator):
+        for chunk in path:
+            chunk = as_path(chunk)
+            for start in range(0, chunk.size, chunk_size):
+                yield chunk[start:start + chunk_size]
+        return
+    path = as_path(path)
+    for start in range(0, path.size, chunk_size):
+        yield path[start:start + chunk_size]
+
+
+def residues(path: Path) -> np.ndarray:
+    """value % AXIOM_COUNT for every value of path."""
+    chunks = [(chunk % AXIOM_COUNT).astype(np.int64) for chunk in iter_chunks(path)]
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+
+
+def iter_render(path: Path, layout: Layout, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """UTF-8 output of layout over path, one chunk at a time."""
+    first = True
+    for chunk in iter_chunks(path, chunk_size):
+        if not chunk.size:
+            continue
+        out = layout.render(chunk, (chunk % AXIOM_COUNT).astype(np.intp))
+        if first:
+            out = out[len(layout.separator):]
+            first = False
+        yield out
+
+
+def iter_compose(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """The compose_idea text for path, in pieces that concatenate to the whole trace."""
+    for out in iter_render(path, TEXT_LAYOUT, chunk_size):
+        yield out.decode()
+
+
+@timed(size=lambda path, chunk_size=CHUNK_SIZE: len(path))
+def compose_text(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """compose_idea(path), built chunk by chunk."""
+    return "".join(iter_compose(path, chunk_size))
+
+
+def write_text(fp: BinaryIO, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+    for out in iter_render(path, TEXT_LAYOUT, chunk_size):
+        fp.write(out)
+
+
+def write_ndjson(fp: BinaryIO, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+    """One {"value", "axiom", "symbol", "meaning"} object per line."""
+    for out in iter_render(path, NDJSON_LAYOUT, chunk_size):
+        fp.write(out)
+
+
+def write_json(fp: BinaryIO, path: Path, chunk_size: int = CHUNK_SIZE) -> None:
+    """
+    {"idea_sequence": [...], "semantic_trace": "..."}, the layout of the UI's
+    JSON export. The path is walked twice, so an iterator of chunks is
+    collected into one array first (8 bytes per value).
+    """
+    if isinstance(path, Iterator):
+        chunks = [as_path(chunk) for chunk in path]
+        path = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+    fp.write(b'{"idea_sequence": [')
+    for out in iter_render(path, JSON_VALUES_LAYOUT, chunk_size):
+        fp.write(out)
+    fp.write(b'], "semantic_trace": "')
+    for out in iter_render(path, JSON_TRACE_LAYOUT, chunk_size):
+        fp.write(out)
+    fp.write(b'"}')
+
+
+def write_binary(fp: BinaryIO, path: Path, chunk_size: int = CHUNK_SIZE, values: bool = True) -> None:
+    """
+    Residue-coded export: a header, then blocks of (count, residues packed
+    two per byte, low nibble first[, count little-endian int64 values]),
+    ended by an empty block. values is ignored for paths that do not fit int64.
+    """
+    chunks = iter_chunks(path, chunk_size)
+    first = next(chunks, None)
+    flags = FLAG_VALUES if values and (first is None or first.dtype != object) else 0
+    fp.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags))
+    for chunk in _prepend(first, chunks):
+        codes = (chunk % AXIOM_COUNT).astype(np.uint8)
+        if codes.size % 2:
+            codes = np.append(codes, np.uint8(0))
+        fp.write(BINARY_BLOCK.pack(chunk.size))
+        fp.write((codes[0::2] | (codes[1::2] << 4)).tobytes())
+        if flags & FLAG_VALUES:
+            if chunk.dtype == object:
+                raise ValueError("binary export with values needs every value to fit in int64")
+            fp.write(chunk.astype("<i8").tobytes())
+    fp.write(BINARY_BLOCK.pack(0))
+
+
+def _prepend(first: Optional[np.ndarray], rest: Iterator[np.ndarray]) -> Iterator[np.ndarray]:
+    if first is not None:
+        yield first
+    yield from rest
+
+
+def iter_read_binary(fp: BinaryIO) -> Iterator[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """(residues, values or None) for each block of a write_binary export."""
+    magic, version, flags = BINARY_HEADER.unpack(fp.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("not a residue-coded idea export")
+    while True:
+        (count,) = BINARY_BLOCK.unpack(fp.read(BINARY_BLOCK.size))
+        if not count:
+            return
+        packed = np.frombuffer(fp.read((count + 1) // 2), dtype=np.uint8)
+        codes = np.empty(2 * packed.size, dtype=np.uint8)
+        codes[0::2] = packed & 0x0F
+        codes[1::2] = packed >> 4
+        values = np.frombuffer(fp.read(8 * count), dtype="<i8") if flags & FLAG_VALUES else None
+        yield codes[:count], values
+
+
+def parse_path(text: Union[str, bytes]) -> np.ndarray:
+    """
+    The integers in comma- or newline-separated text, as an int64 array
+    (object when some do not fit). As in the UI's original parsing, a token
+    is kept only when it is a plain run of ASCII digits once surrounding
+    whitespace is stripped; anything else is skipped.
+    """
+    data = np.frombuffer(text.encode() if isinstance(text, str) else text, dtype=np.uint8)
+    if not data.size:
+        return np.zeros(0, dtype=np.int64)
+    separator = (data == ord(",")) | (data == ord("\n"))
+    digit = (data >= ord("0")) & (data <= ord("9"))
+    if (digit | separator).all() and not separator[0] and not separator[-1]:
+        # Clean machine output: hand it to NumPy's C parser when every token fits int64
+        widths = np.diff(np.flatnonzero(separator), prepend=-1, append=data.size)
+        if 1 < widths.min() and widths.max() <= _INT64_DIGITS + 1:
+            clean = np.where(separator, ord(","), data).astype(np.uint8).tobytes().decode("ascii")
+            return np.fromstring(clean, dtype=np.int64, sep=",")
+    token = np.cumsum(separator)
+    tokens = int(token[-1]) + 1
+    other = ~(digit | separator | np.isin(data, _SPACE_BYTES))
+    run_start = digit & ~np.concatenate([[False], digit[:-1]])
+    valid = ((np.bincount(token[other], minlength=tokens) == 0)
+             & (np.bincount(token[run_start], minlength=tokens) == 1))
+
+    at = np.flatnonzero(digit & valid[token])
+    if not at.size:
+        return np.zeros(0, dtype=np.int64)
+    owner = token[at]
+    starts = np.flatnonzero(np.concatenate([[True], owner[1:] != owner[:-1]]))
+    ends = np.append(starts[1:], at.size) - 1
+    lengths = ends - starts + 1
+    if lengths.max() > _INT64_DIGITS:
+        return np.array([int(data[at[a]:at[b] + 1].tobytes()) for a, b in zip(starts, ends)], dtype=object)
+    # Each digit's weight is 10 ** (digits after it in its token)
+    place = np.repeat(at[ends], lengths) - at
+    weights = (10 ** np.arange(_INT64_DIGITS, dtype=np.int64))[place]
+    return np.add.reduceat((data[at] - ord("0")).astype(np.int64) * weights, starts)
+
+
+def iter_parse_path(fp: Union[BinaryIO, TextIO], read_bytes: int = READ_BYTES) -> Iterator[np.ndarray]:
+    """parse_path over a file read in pieces, cut at separators so no token is split."""
+    tail = b""
+    while True:
+        block = fp.read(read_bytes)
+        if isinstance(block, str):
+            block = block.encode()
+        if not block:
+            break
+        block = tail + block
+        cut = max(block.rfind(b","), block.rfind(b"\n"))
+        if cut < 0:
+            tail = block
+            continue
+        tail = block[cut + 1:]
+        yield parse_path(block[:cut])
+    if tail:
+        yield parse_path(tail)
+
+
+EXPORT_FORMATS: Dict[str, Tuple[Callable[..., None], str, str]] = {
+    # format -> (writer, file extension, MIME type)
+    "text": (write_text, "txt", "text/plain"),
+    "json": (write_json, "json", "application/json"),
+    "ndjson": (write_ndjson, "ndjson", "application/x-ndjson"),
+    "binary": (write_binary, "idea", "application/octet-stream"),
+}
+
+
+def export(fp: BinaryIO, path: Path, fmt: str, chunk_size: int = CHUNK_SIZE) -> None:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt} (choose from {', '.join(EXPORT_FORMATS)})")
+    EXPORT_FORMATS[fmt][0](fp, path, chunk_size)
+
+
+def export_bytes(path: Path, fmt: str, chunk_size: int = CHUNK_SIZE) -> bytes:
+    """The export as one bytes object, for download buttons and other in-memory consumers."""
+    out = io.BytesIO()
+    export(out, path, fmt, chunk_size)
+    return out.getvalue()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compose and export long idea paths with constant memory.")
+    parser.add_argument("input", nargs="?", default="-", help="comma- or newline-separated integers (default stdin)")
+    parser.add_argument("--format", "-f", choices=list(EXPORT_FORMATS), default="text")
+    parser.add_argument("--output", "-o", default="-", help="output file (default stdout)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    sink = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        export(sink, iter_parse_path(source), args.format, args.chunk_size)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""
+The semantic operations shared by both Streamlit apps.
+
+Everything here is plain Python over the prime and calculus engines, so it
+imports without Streamlit and without sympy: symbolic work happens in the
+calculus worker processes, which only start on the first derivative or
+integral. Call warm_up() once per process to sieve the shared prime table
+on a background thread while the first page renders.
+"""
+
+from typing import List, Optional
+
+from calculus_engine import calculus
+from calculus_numeric import definite_integral
+from instrumentation import timed
+from logic_engine import LogicError, LogicResult, Progress, analyze, equivalence, format_assignment, logic_axiom
+from power_engine import format_power, power_axiom, power_is_prime
+from primality import is_prime, next_prime, prev_prime
+from result_cache import cached
+from semantic_axioms import axioms, axiom_colors
+from semantic_compose import VECTOR_MIN_PATH, compose_text
+from semantic_stream import iter_semantic_primes_trace
+from shared_primes import shared_table
+
+MAX_PRIME_RANGE = 1000000
+
+
+def _complete(text: str) -> bool:
+    # Errors, timeouts and the load-dependent series fallback are not results to keep
+    return not text.startswith("Error") and "series approximation" not in text
+
+
+def warm_up() -> None:
+    shared_table.warm()
+
+@timed(size=lambda n: n)
+def generate_primes_up_to(n: int) -> List[int]:
+    return shared_table.primes_up_to(n)
+
+def safe_generate_primes_up_to(n: int) -> List[int] or str:
+    if n > MAX_PRIME_RANGE:
+        return f"Input too large! Try <= {MAX_PRIME_RANGE:,}."
+    return generate_primes_up_to(n)
+
+@cached("semantic_prime")
+def semantic_prime(n: int) -> str:
+    prime_status = is_prime(n)
+    if prime_status:
+        return f"{n} is PRIME! 🚀 Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
+    else:
+        return f"{n} is not prime. Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
+
+@timed(size=lambda n: n)
+@cached("semantic_primes_trace")
+def semantic_primes_trace(n: int) -> str:
+    if n > MAX_PRIME_RANGE:
+        return f"Input too large! Try <= {MAX_PRIME_RANGE:,}."
+    return " → ".join(iter_semantic_primes_trace(n))
+
+def find_next_prime(n: int) -> int:
+    return next_prime(n)
+
+def find_prev_prime(n: int) -> int or None:
+    return prev_prime(n)
+
+@cached("semantic_next_prime")
+def semantic_next_prime(n: int) -> str:
+    next_p = find_next_prime(n)
+    return f"Next prime after {n} is {next_p}: {axiom_colors[next_p % 11]} {axioms[next_p % 11]}"
+
+@cached("semantic_prev_prime")
+def semantic_prev_prime(n: int) -> str:
+    prev_p = find_prev_prime(n)
+    if prev_p is None:
+        return f"There is no prime below {n}."
+    return f"Previous prime before {n} is {prev_p}: {axiom_colors[prev_p % 11]} {axioms[prev_p % 11]}"
+
+@cached("semantic_add_prime_highlight")
+def semantic_add_prime_highlight(a: int, b: int) -> str:
+    total = a + b
+    result = total % 11
+    highlight = "🌟 PRIME!" if is_prime(total) else ""
+    meaning = axioms.get(result, "Unknown")
+    return f"{a} + {b} = {total} → Axiom {result}: {axiom_colors[result]} {meaning} {highlight}"
+
+@timed(size=lambda a, b, expand=False: b)
+@cached("semantic_power")
+def semantic_power(a: int, b: int, expand: bool = False) -> str:
+    if b < 0:
+        return "Negative exponents are not supported."
+    result = power_axiom(a, b)
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if power_is_prime(a, b) else ""
+    try:
+        power = format_power(a, b, expand)
+    except ValueError as e:
+        return str(e)
+    return f"{a} ^ {b} = {power} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_mod")
+def semantic_mod(a: int, b: int) -> str:
+    if b == 0:
+        return "Modulus by zero is undefined."
+    mod = a % b
+    result = mod % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(mod) else ""
+    return f"{a} mod {b} = {mod} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_subtract")
+def semantic_subtract(a: int, b: int) -> str:
+    difference = a - b
+    result = difference % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(difference) else ""
+    return f"{a} - {b} = {difference} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_multiply")
+def semantic_multiply(a: int, b: int) -> str:
+    product = a * b
+    result = product % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(product) else ""
+    return f"{a} × {b} = {product} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_divide")
+def semantic_divide(a: int, b: int) -> str:
+    if b == 0:
+        return "Division by zero is undefined."
+    quotient = a / b
+    result = int(quotient) % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(int(quotient)) else ""
+    return f"{a} ÷ {b} = {quotient:.2f} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@timed(size=lambda expr, var: len(expr))
+@cached("semantic_derivative", store=_complete)
+def semantic_derivative(expr: str, var: str) -> str:
+    try:
+        derivative = calculus.derivative(expr, var)
+        return f"d/d{var}({expr}) = {derivative.pretty}"
+    except Exception as e:
+        return f"Error computing derivative: {e}"
+
+@timed(size=lambda expr, var: len(expr))
+@cached("semantic_integral", store=_complete)
+def semantic_integral(expr: str, var: str) -> str:
+    try:
+        integral = calculus.integral(expr, var)
+        note = " (series approximation)" if integral.strategy == "series" else ""
+        return f"∫ {expr} d{var} = {integral.pretty} + C{note}"
+    except Exception as e:
+        return f"Error computing integral: {e}"
+
+@timed(size=lambda expr, var, lo, hi: len(expr))
+@cached("semantic_definite_integral", store=_complete)
+def semantic_definite_integral(expr: str, var: str, lo: float, hi: float) -> str:
+    try:
+        value, method = definite_integral(expr, var, lo, hi)
+        return f"∫ from {lo:g} to {hi:g} of {expr} d{var} = {value:.12g} ({method})"
+    except Exception as e:
+        return f"Error computing definite integral: {e}"
+
+@cached("compose_idea")
+def compose_idea(path: List[int]) -> str:
+    if len(path) >= VECTOR_MIN_PATH:
+        return compose_text(path)
+    trace = []
+    for value in path:
+        concept = axioms.get(value % 11, "Unknown")
+        symbol = axiom_colors.get(value % 11, "")
+        trace.append(f"{symbol} {value} → {concept}")
+    return " →→→ ".join(trace)
+
+@cached("semantic_and")
+def semantic_and(a: int, b: int) -> str:
+    result = (a & b) % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(a & b) else ""
+    return f"{a} AND {b} = {a & b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_or")
+def semantic_or(a: int, b: int) -> str:
+    result = (a | b) % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(a | b) else ""
+    return f"{a} OR {b} = {a | b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+@cached("semantic_not")
+def semantic_not(a: int) -> str:
+    result = (~a) % 11
+    meaning = axioms.get(result, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(~a) else ""
+    return f"NOT {a} = {~a} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+
+# Progress reporting does not change the result
+@cached("semantic_logic", canonical=lambda formula, progress=None: (formula,))
+def semantic_logic(formula: str, progress: Optional[Progress] = None) -> str:
+    try:
+        result = analyze(formula, progress)
+    except LogicError as e:
+        return str(e)
+    example = f", e.g. {format_assignment(result.example)}" if result.example and not result.tautology else ""
+    return (f"{result.formula}: {result.verdict}, {result.models} of {result.rows} assignments{example}"
+            f" → {_logic_axiom_text(result)}")
+
+def _logic_axiom_text(result: LogicResult) -> str:
+    axiom = logic_axiom(result)
+    meaning = axioms.get(axiom, "Unknown")
+    prime_str = "🌟 PRIME!" if is_prime(result.models) else ""
+    return f"Axiom {axiom}: {axiom_colors[axiom]} {meaning} {prime_str}"
+
+@cached("semantic_equivalence", canonical=lambda f, g, progress=None: (f, g))
+def semantic_equivalence(f: str, g: str, progress: Optional[Progress] = None) -> str:
+    try:
+        witness = equivalence(f, g, progress)
+        if witness is not None:
+            return f"{f.strip()} ≢ {g.strip()}: they differ at {format_assignment(witness)}"
+        result = analyze(f)
+    except LogicError as e:
+        return str(e)
+    return f"{f.strip()} ≡ {g.strip()} → {_logic_axiom_text(result)}"
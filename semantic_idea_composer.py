@@ -1,248 +1,198 @@
 import streamlit as st
 import random
-import json
-import sympy as sp
-
-from typing import List
-
-# Semantic axioms and colors
-axioms = {
-    0: "Void – potential",
-    1: "Monad – distinction",
-    2: "Duality – relation",
-    3: "Triad – transformation",
-    4: "Pattern – recurrence",
-    5: "Growth – identity",
-    6: "Recursion – memory",
-    7: "Self-awareness",
-    8: "Interconnection",
-    9: "Unity – integration",
-    10: "Rebirth – next scale",
-}
-axiom_colors = {
-    0: "⚪", 1: "🔴", 2: "🔵", 3: "🟡", 4: "🟠",
-    5: "🟢", 6: "🟣", 7: "🟤", 8: "🟥", 9: "🟦", 10: "⬜"
-}
-
-MAX_PRIME_RANGE = 10000
-MAX_NEXT_PRIME_START = 100000
-
-def is_prime(n: int) -> bool:
-    if n < 2:
-        return False
-    for i in range(2, int(n**0.5)+1):
-        if n % i == 0:
-            return False
-    return True
-
-def generate_primes_up_to(n: int) -> List[int]:
-    primes = []
-    for num in range(2, n+1):
-        if is_prime(num):
-            primes.append(num)
-    return primes
-
-def safe_generate_primes_up_to(n: int) -> List[int] or str:
-    if n > MAX_PRIME_RANGE:
-        return "Input too large! Try <= 10,000."
-    return generate_primes_up_to(n)
-
-def semantic_prime(n: int) -> str:
-    prime_status = is_prime(n)
-    if prime_status:
-        return f"{n} is PRIME! 🚀 Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
-    else:
-        return f"{n} is not prime. Semantic: {axiom_colors[n%11]} {axioms[n%11]}"
-
-def semantic_primes_trace(n: int) -> str:
-    result = safe_generate_primes_up_to(n)
-    if isinstance(result, str):
-        return result
-    trace = [f"{p}: {axiom_colors[p % 11]} {axioms[p % 11]}" for p in result]
-    return " → ".join(trace)
-
-def find_next_prime(n: int) -> int or None:
-    if n > MAX_NEXT_PRIME_START:
-        return None
-    candidate = n + 1
-    while True:
-        if is_prime(candidate):
-            return candidate
-        candidate += 1
-
-def semantic_next_prime(n: int) -> str:
-    next_p = find_next_prime(n)
-    if next_p is None:
-        return f"Input too large! Try <= {MAX_NEXT_PRIME_START}."
-    return f"Next prime after {n} is {next_p}: {axiom_colors[next_p % 11]} {axioms[next_p % 11]}"
-
-def semantic_add_prime_highlight(a: int, b: int) -> str:
-    total = a + b
-    result = total % 11
-    highlight = "🌟 PRIME!" if is_prime(total) else ""
-    meaning = axioms.get(result, "Unknown")
-    return f"{a} + {b} = {total} → Axiom {result}: {axiom_colors[result]} {meaning} {highlight}"
-
-def semantic_power(a: int, b: int) -> str:
-    power = a ** b
-    result = power % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(power) else ""
-    return f"{a} ^ {b} = {power} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_mod(a: int, b: int) -> str:
-    if b == 0:
-        return "Modulus by zero is undefined."
-    mod = a % b
-    result = mod % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(mod) else ""
-    return f"{a} mod {b} = {mod} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_subtract(a: int, b: int) -> str:
-    difference = a - b
-    result = difference % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(difference) else ""
-    return f"{a} - {b} = {difference} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_multiply(a: int, b: int) -> str:
-    product = a * b
-    result = product % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(product) else ""
-    return f"{a} × {b} = {product} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_divide(a: int, b: int) -> str:
-    if b == 0:
-        return "Division by zero is undefined."
-    quotient = a / b
-    result = int(quotient) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(int(quotient)) else ""
-    return f"{a} ÷ {b} = {quotient:.2f} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_derivative(expr: str, var: str) -> str:
-    try:
-        x = sp.Symbol(var)
-        parsed_expr = sp.sympify(expr)
-        derivative = sp.diff(parsed_expr, x)
-        return f"d/d{var}({expr}) = {sp.pretty(derivative)}"
-    except Exception as e:
-        return f"Error computing derivative: {e}"
-
-def semantic_integral(expr: str, var: str) -> str:
-    try:
-        x = sp.Symbol(var)
-        parsed_expr = sp.sympify(expr)
-        integral = sp.integrate(parsed_expr, x)
-        return f"∫ {expr} d{var} = {sp.pretty(integral)} + C"
-    except Exception as e:
-        return f"Error computing integral: {e}"
-
-def compose_idea(path: List[int]) -> str:
-    trace = []
-    for value in path:
-        concept = axioms.get(value % 11, "Unknown")
-        symbol = axiom_colors.get(value % 11, "")
-        trace.append(f"{symbol} {value} → {concept}")
-    return " →→→ ".join(trace)
-
-def semantic_and(a: int, b: int) -> str:
-    result = (a & b) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(a & b) else ""
-    return f"{a} AND {b} = {a & b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_or(a: int, b: int) -> str:
-    result = (a | b) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(a | b) else ""
-    return f"{a} OR {b} = {a | b} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
-
-def semantic_not(a: int) -> str:
-    result = (~a) % 11
-    meaning = axioms.get(result, "Unknown")
-    prime_str = "🌟 PRIME!" if is_prime(~a) else ""
-    return f"NOT {a} = {~a} → Axiom {result}: {axiom_colors[result]} {meaning} {prime_str}"
+import time
+import numpy as np
+
+from arithmetic_engine import MODES as CALC_MODES, ExpressionError, ExpressionTimeout, calculate
+from calculus_numeric import MAX_GRID_POINTS, evaluate_grid
+from constellations import PATTERNS, ConstellationStats, constellation_stats, iter_constellation_stats
+from factorization import DEFAULT_TIME_BUDGET, MAX_FACTOR_DIGITS, FactorizationTimeout, factorize, format_factors
+from goldbach import MAX_GOLDBACH_DIGITS, goldbach_min_pair, goldbach_table
+from instrumentation import ProfileCapture, metrics, timed
+from prime_counting import MAX_NTH_PRIME, MAX_PRIME_PI, nth_prime as compute_nth_prime, prime_pi
+from prime_distribution import PrimeDistribution, iter_prime_distribution
+from prime_pages import clear_prime_pages, render_prime_pages, start_prime_pages
+from semantic_axioms import axioms, axiom_colors
+from semantic_compose import EXPORT_FORMATS, export_bytes, parse_path
+from semantic_core import (
+    compose_idea, semantic_add_prime_highlight, semantic_and,
+    semantic_definite_integral, semantic_derivative, semantic_divide, semantic_integral, semantic_mod,
+    semantic_multiply, semantic_next_prime, semantic_not, semantic_or, semantic_power, semantic_prev_prime,
+    semantic_prime, semantic_subtract, warm_up,
+)
+from shared_primes import shared_table
+
+# Enough for most balanced 40-digit semiprimes (see factorize)
+FACTOR_TIME_BUDGET = DEFAULT_TIME_BUDGET
+MAX_GOLDBACH_BATCH = 10**7
+MAX_CHART_POINTS = 5000
+MAX_CONSTELLATION_LIMIT = 5 * 10**7
+# Sieved scans; a mapped prime table serves anything up to its own limit
+MAX_DISTRIBUTION_LIMIT = 10**8
+# Memoized results kept per pure computation, shared by every session
+CACHE_ENTRIES = 256
 
 # 1. Prime Gaps
-def prime_gaps(n: int) -> str:
-    primes = generate_primes_up_to(n)
-    if len(primes) < 2:
+def gap_summary(stats: ConstellationStats) -> str:
+    if stats.prime_count < 2:
         return "Not enough primes in range."
-    gaps = [primes[i+1] - primes[i] for i in range(len(primes)-1)]
-    return "Prime gaps: " + ", ".join(str(gap) for gap in gaps)
+    gaps = stats.gap_histogram
+    mean = (stats.last_prime - 2) / (stats.prime_count - 1)
+    largest, after = stats.max_gap
+    return (f"{stats.prime_count - 1:,} gaps between primes ≤ {stats.limit:,}: "
+            f"mean {mean:.2f}, most common {int(gaps.argmax())}, largest {largest} after {after:,}")
+
+def prime_gaps(n: int) -> str:
+    if n > MAX_CONSTELLATION_LIMIT:
+        return f"Input too large! Try <= {MAX_CONSTELLATION_LIMIT:,}."
+    return gap_summary(constellation_stats(n))
 
 # 2. Prime Factorization
-def prime_factorization(n: int) -> str:
+def prime_factorization(n: int, time_budget: float = FACTOR_TIME_BUDGET) -> str:
     if n < 2:
         return "Enter an integer ≥ 2."
-    factors = []
-    candidate = 2
-    original = n
-    while candidate * candidate <= n:
-        while n % candidate == 0:
-            factors.append(candidate)
-            n //= candidate
-        candidate += 1
-    if n > 1:
-        factors.append(n)
-    if not factors:
-        return f"{original} is prime."
-    return f"Prime factors of {original}: " + ", ".join(str(f) for f in factors)
+    if len(str(n)) > MAX_FACTOR_DIGITS:
+        return f"Input too large! Try at most {MAX_FACTOR_DIGITS} digits."
+    try:
+        factors = factorize(n, time_budget)
+    except FactorizationTimeout as e:
+        found = format_factors(e.factors) or "none"
+        unfactored = ", ".join(str(m) for m in e.remaining)
+        return f"Time budget of {time_budget:g}s exhausted. Factors of {n} found so far: {found}; unfactored: {unfactored}"
+    if factors == {n: 1}:
+        return f"{n} is prime."
+    return f"Prime factors of {n}: {format_factors(factors)}"
 
 # 3. Prime Distribution Visualization
-def prime_distribution(n: int):
-    primes = generate_primes_up_to(n)
-    return primes
+def distribution_summary(dist: PrimeDistribution) -> str:
+    curve = dist.curve()
+    count, estimate, li_estimate = curve["π(x)"][-1], curve["x/ln x"][-1], curve["Li(x)"][-1]
+    return (f"π({dist.limit:,}) = {count:,}. x/ln x gives {estimate:,.0f} ({estimate / count - 1:+.2%}), "
+            f"Li(x) gives {li_estimate:,.0f} ({li_estimate / count - 1:+.4%})")
+
+def distribution_limit() -> int:
+    mapped = shared_table.mapped
+    return max(MAX_DISTRIBUTION_LIMIT, mapped.limit if mapped is not None else 0)
+
+@timed(size=lambda n: n)
+def scan_distribution(n: int) -> PrimeDistribution:
+    """Bin the primes up to n behind a progress bar; large bounds take a while."""
+    progress = st.progress(0.0)
+    dist = PrimeDistribution(n)
+    for dist in iter_prime_distribution(n):
+        progress.progress(dist.limit / n, text=f"Counted primes up to {dist.limit:,}")
+    progress.empty()
+    return dist
 
 # 4. Nth Prime
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
 def nth_prime(n: int) -> str:
     if n < 1:
         return "Enter N ≥ 1."
-    count = 0
-    candidate = 2
-    while True:
-        if is_prime(candidate):
-            count += 1
-            if count == n:
-                return f"The {n}th prime is {candidate}: {axiom_colors[candidate % 11]} {axioms[candidate % 11]}"
-        candidate += 1
+    if n > MAX_NTH_PRIME:
+        return f"Input too large! Try <= {MAX_NTH_PRIME:,}."
+    p = compute_nth_prime(n)
+    return f"The {n}th prime is {p}: {axiom_colors[p % 11]} {axioms[p % 11]}"
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def semantic_prime_pi(x: int) -> str:
+    if x > MAX_PRIME_PI:
+        return f"Input too large! Try <= {MAX_PRIME_PI:,}."
+    count = prime_pi(x)
+    return f"π({x}) = {count} primes ≤ {x}: {axiom_colors[count % 11]} {axioms[count % 11]}"
 
 # 5. Goldbach Conjecture Explorer
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
 def goldbach_pair(even_n: int) -> str:
     if even_n <= 2 or even_n % 2 != 0:
         return "Enter an even integer > 2."
-    for i in range(2, even_n):
-        if is_prime(i) and is_prime(even_n - i):
-            return f"{even_n} = {i} + {even_n - i}"
-    return "No Goldbach pair found."
+    if len(str(even_n)) > MAX_GOLDBACH_DIGITS:
+        return f"Input too large! Try at most {MAX_GOLDBACH_DIGITS} digits."
+    pair = goldbach_min_pair(even_n)
+    if pair is None:
+        return "No Goldbach pair found."
+    return f"{even_n} = {pair[0]} + {pair[1]}"
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def goldbach_comet(limit: int):
+    min_p, counts = goldbach_table(limit)
+    evens = np.arange(4, limit + 1, 2)
+    missing = evens[min_p[evens] == 0]
+    if missing.size:
+        summary = f"No Goldbach pair for {missing[0]}!"
+    else:
+        worst = evens[np.argmax(min_p[evens])]
+        summary = (f"Goldbach holds for every even n ≤ {limit}. "
+                   f"Largest minimal pair: {worst} = {min_p[worst]} + {worst - min_p[worst]}")
+    stride = max(1, len(evens) // MAX_CHART_POINTS)
+    return summary, {"n": evens[::stride], "r(n)": counts[evens[::stride]]}
 
 # 6. Twin Primes
-def twin_primes(n: int) -> str:
-    primes = generate_primes_up_to(n)
-    twins = [(primes[i], primes[i+1]) for i in range(len(primes)-1) if primes[i+1]-primes[i]==2]
-    if not twins:
+def twin_summary(stats: ConstellationStats) -> str:
+    if not stats.counts["twin"]:
         return "No twin primes found."
-    return "Twin primes: " + ", ".join(f"{a}, {b}" for a, b in twins)
-
-# --- UI Section ---
-
-st.set_page_config(page_title="Semantic Calculator with Primes", layout="centered")
-st.title("🧠 Semantic Processor & Prime Composer")
+    return (f"{stats.counts['twin']:,} twin prime pairs ≤ {stats.limit:,}. "
+            f"First: {stats.first['twin']}, largest: {stats.last['twin']}")
 
-with st.expander("📘 Axiom Legend"):
-    for i in range(11):
-        st.markdown(f"**{i}**: {axiom_colors[i]} {axioms[i]}")
+def twin_primes(n: int) -> str:
+    if n > MAX_CONSTELLATION_LIMIT:
+        return f"Input too large! Try <= {MAX_CONSTELLATION_LIMIT:,}."
+    return twin_summary(constellation_stats(n))
+
+@timed(size=lambda n: n)
+def scan_constellations(n: int) -> ConstellationStats:
+    """Run the segmented scan behind a progress bar; large bounds take a while."""
+    progress = st.progress(0.0)
+    stats = ConstellationStats(n)
+    for stats in iter_constellation_stats(n):
+        progress.progress(stats.limit / n, text=f"Scanned up to {stats.limit:,}")
+    progress.empty()
+    return stats
 
-tab1, tab2, tab3 = st.tabs(["Calculator", "Prime Tools", "Advanced Primes"])
+# --- UI Section ---
 
-with tab1:
+def section(fn):
+    """
+    Render fn as a fragment: a widget inside it reruns only fn, not the whole
+    script, and each of those reruns is timed as fragment.<name>.
+    """
+    return st.fragment(timed(f"fragment.{fn.__name__.removeprefix('render_')}")(fn))
+
+def _profile_next_run(mode: str):
+    st.session_state["profile_mode"] = mode
+
+def render_admin_panel():
+    """Metrics, cache counters and profiling, only shown with ?admin=1 in the URL."""
+    st.header("🛠️ Admin: Metrics & Profiling")
+    summary = metrics.summary()
+    if summary:
+        st.dataframe(summary, hide_index=True)
+    else:
+        st.info("No operations recorded yet.")
+    # Cache hit/miss counters and prime table gauges
+    gauges = [(name + "".join(f" {k}={v}" for k, v in labels.items()), value)
+              for name, _, _, samples in metrics.families() for labels, value in samples]
+    if gauges:
+        st.dataframe({"metric": [name for name, _ in gauges], "value": [value for _, value in gauges]},
+                     hide_index=True)
+    profile_cols = st.columns(2)
+    profile_cols[0].button("Profile next run (cProfile)", on_click=_profile_next_run, args=("cprofile",))
+    profile_cols[1].button("Profile next run (sampling)", on_click=_profile_next_run, args=("sampling",))
+    if "profile_report" in st.session_state:
+        st.code(st.session_state["profile_report"], language=None)
+    st.download_button("Download Prometheus metrics", metrics.to_prometheus(),
+                       file_name="semantic_metrics.prom", mime="text/plain")
+    if st.button("Reset metrics"):
+        metrics.reset()
+        st.rerun()
+
+@section
+def render_calculator_pad():
     # Calculator Pad UI
     if 'calc_input' not in st.session_state:
         st.session_state['calc_input'] = ""
     st.markdown("### 🧮 Calculator Pad")
+    mode = st.radio("Arithmetic", CALC_MODES, horizontal=True, key="calc_mode")
     rows = [
         ['7', '8', '9', '+'],
         ['4', '5', '6', '-'],
@@ -255,13 +205,23 @@ with tab1:
             if cols[i].button(label, key=f"btn_{label}_{row}"):
                 if label == '=':
                     try:
-                        st.session_state['calc_input'] = str(eval(st.session_state['calc_input'].replace('×','*').replace('÷','/')))
-                    except Exception:
+                        st.session_state['calc_input'] = calculate(st.session_state['calc_input'], mode)
+                        st.session_state['calc_error'] = ""
+                    except (ExpressionError, ExpressionTimeout) as e:
                         st.session_state['calc_input'] = "Error"
+                        st.session_state['calc_error'] = str(e)
                 else:
+                    if st.session_state['calc_input'] == "Error":
+                        st.session_state['calc_input'] = ""
                     st.session_state['calc_input'] += label
-    st.text_input("Result", value=st.session_state['calc_input'], key='result', disabled=True)
-
+    # A keyed widget ignores later value= changes, so push the display through its state
+    st.session_state['result'] = st.session_state['calc_input']
+    st.text_input("Result", key='result', disabled=True)
+    if st.session_state['calc_input'] == "Error" and st.session_state.get('calc_error'):
+        st.caption(st.session_state['calc_error'])
+
+@section
+def render_semantic_calculator():
     st.header("Semantic Math Calculator")
     a = st.number_input("Enter first number (a):", value=2, step=1)
     b = st.number_input("Enter second number (b):", value=3, step=1)
@@ -272,8 +232,9 @@ with tab1:
             st.success(semantic_add_prime_highlight(a, b))
         if st.button("✖ Multiply (Semantic)", key="mult_sem"):
             st.success(semantic_multiply(a, b))
+        expand_power = st.checkbox("Full expansion", key="pow_expand")
         if st.button("^ Power (Semantic)", key="pow_sem"):
-            st.success(semantic_power(a, b))
+            st.success(semantic_power(a, b, expand_power))
     with col2:
         if st.button("➖ Subtract (Semantic)", key="sub_sem"):
             st.success(semantic_subtract(a, b))
@@ -289,6 +250,8 @@ with tab1:
         if st.button("🚫 NOT (Logic)", key="not_sem"):
             st.success(semantic_not(a))
 
+@section
+def render_semantic_calculus():
     st.header("📈 Semantic Calculus")
     expr_input = st.text_input("Enter a mathematical expression (e.g., x**2 + 3*x):")
     var_input = st.text_input("Differentiate or integrate with respect to (e.g., x):", value="x")
@@ -299,24 +262,38 @@ with tab1:
     with col2:
         if st.button("🔄 Integral", key="integ_sem"):
             st.info(semantic_integral(expr_input, var_input))
-
+    with st.expander("📊 Evaluate & Plot"):
+        col1, col2, col3 = st.columns(3)
+        grid_lo = col1.number_input("From:", value=-10.0)
+        grid_hi = col2.number_input("To:", value=10.0)
+        grid_points = col3.number_input("Grid points:", value=1000, min_value=2, max_value=MAX_GRID_POINTS, step=1000)
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("📈 Evaluate on Grid", key="grid_sem"):
+                try:
+                    grid = evaluate_grid(expr_input, var_input, grid_lo, grid_hi, grid_points)
+                    stride = max(1, grid_points // MAX_CHART_POINTS)
+                    st.line_chart({name: values[::stride] for name, values in grid.items()}, x=var_input.strip())
+                except Exception as e:
+                    st.error(f"Error evaluating expression: {e}")
+        with col2:
+            if st.button("∫ Definite Integral", key="definite_sem"):
+                st.info(semantic_definite_integral(expr_input, var_input, grid_lo, grid_hi))
+
+@section
+def render_idea_composer():
     st.header("🌌 Idea Composer")
     idea_input = st.text_input("Enter a sequence of numbers separated by commas (e.g. 0,1,2,3):")
     if st.button("🧬 Compose Idea", key="compose_sem"):
-        try:
-            path = [int(x.strip()) for x in idea_input.split(",") if x.strip().isdigit()]
-            result = compose_idea(path)
-            st.info(result)
-
-            if st.button("💾 Export as JSON", key="export_json"):
-                json_data = json.dumps({"idea_sequence": path, "semantic_trace": result}, indent=2)
-                st.download_button("Download JSON", json_data, file_name="semantic_idea.json")
-
-            if st.button("📄 Export as Text", key="export_txt"):
-                txt_data = result
-                st.download_button("Download Text", txt_data, file_name="semantic_idea.txt")
-        except Exception as e:
-            st.error(f"Error: {e}")
+        st.session_state["idea_path"] = parse_path(idea_input)
+    if "idea_path" in st.session_state:
+        path = st.session_state["idea_path"]
+        st.info(compose_idea(path.tolist()))
+        export_format = st.selectbox("Export format:", list(EXPORT_FORMATS), key="idea_format")
+        _, extension, mime = EXPORT_FORMATS[export_format]
+        # Built only when clicked, on Streamlit's download thread
+        st.download_button(f"💾 Export as {export_format}", data=lambda: export_bytes(path, export_format),
+                           file_name=f"semantic_idea.{extension}", mime=mime, key="idea_export")
 
     st.subheader("🧠 Try a Semantic Template")
     selected_template = st.selectbox("Choose a Template:", [
@@ -336,7 +313,8 @@ with tab1:
         path = template_map[selected_template]
         st.info(compose_idea(path))
 
-with tab2:
+@section
+def render_prime_checker():
     st.header("🟩 Semantic Prime Tools")
     prime_input = st.number_input("Check primality for:", value=7, step=1)
     if st.button("Check Prime"):
@@ -344,65 +322,171 @@ with tab2:
 
     seq_limit = st.number_input("Generate primes up to:", value=20, step=1)
     if st.button("Compose Prime Sequence"):
-        result = semantic_primes_trace(seq_limit)
-        if "Input too large" in result:
-            st.warning(result)
-        else:
-            st.info(result)
+        start_prime_pages("trace", 2, seq_limit)
+    render_prime_pages("trace", as_table=False)
 
+@section
+def render_prime_range():
     st.header("🔎 Find Primes in Range")
     prime_range_min = st.number_input("Prime range minimum:", value=2, step=1)
     prime_range_max = st.number_input("Prime range maximum:", value=100, step=1)
     if st.button("Find Primes in Range"):
         if prime_range_max >= prime_range_min:
-            if prime_range_max > MAX_PRIME_RANGE:
-                st.warning(f"Input too large! Try <= {MAX_PRIME_RANGE}.")
-            else:
-                primes = generate_primes_up_to(prime_range_max)
-                primes_in_range = [p for p in primes if p >= prime_range_min]
-                st.markdown("**Primes found:**")
-                for p in primes_in_range:
-                    st.markdown(f"- {p}: {axiom_colors[p % 11]} {axioms[p % 11]}")
+            start_prime_pages("range", prime_range_min, prime_range_max)
         else:
+            clear_prime_pages("range")
             st.error("Maximum must be greater than or equal to minimum.")
+    if "range_query" in st.session_state:
+        st.markdown("**Primes found:**")
+        render_prime_pages("range")
 
+@section
+def render_neighbour_primes():
     st.header("🔮 Find Next Prime Number")
     next_prime_input = st.number_input("Find next prime after:", value=7, step=1)
     if st.button("Find Next Prime"):
-        result = semantic_next_prime(next_prime_input)
-        if "Input too large" in result:
-            st.warning(result)
-        else:
-            st.info(result)
+        st.info(semantic_next_prime(next_prime_input))
 
-with tab3:
+    st.header("🔙 Find Previous Prime Number")
+    prev_prime_input = st.number_input("Find previous prime before:", value=7, step=1)
+    if st.button("Find Previous Prime"):
+        st.info(semantic_prev_prime(prev_prime_input))
+
+@section
+def render_prime_gaps_explorer():
     st.header("🔸 Prime Gaps Explorer")
-    gap_limit = st.number_input("Compute prime gaps up to:", value=20, step=1)
+    gap_limit = st.number_input("Compute prime gaps up to:", value=1000, step=1)
     if st.button("Show Prime Gaps"):
-        st.info(prime_gaps(gap_limit))
-
+        if gap_limit > MAX_CONSTELLATION_LIMIT:
+            st.warning(f"Input too large! Try <= {MAX_CONSTELLATION_LIMIT:,}.")
+        else:
+            gap_stats = scan_constellations(gap_limit)
+            st.info(gap_summary(gap_stats))
+            if gap_stats.prime_count >= 2:
+                counts = gap_stats.gap_counts()
+                st.bar_chart({"gap": list(counts), "count": list(counts.values())}, x="gap", y="count")
+                st.caption("Record (maximal) gaps")
+                st.dataframe({"gap": [g for g, _ in gap_stats.record_gaps],
+                              "after prime": [p for _, p in gap_stats.record_gaps]}, hide_index=True)
+
+@section
+def render_factorization():
     st.header("🔸 Prime Factorization")
-    factor_input = st.number_input("Factorize:", value=28, step=1)
+    factor_input = st.text_input("Factorize:", value="28")
+    factor_budget = st.number_input("Time budget (seconds):", value=FACTOR_TIME_BUDGET, min_value=0.1, step=1.0)
     if st.button("Show Prime Factors"):
-        st.info(prime_factorization(factor_input))
+        try:
+            st.info(prime_factorization(int(factor_input.strip()), factor_budget))
+        except ValueError:
+            st.error("Enter a whole number to factorize.")
 
+@section
+def render_distribution_chart():
     st.header("🔸 Prime Distribution Chart")
     dist_limit = st.number_input("Visualize primes up to:", value=100, step=1)
     if st.button("Show Prime Chart"):
-        data = prime_distribution(dist_limit)
-        st.bar_chart(data)
-
+        if dist_limit > distribution_limit():
+            st.warning(f"Input too large! Try <= {distribution_limit():,}.")
+        elif dist_limit < 2:
+            st.error("Enter a limit ≥ 2.")
+        else:
+            # Kept so reruns of this section redraw without rescanning
+            st.session_state["distribution"] = scan_distribution(dist_limit)
+    if "distribution" in st.session_state:
+        dist = st.session_state["distribution"]
+        st.info(distribution_summary(dist))
+        st.line_chart(dist.curve(), x="x")
+        st.caption("Primes per bin")
+        st.bar_chart(dist.histogram(), x="from", y="primes")
+        st.caption("Primes by axiom (p mod 11)")
+        st.bar_chart({"axiom": [f"{r} {axiom_colors[r]}" for r in range(11)],
+                      "primes": list(dist.residue_counts().values())}, x="axiom", y="primes")
+
+@section
+def render_nth_prime_finder():
     st.header("🔸 Nth Prime Finder")
     nth_input = st.number_input("Which Nth prime?", value=10, step=1)
     if st.button("Show Nth Prime"):
         st.info(nth_prime(nth_input))
 
+@section
+def render_prime_counting():
+    st.header("🔸 Prime Counting π(x)")
+    pi_input = st.number_input("Count primes up to:", value=100, step=1)
+    if st.button("Count Primes"):
+        st.info(semantic_prime_pi(pi_input))
+
+@section
+def render_goldbach_explorer():
     st.header("🔸 Goldbach Explorer")
     goldbach_input = st.number_input("Even number (>2):", value=28, step=2)
     if st.button("Find Goldbach Pair"):
         st.info(goldbach_pair(goldbach_input))
+    comet_limit = st.number_input("Verify Goldbach and count partitions up to:", value=10000, step=2)
+    if st.button("Plot Goldbach's Comet"):
+        if comet_limit > MAX_GOLDBACH_BATCH:
+            st.warning(f"Input too large! Try <= {MAX_GOLDBACH_BATCH:,}.")
+        elif comet_limit < 4:
+            st.error("Enter a limit ≥ 4.")
+        else:
+            summary, chart_data = goldbach_comet(comet_limit)
+            st.info(summary)
+            st.scatter_chart(chart_data, x="n", y="r(n)")
 
-    st.header("🔸 Twin Primes Finder")
+@section
+def render_constellations():
+    st.header("🔸 Twin Primes & Constellations")
     twin_limit = st.number_input("Find twin primes up to:", value=100, step=1)
     if st.button("Show Twin Primes"):
-        st.info(twin_primes(twin_limit))
+        if twin_limit > MAX_CONSTELLATION_LIMIT:
+            st.warning(f"Input too large! Try <= {MAX_CONSTELLATION_LIMIT:,}.")
+        else:
+            twin_stats = scan_constellations(twin_limit)
+            st.info(twin_summary(twin_stats))
+            st.dataframe({
+                "pattern": list(PATTERNS),
+                "count": [twin_stats.counts[name] for name in PATTERNS],
+                "first": [str(twin_stats.first[name] or "—") for name in PATTERNS],
+                "largest": [str(twin_stats.last[name] or "—") for name in PATTERNS],
+            }, hide_index=True)
+
+st.set_page_config(page_title="Semantic Calculator with Primes", layout="centered")
+run_started = time.perf_counter()
+capture = None
+if "profile_mode" in st.session_state:
+    capture = ProfileCapture(st.session_state.pop("profile_mode")).start()
+st.title("🧠 Semantic Processor & Prime Composer")
+warm_up()
+
+with st.expander("📘 Axiom Legend"):
+    for i in range(11):
+        st.markdown(f"**{i}**: {axiom_colors[i]} {axioms[i]}")
+
+tab1, tab2, tab3 = st.tabs(["Calculator", "Prime Tools", "Advanced Primes"])
+
+with tab1:
+    render_calculator_pad()
+    render_semantic_calculator()
+    render_semantic_calculus()
+    render_idea_composer()
+
+with tab2:
+    render_prime_checker()
+    render_prime_range()
+    render_neighbour_primes()
+
+with tab3:
+    render_prime_gaps_explorer()
+    render_factorization()
+    render_distribution_chart()
+    render_nth_prime_finder()
+    render_prime_counting()
+    render_goldbach_explorer()
+    render_constellations()
+
+if capture is not None:
+    st.session_state["profile_report"] = capture.stop()
+metrics.observe("streamlit_run", time.perf_counter() - run_started)
+
+if st.query_params.get("admin") == "1":
+    render_admin_panel()
@@ -0,0 +1,389 @@
+"""
+Asyncio HTTP service for the expensive prime and calculus operations.
+
+    GET  /is_prime?n=97
+    GET  /factorize?n=1234567891011&budget=10
+    GET  /nth_prime?n=1000000
+    GET  /goldbach?n=1000
+    GET  /integral?expr=sin(x)**2&var=x
+    POST /<endpoint>          with the same parameters as a JSON object
+    POST /batch/<endpoint>    with {"items": [{...}, ...]}
+    GET  /health, GET /stats, GET /metrics (Prometheus text format)
+
+CPU-bound work runs in a spawned process pool (integrals go through the
+calculus engine's own time-boxed workers from a thread). Identical requests
+that arrive while one is still computing share its result instead of
+starting another computation, and each endpoint has its own concurrency
+limit so a burst of factorizations cannot starve cheap primality checks.
+Needs nothing beyond the standard library and the modules in this repo:
+
+    python semantic_service.py --port 8765 --workers 4 --limit factorize=2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from calculus_engine import (
+    CALCULUS_WORKERS, CalculusError, CalculusTimeout, DEFAULT_BUDGET as CALCULUS_BUDGET, calculus,
+)
+from factorization import MAX_FACTOR_DIGITS, FactorizationTimeout, factorize, format_factors
+from goldbach import MAX_GOLDBACH_DIGITS, goldbach_min_pair
+from instrumentation import metrics
+from primality import is_prime
+from prime_counting import MAX_NTH_PRIME, nth_prime
+from semantic_axioms import AXIOM_COUNT, axiom_colors, axioms
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_HEADER_BYTES = 1 << 16
+MAX_BODY_BYTES = 1 << 20
+MAX_BATCH = 1000
+MAX_INT_DIGITS = 4000
+FACTOR_BUDGET = 10.0
+MAX_FACTOR_BUDGET = 60.0
+KEEPALIVE_TIMEOUT = 30.0
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _semantic(n: int) -> Dict[str, Any]:
+    axiom = n % AXIOM_COUNT
+    return {"axiom": axiom, "symbol": axiom_colors[axiom], "meaning": axioms[axiom]}
+
+
+# Computations; the process-pool ones must stay top-level so they pickle
+
+def _is_prime(n: int) -> Dict[str, Any]:
+    return {"n": n, "prime": is_prime(n), **_semantic(n)}
+
+
+def _factorize(n: int, budget: float) -> Dict[str, Any]:
+    try:
+        factors, remaining = factorize(n, budget), []
+    except FactorizationTimeout as e:
+        factors, remaining = e.factors, e.remaining
+    return {
+        "n": n,
+        "factors": {str(p): k for p, k in factors.items()},
+        "text": format_factors(factors),
+        "complete": not remaining,
+        "unfactored": [str(m) for m in remaining],
+    }
+
+
+def _nth_prime(n: int) -> Dict[str, Any]:
+    p = nth_prime(n)
+    return {"n": n, "prime": p, **_semantic(p)}
+
+
+def _goldbach(n: int) -> Dict[str, Any]:
+    pair = goldbach_min_pair(n)
+    return {"n": n, "pair": list(pair) if pair else None}
+
+
+def _integral(expr: str, var: str, budget: float) -> Dict[str, Any]:
+    try:
+        result = calculus.integral(expr, var, budget)
+    except CalculusTimeout as e:
+        raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, str(e)) from None
+    except CalculusError as e:
+        raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, str(e)) from None
+    return {"expr": expr, "var": var, "integral": str(result.value), "strategy": result.strategy,
+            "approximate": result.strategy == "series"}
+
+
+# Parameter parsing: raw query/JSON values -> canonical argument tuple
+
+def _int_param(params: Dict[str, Any], key: str, lo: Optional[int] = None, hi: Optional[int] = None) -> int:
+    value = params.get(key)
+    if value is None:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"missing parameter '{key}'")
+    if isinstance(value, bool) or len(str(value)) > MAX_INT_DIGITS:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be an integer of at most {MAX_INT_DIGITS} digits")
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be an integer") from None
+    if (lo is not None and n < lo) or (hi is not None and n > hi):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be in [{lo}, {hi if hi is not None else '∞'}]")
+    return n
+
+
+def _float_param(params: Dict[str, Any], key: str, default: float, hi: float) -> float:
+    try:
+        value = float(params.get(key, default))
+    except (TypeError, ValueError):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be a number") from None
+    if not 0 < value <= hi:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'{key}' must be in (0, {hi:g}]")
+    return value
+
+
+def _goldbach_args(params: Dict[str, Any]) -> Tuple:
+    n = _int_param(params, "n", 4)
+    if n % 2:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'n' must be even")
+    if len(str(n)) > MAX_GOLDBACH_DIGITS:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'n' must have at most {MAX_GOLDBACH_DIGITS} digits")
+    return (n,)
+
+
+def _factorize_args(params: Dict[str, Any]) -> Tuple:
+    n = _int_param(params, "n", 2)
+    if len(str(n)) > MAX_FACTOR_DIGITS:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"'n' must have at most {MAX_FACTOR_DIGITS} digits to factorize")
+    return n, _float_param(params, "budget", FACTOR_BUDGET, MAX_FACTOR_BUDGET)
+
+
+def _integral_args(params: Dict[str, Any]) -> Tuple:
+    expr = "".join(str(params.get("expr", "")).split())
+    if not expr:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "missing parameter 'expr'")
+    var = str(params.get("var") or "x").strip()
+    return expr, var, _float_param(params, "budget", CALCULUS_BUDGET, CALCULUS_BUDGET * 6)
+
+
+class Endpoint(NamedTuple):
+    args: Callable[[Dict[str, Any]], Tuple]
+    run: Callable[..., Dict[str, Any]]
+    # "process" for CPU-bound work, "thread" for calls that block on another process
+    executor: str
+    limit: int
+    # Arguments cheap enough to answer on the event loop itself
+    inline: Callable[[Tuple], bool] = lambda args: False
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "is_prime": Endpoint(lambda p: (_int_param(p, "n"),), _is_prime, "process", 64,
+                         inline=lambda args: abs(args[0]).bit_length() <= 64),
+    "factorize": Endpoint(_factorize_args, _factorize, "process", 4),
+    "nth_prime": Endpoint(lambda p: (_int_param(p, "n", 1, MAX_NTH_PRIME),), _nth_prime, "process", 4,
+                          inline=lambda args: args[0] <= 100000),
+    "goldbach": Endpoint(_goldbach_args, _goldbach, "process", 16),
+    "integral": Endpoint(_integral_args, _integral, "thread", CALCULUS_WORKERS),
+}
+
+
+class SemanticService:
+    def __init__(self, workers: Optional[int] = None, limits: Optional[Dict[str, int]] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        limits = {name: endpoint.limit for name, endpoint in ENDPOINTS.items()} | (limits or {})
+        # More admitted process-pool calls than workers would only queue inside the pool,
+        # where one slow endpoint holds every worker and starves the others
+        limits = {name: min(limit, self.workers) if ENDPOINTS[name].executor == "process" else limit
+                  for name, limit in limits.items()}
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+        self._limits = limits
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.stats = {name: {"requests": 0, "computed": 0, "coalesced": 0, "active": 0, "errors": 0}
+                      for name in ENDPOINTS}
+        metrics.collector(self._families)
+
+    async def _compute(self, name: str, args: Tuple) -> Dict[str, Any]:
+        endpoint = ENDPOINTS[name]
+        stats = self.stats[name]
+        stats["computed"] += 1
+        # Pool workers keep their own registries, so the service times each computation here
+        with metrics.timer(f"service.{name}"):
+            if endpoint.inline(args):
+                return endpoint.run(*args)
+            async with self._semaphores[name]:
+                stats["active"] += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    executor = self._pool if endpoint.executor == "process" else None
+                    return await loop.run_in_executor(executor, endpoint.run, *args)
+                finally:
+                    stats["active"] -= 1
+
+    async def call(self, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run endpoint name, sharing the result with identical in-flight calls."""
+        if name not in ENDPOINTS:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown endpoint: {name}")
+        stats = self.stats[name]
+        stats["requests"] += 1
+        try:
+            key = (name, ENDPOINTS[name].args(params))
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._compute(name, key[1]))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._inflight.pop(key, None))
+            else:
+                stats["coalesced"] += 1
+            # Shielded so one caller going away does not cancel the others
+            return await asyncio.shield(task)
+        except Exception:
+            stats["errors"] += 1
+            raise
+
+    async def batch(self, name: str, items: Any) -> Dict[str, Any]:
+        if not isinstance(items, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'items' must be a list")
+        if len(items) > MAX_BATCH:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"at most {MAX_BATCH} items per batch")
+        if name not in ENDPOINTS:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"unknown endpoint: {name}")
+        outcomes = await asyncio.gather(
+            *(self.call(name, item if isinstance(item, dict) else {}) for item in items),
+            return_exceptions=True)
+        results = []
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                status, message = _error_status(outcome)
+                results.append({"status": status, "error": message})
+            else:
+                results.append({"status": HTTPStatus.OK, "result": outcome})
+        return {"results": results}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"workers": self.workers, "inflight": len(self._inflight),
+                "endpoints": {name: {**stats, "limit": self._limits[name]} for name, stats in self.stats.items()}}
+
+    def _families(self):
+        families = [(f"semantic_service_{key}_total", "counter", f"Service {key} count per endpoint.",
+                     [({"endpoint": name}, stats[key]) for name, stats in self.stats.items()])
+                    for key in ("requests", "computed", "coalesced", "errors")]
+        families.append(("semantic_service_active", "gauge", "Computations currently running per endpoint.",
+                         [({"endpoint": name}, stats["active"]) for name, stats in self.stats.items()]))
+        families.append(("semantic_service_inflight", "gauge", "Distinct computations in flight.",
+                         [({}, len(self._inflight))]))
+        return families
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[int, Union[Dict[str, Any], str]]:
+        url = urlsplit(target)
+        path = url.path.strip("/")
+        try:
+            if method == "GET":
+                if path == "health":
+                    return HTTPStatus.OK, {"status": "ok"}
+                if path == "stats":
+                    return HTTPStatus.OK, self.snapshot()
+                if path == "metrics":
+                    return HTTPStatus.OK, metrics.to_prometheus()
+                if path.startswith("batch/"):
+                    raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "batch endpoints take POST")
+                return HTTPStatus.OK, await self.call(path, dict(parse_qsl(url.query)))
+            if method == "POST":
+                try:
+                    params = json.loads(body or b"{}")
+                except ValueError:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be JSON") from None
+                if not isinstance(params, dict):
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+                if path.startswith("batch/"):
+                    return HTTPStatus.OK, await self.batch(path[len("batch/"):], params.get("items"))
+                return HTTPStatus.OK, await self.call(path, params)
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported")
+        except Exception as e:
+            status, message = _error_status(e)
+            return status, {"error": message}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """One HTTP/1.1 connection, with keep-alive."""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    _respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {"error": "headers too large"}, False)
+                    break
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ")
+                    headers = {}
+                    for line in header_lines:
+                        field, value = line.split(":", 1)
+                        headers[field.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    _respond(writer, HTTPStatus.BAD_REQUEST, {"error": "malformed request"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    _respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length > 0 else b""
+                status, payload = await self.route(method, target, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                _respond(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+
+def _error_status(error: BaseException) -> Tuple[int, str]:
+    if isinstance(error, HTTPError):
+        return error.status, str(error)
+    if isinstance(error, ValueError):
+        return HTTPStatus.BAD_REQUEST, str(error)
+    if isinstance(error, TimeoutError):
+        return HTTPStatus.GATEWAY_TIMEOUT, str(error) or "timed out"
+    return HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(error).__name__}: {error}"
+
+
+def _respond(writer: asyncio.StreamWriter, status: int, payload: Union[Dict[str, Any], str],
+             keep_alive: bool) -> None:
+    if isinstance(payload, str):
+        body, content_type = payload.encode(), "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode(), "application/json; charset=utf-8"
+    status = HTTPStatus(status)
+    writer.write(
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: Optional[int] = None,
+                limits: Optional[Dict[str, int]] = None) -> None:
+    service = SemanticService(workers, limits)
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving {', '.join(ENDPOINTS)} on http://{host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def _parse_limit(text: str) -> Tuple[str, int]:
+    name, _, value = text.partition("=")
+    if name not in ENDPOINTS or not value.isdigit() or int(value) < 1:
+        raise argparse.ArgumentTypeError(f"expected ENDPOINT=N with ENDPOINT in {', '.join(ENDPOINTS)}")
+    return name, int(value)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serve prime and calculus operations over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--limit", type=_parse_limit, action="append", default=[],
+                        help="per-endpoint concurrency, e.g. factorize=2 (repeatable)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, dict(args.limit)))
+    except KeyboardInterrupt:
+        pass
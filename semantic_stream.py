@@ -0,0 +1,54 @@
+"""
+Chunked, generator-based prime traces and range listings.
+
+Each chunk covers one span of the shared prime table, so peak memory stays
+flat however large the range is. A page for the UI starts from the first
+prime of that page, which the caller keeps from the page before, so it
+costs the same however deep into the range it is.
+"""
+
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from instrumentation import timed
+from semantic_axioms import AXIOM_COUNT, axiom_colors, axioms
+from shared_primes import shared_table
+
+PAGE_SIZE = 500
+# Largest bound a listing accepts; sieving a window costs a base of primes up to its square root
+MAX_LISTING_BOUND = 10**12
+
+
+def iter_semantic_primes_trace(n: int) -> Iterator[str]:
+    """The semantic_primes_trace string for primes <= n, one ' → '-joined chunk at a time."""
+    for primes in shared_table.iter_range(2, n):
+        yield " → ".join(f"{p}: {axiom_colors[p % AXIOM_COUNT]} {axioms[p % AXIOM_COUNT]}" for p in primes)
+
+
+def prime_rows(primes: List[int]) -> Dict[str, list]:
+    """Column layout used by the paginated prime tables."""
+    residues = [p % AXIOM_COUNT for p in primes]
+    return {
+        "Prime": primes,
+        "Axiom": residues,
+        "Symbol": [axiom_colors[r] for r in residues],
+        "Meaning": [axioms[r] for r in residues],
+    }
+
+
+def iter_prime_rows(lo: int, hi: int) -> Iterator[Dict[str, list]]:
+    for primes in shared_table.iter_range(lo, hi):
+        yield prime_rows(primes)
+
+
+@timed(size=lambda start, hi, page_size=PAGE_SIZE: page_size)
+def prime_rows_page(start: int, hi: int, page_size: int = PAGE_SIZE) -> Tuple[Dict[str, list], Optional[int]]:
+    """
+    Rows for the first page_size primes in [start, hi], and the first prime
+    of the next page (None on the last page) to pass back as its start.
+    """
+    # About 1.4 times the span page_size primes take, as the mean gap near x is ln x
+    span = (page_size + 1) * max(start, 2).bit_length()
+    stream = chain.from_iterable(shared_table.iter_range(start, hi, span))
+    primes = list(islice(stream, page_size + 1))
+    return prime_rows(primes[:page_size]), primes[page_size] if len(primes) > page_size else None
@@ -0,0 +1,184 @@
+"""
+Process-wide prime table shared by every Streamlit session.
+
+Streamlit keeps imported modules alive across reruns and sessions, so the
+module-level ``shared_table`` is sieved once per process. The table keeps a
+contiguous prefix of primes [2, limit] that grows by sieving only the new
+segment, at most one EXTEND_CHUNK per query so no request holds the lock
+for long (warm() grows it further in the background). Queries beyond
+reach of the prefix, or past the memory ceiling, are answered from
+fixed-span blocks kept in an LRU and evicted oldest first.
+
+If $PRIME_TABLE_PATH names a wheel-30 table file (see prime_table.py),
+queries inside its limit are answered straight from the memory map.
+"""
+
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from itertools import compress
+from math import log
+from typing import Dict, Iterator, List, Optional
+
+from instrumentation import metrics, timed
+from prime_sieve import primes_in_range, primes_up_to, segment_flags
+from prime_table import PrimeTable, load_prime_table
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+BLOCK_SPAN = 1 << 20
+INITIAL_LIMIT = 1 << 16
+EXTEND_CHUNK = 1 << 24
+WARM_LIMIT = 1 << 22
+
+
+def _estimated_bytes(limit: int) -> int:
+    # 8 bytes per prime, pi(x) ~ x / (ln x - 1)
+    if limit < 3:
+        return 8
+    return int(8 * limit / max(log(limit) - 1.1, 1.0))
+
+
+class SharedPrimeTable:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, block_span: int = BLOCK_SPAN,
+                 mapped: Optional[PrimeTable] = None):
+        self.max_bytes = max_bytes
+        self.mapped = mapped
+        self.block_span = block_span
+        self._lock = threading.RLock()
+        self._prefix = array("Q", primes_up_to(INITIAL_LIMIT))
+        self._limit = INITIAL_LIMIT
+        self._blocks: "OrderedDict[int, array]" = OrderedDict()
+        self._block_bytes = 0
+        self.extensions = 0
+        self.evictions = 0
+        self._warmer: Optional[threading.Thread] = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return self._prefix.itemsize * len(self._prefix) + self._block_bytes
+
+    def _extend(self, n: int) -> bool:
+        """Grow the prefix to cover n if the ceiling allows; True on success."""
+        target = max(n, min(2 * self._limit, self._limit + EXTEND_CHUNK))
+        if _estimated_bytes(target) > self.max_bytes:
+            target = n
+        if _estimated_bytes(target) > self.max_bytes:
+            return False
+        start = self._limit + 1
+        while start <= target:
+            stop = min(start + EXTEND_CHUNK - 1, target)
+            first, flags = segment_flags(start, stop)
+            self._prefix.extend(compress(range(first, stop + 1, 2), flags))
+            self._limit = stop
+            start = stop + 1
+        self.extensions += 1
+        # Blocks now inside the prefix are redundant
+        for b in [b for b in self._blocks if (b + 1) * self.block_span - 1 <= target]:
+            self._drop_block(b)
+        self._evict()
+        return True
+
+    def _drop_block(self, b: int) -> None:
+        block = self._blocks.pop(b)
+        self._block_bytes -= block.itemsize * len(block)
+
+    def _evict(self) -> None:
+        prefix_bytes = self._prefix.itemsize * len(self._prefix)
+        while self._blocks and prefix_bytes + self._block_bytes > self.max_bytes:
+            self._drop_block(next(iter(self._blocks)))
+            self.evictions += 1
+
+    def _block(self, b: int) -> array:
+        block = self._blocks.get(b)
+        if block is not None:
+            self._blocks.move_to_end(b)
+            return block
+        lo = b * self.block_span
+        block = array("Q", primes_in_range(lo, lo + self.block_span - 1))
+        self._blocks[b] = block
+        self._block_bytes += block.itemsize * len(block)
+        self._evict()
+        return block
+
+    def warm(self, limit: int = WARM_LIMIT) -> threading.Thread:
+        """
+        Sieve the prefix up to limit on a daemon thread, one EXTEND_CHUNK at
+        a time so queries can interleave. Repeat calls while it runs are no-ops.
+        """
+        with self._lock:
+            if self._warmer is not None and self._warmer.is_alive():
+                return self._warmer
+
+            def run() -> None:
+                stop = self._limit
+                while stop < limit:
+                    stop = min(stop + EXTEND_CHUNK, limit)
+                    with self._lock:
+                        if stop > self._limit and not self._extend(stop):
+                            return
+
+            self._warmer = threading.Thread(target=run, name="prime-table-warm", daemon=True)
+            self._warmer.start()
+            return self._warmer
+
+    @timed("shared_table.primes_in_range", size=lambda self, lo, hi: max(hi - lo, 0))
+    def primes_in_range(self, lo: int, hi: int) -> List[int]:
+        """Primes p with lo <= p <= hi, served from the shared table."""
+        if hi < 2 or hi < lo:
+            return []
+        if self.mapped is not None and hi <= self.mapped.limit:
+            return self.mapped.primes_in_range(lo, hi).tolist()
+        with self._lock:
+            if self._limit < hi <= self._limit + EXTEND_CHUNK:
+                self._extend(hi)
+            if hi <= self._limit:
+                prefix = self._prefix
+                return prefix[bisect_left(prefix, lo):bisect_right(prefix, hi)].tolist()
+            result: List[int] = []
+            if lo <= self._limit:
+                result = self._prefix[bisect_left(self._prefix, lo):].tolist()
+                lo = self._limit + 1
+            for b in range(lo // self.block_span, hi // self.block_span + 1):
+                block = self._block(b)
+                result.extend(block[bisect_left(block, lo):bisect_right(block, hi)])
+            return result
+
+    def primes_up_to(self, n: int) -> List[int]:
+        return self.primes_in_range(2, n)
+
+    def iter_range(self, lo: int, hi: int, span: int = BLOCK_SPAN) -> Iterator[List[int]]:
+        """Primes in [lo, hi] yielded span by span, so callers never hold the whole range."""
+        lo = max(lo, 0)
+        while lo <= hi:
+            stop = min(lo + span - 1, hi)
+            primes = self.primes_in_range(lo, stop)
+            if primes:
+                yield primes
+            lo = stop + 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "limit": self._limit,
+                "prefix_primes": len(self._prefix),
+                "blocks": len(self._blocks),
+                "bytes": self.nbytes(),
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "mapped_limit": self.mapped.limit if self.mapped is not None else 0,
+            }
+
+
+shared_table = SharedPrimeTable(mapped=load_prime_table())
+
+
+@metrics.collector
+def _table_metrics():
+    stats = shared_table.stats()
+    return [(f"semantic_prime_table_{key}", "gauge", f"Shared prime table {key.replace('_', ' ')}.", [({}, value)])
+            for key, value in stats.items()]
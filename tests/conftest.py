@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Keep test runs off the on-disk result cache, and import the modules from the repo root
+os.environ.setdefault("SEMANTIC_RESULT_CACHE", "0")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import pytest
+
+from arithmetic_engine import (DECIMAL_PRECISION, MAX_EXPRESSION_LENGTH, ExpressionError, ExpressionTooCostly,
+                               calculate, evaluate)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1 + 2 * 3", 7),
+    ("(1 + 2) * 3", 9),
+    ("7 // 2", 3),
+    ("7 % 3", 1),
+    ("-2 ** 2", -4),
+    ("2 ** 10", 1024),
+    ("6 × 7 − 2 ÷ 4", 41.5),
+])
+def test_float_mode(text, expected):
+    assert evaluate(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os')",
+    "x + 1",
+    "abs(-1)",
+    "[1, 2]",
+    "1 if 1 else 2",
+    "1 < 2",
+    "'a' * 3",
+    "(1).real",
+    "lambda: 1",
+    "1 << 2",
+    "True + 1",
+])
+def test_whitelist_rejects(text):
+    with pytest.raises(ExpressionError):
+        evaluate(text)
+
+
+def test_malformed_and_empty():
+    for text in ("1 +", "", "   ", "(1"):
+        with pytest.raises(ExpressionError):
+            evaluate(text)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        evaluate("1", mode="complex")
+
+
+def test_fraction_mode_is_exact():
+    assert evaluate("1/3 + 1/6", "fraction") == Fraction(1, 2)
+    assert calculate("1/3", "fraction") == "1/3"
+    assert evaluate("(2/3) ** -2", "fraction") == Fraction(9, 4)
+    assert evaluate("0.1 + 0.2", "fraction") == Fraction(3, 10)
+
+
+def test_decimal_mode():
+    assert evaluate("0.1 + 0.2", "decimal") == Decimal("0.3")
+    assert calculate("1/3", "decimal").startswith("0.333333")
+    assert evaluate("10**40 // 7", "decimal") == Decimal(10**40 // 7)
+
+
+def test_decimal_quotient_past_precision():
+    for text in ("10**60 // 7", "10**60 % 7"):
+        with pytest.raises(ExpressionError, match=f"more than {DECIMAL_PRECISION} digits"):
+            evaluate(text, "decimal")
+
+
+@pytest.mark.parametrize("mode", ["float", "fraction", "decimal"])
+@pytest.mark.parametrize("text", ["1/0", "1//0", "1 % 0", "0 ** -1"])
+def test_division_by_zero(mode, text):
+    with pytest.raises(ExpressionError):
+        evaluate(text, mode)
+
+
+@pytest.mark.parametrize("mode", ["float", "fraction"])
+@pytest.mark.parametrize("text", [
+    "9 ** 9 ** 9",
+    "2 ** 100000",
+    "(10 ** 3000) * (10 ** 3000)",
+    "(-3) ** 20000",
+])
+def test_cost_refusals(mode, text):
+    with pytest.raises(ExpressionTooCostly):
+        evaluate(text, mode)
+
+
+def test_cost_limits_exact_negative_powers_only():
+    with pytest.raises(ExpressionTooCostly):
+        evaluate("2 ** -100000", "fraction")
+    assert evaluate("2 ** -100000") == 0.0
+    assert evaluate("1 ** -(10 ** 100)", "fraction") == 1
+    assert evaluate("(-1) ** (10 ** 100 + 1)") == -1
+
+
+def test_expression_length_cap():
+    with pytest.raises(ExpressionTooCostly):
+        evaluate("1+" * MAX_EXPRESSION_LENGTH + "1")
+
+
+def test_float_overflow_is_reported():
+    with pytest.raises(ExpressionError):
+        evaluate("1.5 ** 100000")
+
+
+@pytest.mark.parametrize("text", ["1e308 * 10", "1e308 + 1e308", "-1e308 * 10", "1e999", "1e999 - 1e999"])
+def test_float_overflow_to_inf_is_refused(text):
+    with pytest.raises(ExpressionError):
+        evaluate(text)
+
+
+def test_decimal_underflow_formats_as_zero():
+    assert calculate("2 ** -100000", "decimal") == "0"
+    assert calculate("-(2 ** -100000)", "decimal") == "0"
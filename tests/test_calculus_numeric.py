@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+import pytest
+
+from calculus_numeric import DivergentIntegral, adaptive_quadrature, definite_integral, evaluate_grid
+
+
+@pytest.mark.parametrize("f, a, b, expected", [
+    (np.sin, 0.0, math.pi, 2.0),
+    (np.exp, 0.0, 50.0, math.expm1(50.0)),
+    (lambda x: 1 / np.sqrt(x), 0.0, 1.0, 2.0),
+    (lambda x: np.log(np.abs(x)), -1.0, 1.0, -2.0),
+    (lambda x: x ** 2, 3.0, 0.0, -9.0),
+])
+def test_quadrature_converges(f, a, b, expected):
+    value, error = adaptive_quadrature(f, a, b)
+    assert value == pytest.approx(expected, rel=1e-8)
+    assert error <= 1e-9 * max(abs(expected), 1.0)
+
+
+@pytest.mark.parametrize("f, a, b", [
+    (lambda x: 1 / x ** 2, -1.0, 1.0),
+    (lambda x: 1 / (x - 2), 0.0, 3.0),
+    (lambda x: 1 / x, -1.0, 1.0),
+])
+def test_quadrature_refuses_divergent_integrals(f, a, b):
+    with pytest.raises(DivergentIntegral):
+        adaptive_quadrature(f, a, b)
+
+
+@pytest.mark.parametrize("expr, a, b", [("1/x**2", -1, 1), ("1/(x-2)", 0, 3), ("1/x", -1, 1), ("tan(x)", 0, 3),
+                                        ("sqrt(x)", -1, 1)])
+def test_definite_integral_refuses_singular_intervals(expr, a, b):
+    with pytest.raises(DivergentIntegral):
+        definite_integral(expr, "x", a, b)
+
+
+@pytest.mark.parametrize("expr, a, b, expected", [("x**2", 0, 3, 9.0), ("Abs(x)", -1, 1, 1.0), ("sign(x)", -1, 1, 0.0),
+                                                  ("1/sqrt(x)", 0, 1, 2.0), ("sin(x)/x", -1, 1, 1.8921661407343662)])
+def test_definite_integral_values(expr, a, b, expected):
+    value, _ = definite_integral(expr, "x", a, b)
+    assert value == pytest.approx(expected, abs=1e-9)
+
+
+def test_grid_drops_only_the_column_that_does_not_compile():
+    grid = evaluate_grid("sign(x)", "x", -1, 1, 5)
+    assert "f'" not in grid
+    assert grid["f"].tolist() == [-1.0, -1.0, 0.0, 1.0, 1.0]
+    assert set(evaluate_grid("x**2", "x", -1, 1, 5)) == {"x", "f", "f'", "F"}
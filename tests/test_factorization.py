@@ -0,0 +1,83 @@
+import random
+from math import prod
+
+import pytest
+
+from factorization import _ECM_D, FactorizationTimeout, _stage2_plan, ecm, factorize, format_factors, pollard_brent
+from primality import is_prime
+from prime_sieve import primes_in_range
+
+
+def _trial_division(n):
+    factors = {}
+    p = 2
+    while p * p <= n:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            n //= p
+        p += 1
+    if n > 1:
+        factors[n] = factors.get(n, 0) + 1
+    return factors
+
+
+def test_small_numbers_match_trial_division():
+    for n in range(2, 5000):
+        assert factorize(n) == _trial_division(n), n
+
+
+def test_random_numbers_match_trial_division():
+    rng = random.Random(1)
+    for _ in range(300):
+        n = rng.randrange(2, 10**10)
+        assert factorize(n) == _trial_division(n), n
+
+
+@pytest.mark.parametrize("factors", [
+    {1000003: 1, 1000033: 1},
+    {2: 10, 3: 5, 1000003: 2},
+    {4294967291: 1, 4294967279: 1},
+    {1000000007: 3},
+    {2**31 - 1: 1, 2**61 - 1: 1},
+    {65537: 1, 2**89 - 1: 1, 1000000000039: 1},
+])
+def test_known_factorizations(factors):
+    assert factorize(prod(p ** e for p, e in factors.items())) == factors
+
+
+def test_rejects_below_two():
+    with pytest.raises(ValueError):
+        factorize(1)
+
+
+def test_pollard_brent_and_ecm_find_divisors():
+    n = 1000003 * 998244353
+    d = pollard_brent(n)
+    assert d not in (None, 1, n) and n % d == 0
+    n = 1000000007 * 998244353
+    d = ecm(n)
+    assert d not in (None, 1, n) and n % d == 0
+
+
+def test_stage2_plan_covers_every_prime_once():
+    first, plan = _stage2_plan(2000, 200000)
+    covered = set()
+    for i, steps in enumerate(plan):
+        m = first + i * _ECM_D
+        assert list(steps) == sorted(set(steps))
+        covered.update(p for j in steps for p in (m - j, m + j) if 2000 < p <= 200000 and is_prime(p))
+    assert covered == set(primes_in_range(2001, 200000))
+
+
+def test_timeout_carries_partial_result():
+    # Two 40-digit primes are far beyond a millisecond of ECM
+    p, q = 10**39 + 3, 10**40 + 121
+    assert is_prime(p) and is_prime(q)
+    with pytest.raises(FactorizationTimeout) as raised:
+        factorize(8 * p * q, time_budget=0.001)
+    assert raised.value.factors == {2: 3}
+    assert prod(raised.value.remaining) == p * q
+
+
+def test_format_factors():
+    assert format_factors({2: 3, 7: 1}) == "2^3 · 7"
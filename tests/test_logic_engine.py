@@ -0,0 +1,115 @@
+import itertools
+import random
+
+import pytest
+
+from logic_engine import (BDD, MAX_FORMULA_LENGTH, LogicError, analyze, compile_formula, equivalence,
+                          is_satisfiable, is_tautology, truth_table)
+
+_PYTHON = {"and": "({} and {})", "or": "({} or {})", "xor": "({} != {})",
+           "implies": "((not {}) or {})", "iff": "({} == {})"}
+_SPELLINGS = {"and": ["&", "∧", "and", "&&"], "or": ["|", "∨", "or", "||"], "xor": ["^", "⊕", "xor"],
+              "implies": ["->", "→", "=>"], "iff": ["<->", "↔", "<=>"]}
+
+
+def _random_formula(rng, variables, depth):
+    """(formula text, equivalent Python expression)."""
+    if depth == 0 or rng.random() < 0.2:
+        name = rng.choice(variables)
+        return name, name
+    if rng.random() < 0.2:
+        text, python = _random_formula(rng, variables, depth - 1)
+        return f"{rng.choice(['!', '~', '¬', 'not '])}({text})", f"(not {python})"
+    op = rng.choice(list(_PYTHON))
+    left, left_py = _random_formula(rng, variables, depth - 1)
+    right, right_py = _random_formula(rng, variables, depth - 1)
+    return f"({left} {rng.choice(_SPELLINGS[op])} {right})", _PYTHON[op].format(left_py, right_py)
+
+
+def _brute_force(python, variables):
+    return [bool(eval(python, {}, dict(zip(variables, values))))
+            for values in itertools.product([False, True], repeat=len(variables))]
+
+
+def test_parser_precedence_and_associativity():
+    assert compile_formula("a | b & c").program == (("var", "a"), ("var", "b"), ("var", "c"), ("and", None),
+                                                    ("or", None))
+    # -> is right associative: a -> (b -> c)
+    assert compile_formula("a -> b -> c").program[-2:] == (("implies", None), ("implies", None))
+    assert compile_formula("b & a & b").variables == ("b", "a")
+
+
+@pytest.mark.parametrize("text", ["", "a &", "(a", "a)", "a b", "& a", "a $ b"])
+def test_parser_rejects(text):
+    with pytest.raises(LogicError):
+        compile_formula(text)
+
+
+def test_parser_length_cap():
+    with pytest.raises(LogicError):
+        compile_formula("a" * (MAX_FORMULA_LENGTH + 1))
+
+
+def test_deep_nesting_compiles():
+    compiled = compile_formula("(" * 2000 + "a" + ")" * 2000)
+    assert compiled.program == (("var", "a"),)
+
+
+def test_truth_table_and_bdd_match_brute_force():
+    rng = random.Random(0)
+    for trial in range(200):
+        variables = [f"v{k}" for k in range(rng.randint(1, 8))]
+        text, python = _random_formula(rng, variables, 5)
+        compiled = compile_formula(text)
+        expected = _brute_force(python, list(compiled.variables))
+
+        table = truth_table(text)
+        assert table.column().tolist() == expected, text
+        assert table.models == sum(expected)
+
+        bdd = BDD(compiled.variables)
+        root = bdd.build(compiled)
+        assert bdd.sat_count(root) == sum(expected), text
+        model = bdd.any_sat(root)
+        if any(expected):
+            assert eval(python, {}, model), text
+        else:
+            assert model is None
+
+
+def test_analyze_verdicts():
+    assert analyze("a | !a").verdict == "tautology"
+    assert analyze("a & !a").verdict == "unsatisfiable"
+    result = analyze("a & b")
+    assert (result.verdict, result.models, result.rows) == ("satisfiable", 1, 4)
+    assert result.example == {"a": True, "b": True}
+    assert is_tautology("(a -> b) <-> (!b -> !a)")
+    assert not is_satisfiable("0 & a")
+
+
+def test_analyze_switches_to_bdd_for_many_variables():
+    text = " & ".join(f"x{k}" for k in range(40))
+    result = analyze(text)
+    assert result.backend == "bdd"
+    assert result.models == 1 and result.rows == 1 << 40
+
+
+def test_equivalence():
+    assert equivalence("a -> b", "!a | b") is None
+    assert equivalence("!(a & b)", "!a | !b") is None
+    witness = equivalence("a -> b", "b -> a")
+    assert witness is not None
+    assert (not witness["a"] or witness["b"]) != (not witness["b"] or witness["a"])
+
+
+def test_progress_follows_the_program():
+    compiled = compile_formula("(a | b) & (c -> d) ^ !e")
+    length = len(compiled.program)
+    for evaluate in (lambda report: truth_table(compiled.text, report),
+                     lambda report: BDD(compiled.variables).build(compiled, report)):
+        seen = []
+        evaluate(lambda position, total: seen.append((position, total)))
+        assert seen == [(position, length) for position in range(length)]
+    seen = []
+    assert equivalence("a & b", "b & a", lambda position, total: seen.append((position, total))) is None
+    assert seen == [(position, 6) for position in range(6)]
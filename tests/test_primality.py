@@ -0,0 +1,44 @@
+import pytest
+
+from primality import is_prime, next_prime, prev_prime
+
+
+def _sieve(n):
+    flags = [False, False] + [True] * (n - 1)
+    for p in range(2, int(n ** 0.5) + 1):
+        if flags[p]:
+            flags[p * p::p] = [False] * len(flags[p * p::p])
+    return flags
+
+
+def test_is_prime_matches_sieve():
+    flags = _sieve(200000)
+    assert [n for n in range(-5, 200001) if is_prime(n)] == [n for n, prime in enumerate(flags) if prime]
+
+
+def test_next_and_prev_prime_match_sieve():
+    flags = _sieve(20000)
+    primes = [n for n, prime in enumerate(flags) if prime]
+    for n in range(0, 19000):
+        assert next_prime(n) == next(p for p in primes if p > n)
+        assert prev_prime(n) == next((p for p in reversed(primes) if p < n), None)
+
+
+@pytest.mark.parametrize("n", [
+    2047, 1373653, 25326001, 3215031751, 2152302898747, 3474749660383, 341550071728321,
+    3825123056546413051, 318665857834031151167461,
+    # Carmichael numbers
+    561, 41041, 825265, 321197185,
+    # Squares of primes past the 64-bit range
+    (2**61 - 1) ** 2, (2**89 - 1) ** 2,
+    (2**61 - 1) * (2**89 - 1),
+    2**128 + 1,
+])
+def test_pseudoprimes_are_composite(n):
+    assert not is_prime(n)
+
+
+@pytest.mark.parametrize("n", [2**31 - 1, 2**61 - 1, 2**89 - 1, 2**127 - 1, 2**521 - 1, 10**18 + 9,
+                               18446744073709551557])
+def test_large_primes(n):
+    assert is_prime(n)
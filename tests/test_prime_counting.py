@@ -0,0 +1,53 @@
+import pytest
+
+from prime_counting import SIEVE_NTH_LIMIT, nth_prime, nth_prime_upper_bound, prime_pi
+
+
+def _sieve_primes(n):
+    flags = bytearray([1]) * (n + 1)
+    flags[:2] = b"\0\0"
+    for p in range(2, int(n ** 0.5) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(flags[p * p::p]))
+    return [n for n, prime in enumerate(flags) if prime]
+
+
+PRIMES = _sieve_primes(3 * 10**6)
+
+
+def test_prime_pi_matches_sieve():
+    count = 0
+    for x in range(-3, 5000):
+        while PRIMES[count] <= x:
+            count += 1
+        assert prime_pi(x) == count, x
+
+
+@pytest.mark.parametrize("x", [10**5, 123457, 10**6, 2 * 10**6 + 1, 3 * 10**6])
+def test_prime_pi_larger_values(x):
+    assert prime_pi(x) == sum(1 for p in PRIMES if p <= x)
+
+
+@pytest.mark.parametrize("x, count", [(10**9, 50847534), (10**10, 455052511)])
+def test_prime_pi_known_values(x, count):
+    assert prime_pi(x) == count
+
+
+def test_nth_prime_matches_sieve():
+    for n in list(range(1, 2000)) + [SIEVE_NTH_LIMIT, SIEVE_NTH_LIMIT + 1, 150000, len(PRIMES)]:
+        assert nth_prime(n) == PRIMES[n - 1], n
+
+
+@pytest.mark.parametrize("n, p", [(10**6, 15485863), (10**7, 179424673)])
+def test_nth_prime_known_values(n, p):
+    assert nth_prime(n) == p
+
+
+def test_nth_prime_upper_bound():
+    for n in range(1, len(PRIMES), 997):
+        assert PRIMES[n - 1] < nth_prime_upper_bound(n)
+
+
+def test_nth_prime_rejects_zero():
+    with pytest.raises(ValueError):
+        nth_prime(0)